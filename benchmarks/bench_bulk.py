@@ -0,0 +1,78 @@
+"""
+benchmarks/bench_bulk.py – N مهمة متأخرة: mark_done واحدة واحدة مقابل العمليات الجماعية
+
+لكل N بيقيس (ms للعملية كلها):
+  - loop      : mark_done(id) لكل مهمة (زي N ضغطة على ✅ – connection + commit لكل واحدة)
+  - many      : mark_done_many(ids) (IN list في transaction واحدة)
+  - overdue   : mark_overdue_done(user) (UPDATE واحد على الـ index)
+وبيطبع عدد الـ Telegram API calls اللي كانت هتحصل (edit + answer لكل ضغطة) مقابل 2.
+
+التشغيل:
+    python benchmarks/bench_bulk.py [--sizes 10 40 200 1000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from database import init_db, mark_done, mark_done_many, mark_overdue_done
+
+USER = 1
+
+
+def seed(path: str, n: int) -> list[int]:
+    base = datetime.now(database.CAIRO) - timedelta(days=1)
+    with sqlite3.connect(path) as db:
+        db.execute("DELETE FROM tasks")
+        db.executemany(
+            "INSERT INTO tasks (user_id, title, due) VALUES (?, ?, ?)",
+            [(USER, f"late {i}", (base - timedelta(minutes=i)).isoformat()) for i in range(n)],
+        )
+        return [r[0] for r in db.execute("SELECT id FROM tasks WHERE user_id = ?", (USER,))]
+
+
+async def timed(path: str, n: int, fn) -> float:
+    ids = seed(path, n)
+    t0 = time.perf_counter()
+    await fn(ids)
+    return (time.perf_counter() - t0) * 1e3
+
+
+async def loop_done(ids: list[int]) -> None:
+    for task_id in ids:
+        await mark_done(task_id, USER)
+
+
+async def run(sizes: list[int]) -> None:
+    await init_db()
+    path = database.DB_PATH
+    print(f"{'tasks':>6} {'loop ms':>9} {'many ms':>9} {'overdue ms':>11} {'api calls':>12}")
+    for n in sizes:
+        loop_ms = await timed(path, n, loop_done)
+        many_ms = await timed(path, n, lambda ids: mark_done_many(USER, ids))
+        overdue_ms = await timed(path, n, lambda ids: mark_overdue_done(USER))
+        print(f"{n:>6} {loop_ms:9.1f} {many_ms:9.1f} {overdue_ms:11.1f} {f'{2 * n} → 2':>12}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10, 40, 200, 1000])
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_PATH = os.path.join(tmp, "bench.db")
+        asyncio.run(run(args.sizes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+benchmarks/bench_callbacks.py – من الضغطة لحد ما الـ spinner يختفي (answerCallbackQuery)
+
+بيشغّل BoundedDispatcher حقيقي (polling + UpdateExecutor) قدام Bot API وهمي
+بتأخير ثابت لكل call (--api-ms) و DB مؤقتة، وبيبعت N ضغطة ✅ (done:<id>)
+واحدة كل --gap-ms من --chats شات بالتناوب (نفس الشات بيتنفذ بالترتيب، فـ --chats 1
+بيبيّن ضغطات ورا بعض من نفس المستخدم: الرد بيستنى الـ effect اللي قبله بس).
+لكل وضع بيقيس من تسليم الـ update (رد getUpdates) لحد:
+  - answer : وصول answerCallbackQuery للـ API
+  - edit   : وصول editMessageText (التغيير نفسه ظهر)
+الأوضاع:
+  - legacy     : mark_done → edit_text → answer (زي الأول، متبني هنا)
+  - optimistic : handlers/callbacks.py (acknowledge ثم defer)
+وبيتأكد إن كل المهام اتعلّمت منتهية في الآخر.
+
+التشغيل:
+    python benchmarks/bench_callbacks.py [--taps 50] [--chats 10] [--api-ms 60] [--gap-ms 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BOT_TOKEN", "123456:TEST-benchmark-token")
+
+from aiogram import Bot, F, Router, types
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+
+import database
+import effects
+from database import add_task, init_db, mark_done
+from executor import BoundedDispatcher
+
+TOKEN = os.environ["BOT_TOKEN"]
+BOT_USER = {"id": 123456, "is_bot": True, "first_name": "TelePot"}
+
+
+def legacy_router() -> Router:
+    """الترتيب القديم: الـ DB والـ edit قبل الرد"""
+    router = Router(name="legacy_callbacks")
+
+    @router.callback_query(F.data.startswith("done:"))
+    async def cb_done(callback: types.CallbackQuery) -> None:
+        success = await mark_done(int(callback.data.split(":")[1]), callback.from_user.id)
+        if success:
+            await callback.message.edit_text(f"✅ <s>{callback.message.text}</s>")
+            await callback.answer("✅ برافو عليك! 🎉")
+        else:
+            await callback.answer("❌", show_alert=True)
+
+    return router
+
+
+class FakeApi:
+    def __init__(self, taps: list[tuple[int, int]], api_delay: float, gap: float) -> None:
+        self.pending = list(taps)
+        self.api_delay = api_delay
+        self.gap = gap
+        self.delivered: dict[str, float] = {}
+        self.answered: dict[str, float] = {}
+        self.edited: dict[int, float] = {}
+        self.done = asyncio.get_running_loop().create_future()
+        self.total = len(taps)
+
+    def update(self, n: int, uid: int, task_id: int) -> dict:
+        chat = {"id": uid, "type": "private"}
+        return {
+            "update_id": n,
+            "callback_query": {
+                "id": str(task_id),
+                "from": {"id": uid, "is_bot": False, "first_name": "Bench"},
+                "chat_instance": "bench",
+                "data": f"done:{task_id}",
+                "message": {
+                    "message_id": task_id, "date": int(time.time()), "chat": chat, "from": BOT_USER,
+                    "text": f"📌 task {task_id}",
+                },
+            },
+        }
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        form = await request.post()
+        result: object = True
+        if method == "getMe":
+            result = {"id": 123456, "is_bot": True, "first_name": "TelePot", "username": "bench_bot"}
+        elif method == "getUpdates":
+            await asyncio.sleep(self.gap if self.pending else 0.5)
+            result = []
+            offset = int(form.get("offset") or 0)
+            n = self.total - len(self.pending) + 1
+            if self.pending and offset <= n:
+                uid, task_id = self.pending.pop(0)
+                self.delivered[str(task_id)] = time.perf_counter()
+                result = [self.update(n, uid, task_id)]
+        elif method == "answerCallbackQuery":
+            self.answered[form["callback_query_id"]] = time.perf_counter()
+            await asyncio.sleep(self.api_delay)
+        elif method == "editMessageText":
+            self.edited[int(form["message_id"])] = time.perf_counter()
+            await asyncio.sleep(self.api_delay)
+            result = {"message_id": int(form["message_id"]), "date": int(time.time()),
+                      "chat": {"id": int(form["chat_id"]), "type": "private"}, "text": form.get("text", "")}
+        if len(self.edited) == self.total and len(self.answered) == self.total and not self.done.done():
+            self.done.set_result(None)
+        return web.Response(text=json.dumps({"ok": True, "result": result}), content_type="application/json")
+
+
+async def run_mode(mode: str, args) -> tuple[list[float], list[float]]:
+    taps = []
+    for i in range(args.taps):
+        uid = 1000 + i % args.chats
+        taps.append((uid, await add_task(uid, f"task {i}")))
+    ids = [task_id for _, task_id in taps]
+    api = FakeApi(taps, args.api_ms / 1e3, args.gap_ms / 1e3)
+    app = web.Application()
+    app.router.add_post(f"/bot{TOKEN}/{{method}}", api.handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    bot = Bot(TOKEN, session=AiohttpSession(api=TelegramAPIServer.from_base(f"http://127.0.0.1:{port}")))
+    dp = BoundedDispatcher()
+    if mode == "legacy":
+        dp.include_router(legacy_router())
+        effects.bind(None)
+    else:
+        from handlers.callbacks import router
+        dp.include_router(router)
+        effects.bind(dp.executor)
+
+    polling = asyncio.create_task(dp.start_polling(bot, handle_signals=False, polling_timeout=1))
+    try:
+        await asyncio.wait_for(api.done, timeout=60)
+    finally:
+        await dp.stop_polling()
+        await polling
+        await bot.session.close()
+        await runner.cleanup()
+
+    with sqlite3.connect(database.DB_PATH) as db:
+        left = db.execute(
+            f"SELECT COUNT(*) FROM tasks WHERE is_done = 0 AND id IN ({', '.join('?' * len(ids))})", ids
+        ).fetchone()[0]
+    if left:
+        raise SystemExit(f"{mode}: {left} tasks not marked done")
+    answer = [api.answered[str(i)] - api.delivered[str(i)] for i in ids]
+    edit = [api.edited[i] - api.delivered[str(i)] for i in ids]
+    return answer, edit
+
+
+def pct(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)] * 1e3
+
+
+async def run(args) -> None:
+    await init_db()
+    print(f"{args.taps} taps from {args.chats} chats, api {args.api_ms:g}ms/call, every {args.gap_ms:g}ms\n")
+    print(f"{'mode':<11} {'answer p50':>11} {'p99':>7} {'edit p50':>9} {'p99':>7}  (ms)")
+    for mode in ("legacy", "optimistic"):
+        answer, edit = await run_mode(mode, args)
+        print(f"{mode:<11} {pct(answer, .5):11.1f} {pct(answer, .99):7.1f} "
+              f"{pct(edit, .5):9.1f} {pct(edit, .99):7.1f}")
+    print(f"\nmean answer (optimistic): {statistics.mean(answer) * 1e3:.1f} ms")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--taps", type=int, default=50)
+    ap.add_argument("--chats", type=int, default=10)
+    ap.add_argument("--api-ms", type=float, default=60.0)
+    ap.add_argument("--gap-ms", type=float, default=20.0)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_PATH = os.path.join(tmp, "bench.db")
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
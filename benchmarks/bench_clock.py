@@ -0,0 +1,156 @@
+"""
+benchmarks/bench_clock.py – clock.now() واحد لكل tick + محاكاة أيام بالوقت الافتراضي
+
+1) عرض صفحة: format_task لـ N مهمة بموعد (كل مهمة بتسأل عن now):
+   - no tick : datetime.now(CAIRO) لكل مهمة (زي الأول)
+   - tick    : جوه clock.tick() زي أي update (ClockMiddleware) → حساب واحد
+   وبيعدّ كام "now" مختلف شافته العملية الواحدة.
+2) المحاكاة: --users مستخدم Premium، كل واحد عنده تذكيرات كل 15/30/60 دقيقة
+   + مهمة بموعد كل يوم (daily) + مهمة مرة واحدة، و scheduler.simulate بيلف --days يوم
+   افتراضي قدام bot وهمي. بيقارن عدد الرسايل بالمتوقع (exit code 1 لو مختلف)
+   وبيطبع الوقت الحقيقي.
+
+التشغيل:
+    python benchmarks/bench_clock.py [--tasks 1000] [--users 10] [--days 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BOT_TOKEN", "123456:TEST-benchmark-token")
+
+import clock
+import database
+import scheduler
+from database import CAIRO, activate_premium, add_reminder, add_task, init_db
+from handlers.list_tasks import format_task
+from models import Task
+
+INTERVALS = (15, 30, 60)
+
+
+def page_ms(tasks: list[Task], repeat: int, ticked: bool) -> tuple[float, int]:
+    seen: set[datetime] = set()
+    original = clock.now
+
+    def spy() -> datetime:
+        value = original()
+        seen.add(value)
+        return value
+
+    for t in tasks:
+        t.due_at  # parse برّه القياس (بيتكاش)
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        if ticked:
+            with clock.tick():
+                for i, t in enumerate(tasks, 1):
+                    format_task(t, i)
+        else:
+            # الطريقة القديمة: datetime.now(CAIRO) لكل مهمة
+            for i, t in enumerate(tasks, 1):
+                format_task(t, i)
+        best = min(best, time.perf_counter() - t0)
+
+    clock.now = spy
+    try:
+        if ticked:
+            with clock.tick():
+                for i, t in enumerate(tasks, 1):
+                    format_task(t, i)
+        else:
+            for i, t in enumerate(tasks, 1):
+                format_task(t, i)
+    finally:
+        clock.now = original
+    return best * 1e3, len(seen)
+
+
+class FakeBot:
+    def __init__(self) -> None:
+        self.sent = {"task": 0, "reminder": 0, "summary": 0}
+
+    async def send_message(self, user_id: int, text: str, **kwargs) -> None:
+        if "حان الموعد" in text:
+            self.sent["task"] += 1
+        elif "تذكير!" in text:
+            self.sent["reminder"] += 1
+        elif "صباح الخير" in text:
+            self.sent["summary"] += 1
+
+
+async def simulation(args) -> int:
+    start = CAIRO.localize(datetime(2026, 3, 1, 0, 0))
+    virtual = clock.VirtualClock(start)
+    previous = clock.use(virtual)
+    try:
+        for uid in range(1, args.users + 1):
+            await activate_premium(uid, f"sim-{uid}", 299, "XTR", days=args.days + 30)
+            for mins in INTERVALS:
+                await add_reminder(uid, f"تذكير {mins}", mins)
+            await add_task(uid, "مهمة يومية", start + timedelta(hours=9, minutes=uid), "daily")
+            await add_task(uid, "مهمة مرة واحدة", start + timedelta(days=1, hours=15))
+
+        minutes = args.days * 1440
+        expected = {
+            "task": args.users * (args.days + (1 if args.days > 1 else 0)),
+            "reminder": args.users * sum(minutes // m for m in INTERVALS),
+            "summary": args.users * args.days,
+        }
+        bot = FakeBot()
+        t0 = time.perf_counter()
+        ticks = await scheduler.simulate(bot, start + timedelta(days=args.days))
+        wall = time.perf_counter() - t0
+    finally:
+        clock.use(previous)
+
+    print(f"\nsimulated {args.days} days ({ticks} ticks) in {wall:.1f}s "
+          f"(x{args.days * 86400 / wall:,.0f} real time)")
+    print(f"{'kind':<9} {'sent':>6} {'expected':>9}")
+    for kind, want in expected.items():
+        print(f"{kind:<9} {bot.sent[kind]:>6} {want:>9}")
+    if bot.sent != expected:
+        print("REGRESSION simulation sent != expected")
+        return 1
+    return 0
+
+
+async def run(args) -> int:
+    await init_db()
+    now = datetime.now(CAIRO)
+    tasks = [
+        Task(i, 1, f"مهمة {i}", (now + timedelta(minutes=i - args.tasks // 2)).isoformat(),
+             None, 0, 0, None)
+        for i in range(args.tasks)
+    ]
+    print(f"format_task × {args.tasks}\n{'mode':<8} {'ms':>7} {'nows':>6}")
+    for name, ticked in (("no tick", False), ("tick", True)):
+        ms, nows = page_ms(tasks, args.repeat, ticked)
+        print(f"{name:<8} {ms:7.2f} {nows:>6}")
+    return await simulation(args)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tasks", type=int, default=1000)
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--users", type=int, default=10)
+    ap.add_argument("--days", type=int, default=3)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_PATH = os.path.join(tmp, "bench.db")
+        return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""
+benchmarks/bench_date_span.py – parse_natural_date: مطابقة + عدد استدعاءات dateparser
+
+بيقارن parse_natural_date الحالية بالنسخة القديمة (كل prefix/suffix بـ normalize
+و smart_parse) على corpus رسائل حقيقية الشكل، ويعد:
+  - استدعاءات dateparser و normalize_arabic لكل رسالة
+  - الزمن لكل رسالة
+ولو أي (عنوان، تاريخ) اختلف بيخرج بـ exit code 1.
+
+التشغيل:
+    python benchmarks/bench_date_span.py [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import handlers.add_task as add_task
+from handlers.add_task import clean_title, parse_natural_date
+
+CALLS: Counter = Counter()
+
+
+def _counting(name, fn):
+    def wrapper(*args, **kwargs):
+        CALLS[name] += 1
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+add_task.normalize_arabic = _counting("normalize", add_task.normalize_arabic)
+add_task._dateparser_parse = _counting("dateparser", add_task._dateparser_parse)
+
+
+# ══════════════════════════════════════════════════
+#  النسخة القديمة (مرجع للمطابقة)
+# ══════════════════════════════════════════════════
+
+def legacy_is_pure_date(text: str) -> bool:
+    normalized = add_task.normalize_arabic(text)
+    return not re.search(r"[\u0600-\u06FF]", normalized)
+
+
+def legacy_parse_natural_date(text: str):
+    if legacy_is_pure_date(text):
+        parsed = add_task.smart_parse(text)
+        if parsed:
+            return text.strip(), parsed
+
+    words = text.split()
+    best_date = None
+    best_title = text.strip()
+
+    max_date_words = min(len(words) - 1, 6)
+    for i in range(max_date_words, 0, -1):
+        date_part = " ".join(words[:i])
+        title_part = " ".join(words[i:])
+        if not legacy_is_pure_date(date_part):
+            continue
+        parsed = add_task.smart_parse(date_part)
+        if parsed and title_part:
+            best_date = parsed
+            best_title = clean_title(title_part)
+            break
+
+    if not best_date:
+        for i in range(1, min(len(words), 6)):
+            date_part = " ".join(words[i:])
+            title_part = " ".join(words[:i])
+            if not legacy_is_pure_date(date_part):
+                continue
+            parsed = add_task.smart_parse(date_part)
+            if parsed and title_part:
+                best_date = parsed
+                best_title = clean_title(title_part)
+                break
+
+    return best_title, best_date
+
+
+# ══════════════════════════════════════════════════
+#  Corpus
+# ══════════════════════════════════════════════════
+
+CORPUS = [
+    "بكرة 3 العصر",
+    "بكرة 3 العصر اشتري هدية",
+    "اشتري هدية بكرة 3 العصر",
+    "فكرني بعد ساعتين اكلم الدكتور",
+    "اكلم الدكتور بعد ساعتين",
+    "الخميس 9 الصبح ميتنج الفريق",
+    "ميتنج الفريق الخميس الساعة 9 بليل",
+    "النهاردة 7 بالليل اذاكر",
+    "بعد بكرة 10 الصبح اروح البنك",
+    "اروح البنك بعد بكرة 10 الصبح",
+    "صحيني بكره ٦ الفجر",
+    "نبهني كمان 3 ساعات اطفي الفرن",
+    "اشرب مية كل ساعة",
+    "اجتماع الفريق",
+    "اشتري عيش ولبن وجبنة وبيض ومربى من السوبر ماركت اللي تحت البيت",
+    "ادفع فاتورة الكهربا قبل يوم 25 الشهر ده عشان ما يقطعوهاش",
+    "كلم ماما الجمعة 2 الضهر",
+    "الجمعة 2 الضهر كلم ماما",
+    "تلاته و نص العصر درس انجليزي",
+    "درس انجليزي تلاته و نص العصر",
+    "call mom tomorrow 5 pm",
+    "tomorrow 5 pm call mom",
+    "remind me to buy milk in 2 hours",
+    "meeting thursday 9 am with the team",
+    "دلوقتي",
+    "ارن على احمد دلوقتي",
+    "السبت 11 ص جيم",
+    "اروح الجيم السبت 11 ص",
+    "25/12 عيد ميلاد سارة",
+    "عيد ميلاد سارة 25/12",
+    "ميعاد الدكتور الاتنين الساعه ٧ مساء في العيادة",
+    "خلص التقرير وابعته للمدير قبل الاجتماع بكرة الصبح",
+]
+
+
+def run(fn, corpus):
+    CALLS.clear()
+    add_task._span_cache.clear()
+    add_task._message_cache.clear()
+    t0 = time.perf_counter()
+    results = [fn(t) for t in corpus]
+    return results, time.perf_counter() - t0, dict(CALLS)
+
+
+def _key(result):
+    title, due = result
+    return title, due and due.replace(second=0, microsecond=0)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    corpus = CORPUS * args.repeat
+    add_task.warm_date_parser()  # تسخين dateparser قبل القياس
+    old, old_secs, old_calls = run(legacy_parse_natural_date, corpus)
+    new, new_secs, new_calls = run(parse_natural_date, corpus)
+
+    mismatches = [
+        (text, a, b) for text, a, b in zip(corpus, old, new) if _key(a) != _key(b)
+    ]
+    for text, a, b in mismatches[:20]:
+        print(f"MISMATCH {text!r}\n  old: {a}\n  new: {b}")
+    print(f"corpus: {len(corpus)} messages, {len(mismatches)} mismatches")
+
+    n = len(corpus)
+    for name, secs, calls in (("legacy", old_secs, old_calls), ("span", new_secs, new_calls)):
+        print(
+            f"{name:<7} {secs / n * 1e3:8.2f} ms/msg  "
+            f"dateparser {calls.get('dateparser', 0) / n:5.2f}/msg  "
+            f"normalize {calls.get('normalize', 0) / n:5.2f}/msg"
+        )
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+benchmarks/bench_dateparser_warmup.py – أول parse بعد الـ deploy: cold vs warm + الذاكرة
+
+كل سيناريو بيشتغل في interpreter جديد (subprocess) عشان الـ cold يبقى cold فعلًا:
+  - legacy : dateparser.parse(settings=...) من غير languages (detection على كل الـ locales)
+  - cold   : DateDataParser متظبط (ar/en) من غير تسخين (بيشمل import dateparser نفسه: بقى lazy)
+  - warm   : نفس الـ parser بعد warm_date_parser() (اللي main.py بيعملها)
+وبيطبع زمن أول parse وزمن parse عادي بعده و RSS (ru_maxrss).
+
+التشغيل:
+    python benchmarks/bench_dateparser_warmup.py
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PHRASE = "thursday 9 AM"
+NEXT = "in 3 days"
+
+CHILD = r"""
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+mode = {mode!r}
+out = {{}}
+if mode == "legacy":
+    import dateparser
+    from handlers.add_task import DATEPARSER_SETTINGS
+    parse = lambda s: dateparser.parse(s, settings=DATEPARSER_SETTINGS)
+else:
+    from handlers import add_task
+    parse = add_task._dateparser_parse
+    if mode == "warm":
+        out["warmup"] = add_task.warm_date_parser()
+t0 = time.perf_counter(); parse({phrase!r}); out["first"] = time.perf_counter() - t0
+t0 = time.perf_counter(); parse({next!r}); out["next"] = time.perf_counter() - t0
+out["rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps(out))
+"""
+
+
+def run(mode: str) -> dict:
+    code = CHILD.format(root=ROOT, mode=mode, phrase=PHRASE, next=NEXT)
+    proc = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    for mode in ("legacy", "cold", "warm"):
+        r = run(mode)
+        warm = f"  (warmup {r['warmup'] * 1000:.0f} ms)" if "warmup" in r else ""
+        print(
+            f"{mode:<7} first parse {r['first'] * 1000:8.1f} ms  "
+            f"next {r['next'] * 1000:7.1f} ms  RSS {r['rss_mb']:6.1f} MB{warm}"
+        )
+
+
+if __name__ == "__main__":
+    main()
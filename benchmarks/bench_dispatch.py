@@ -0,0 +1,193 @@
+"""
+benchmarks/bench_dispatch.py – تكلفة توجيه رسالة لحد الـ handler (filters بس)
+
+بيبني Dispatcher من الـ routers الحقيقية بنفس ترتيب main.py ويقارن:
+  - legacy : كل زرار F.text == label جوه الـ router بتاعه (زي الأول، بنفس ترتيب الـ source)
+  - table  : handlers/buttons.py (dict lookup واحد قبل أي router)
+الـ handlers نفسها مش بتتنفذ (HandlerObject.call بيرجع اسم الـ handler بس)،
+فالزمن = middlewares الـ Dispatcher (FSM) + تقييم الـ filters.
+بيطبع µs/update وعدد الـ filters اللي اتقيّمت لكل سيناريو، والـ handler اللي اتختار.
+لو handler اختلف في سيناريو مش متوقع → exit code 1.
+
+التشغيل:
+    python benchmarks/bench_dispatch.py [--repeat 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BOT_TOKEN", "123456:TEST-benchmark-token")
+
+from aiogram import Bot, Dispatcher, F, Router
+from aiogram.dispatcher.event.bases import UNHANDLED
+from aiogram.dispatcher.event.handler import FilterObject, HandlerObject
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.types import Chat, Message, Update, User
+
+from handlers.add_task import AddTaskFSM
+from handlers.add_task import router as add_task_router
+from handlers.admin import router as admin_router
+from handlers.buttons import router as buttons_router
+from handlers.callbacks import router as callbacks_router
+from handlers.list_tasks import router as list_tasks_router
+from handlers.premium import router as premium_router
+from handlers.reminder import router as reminder_router
+from handlers.search import router as search_router
+from handlers.start import router as start_router
+
+TOKEN = os.environ["BOT_TOKEN"]
+USER = User(id=42, is_bot=False, first_name="Bench")
+CHAT = Chat(id=42, type="private")
+
+# (اسم، نص، FSM state)
+SCENARIOS = [
+    ("button 📋", "📋 مهامي", None),
+    ("button ➕", "➕ إضافة مهمة", None),
+    ("button ℹ️", "ℹ️ مساعدة", None),
+    ("button 👤", "👤 اشتراكي", None),
+    ("reminder msg", "ذكرني بالاستغفار كل 5 دقايق", None),
+    ("command", "/tasks", None),
+    ("free text", "بكرة 3 العصر اشتري هدية", None),
+    ("FSM title", "بكرة 3 العصر اشتري هدية", AddTaskFSM.waiting_title),
+    ("FSM cancel", "❌ إلغاء", AddTaskFSM.waiting_title),
+    ("FSM + button", "📋 مهامي", AddTaskFSM.waiting_title),
+]
+# الزرار دلوقتي بيكسب على الـ FSM (قبل كده كان بيتسجل كعنوان)
+EXPECTED_CHANGES = {"FSM + button"}
+
+FILTER_CALLS = 0
+
+
+def stub(handler: HandlerObject) -> HandlerObject:
+    """الـ handler ما يتنفذش: بيرجع اسمه بس (على الـ instance، مش الـ Dispatcher نفسه)"""
+    async def call(*args, **kwargs):
+        return handler.callback.__name__
+    handler.call = call
+    return handler
+
+
+async def _counting_filter_call(self: FilterObject, *args, **kwargs):
+    global FILTER_CALLS
+    FILTER_CALLS += 1
+    return await _filter_call(self, *args, **kwargs)
+
+
+_filter_call = FilterObject.call
+FilterObject.call = _counting_filter_call
+
+
+def legacy_routers() -> list[Router]:
+    """
+    نفس الـ routers بس الأزرار F.text == label جوه كل router (زي قبل handlers/buttons.py).
+    الـ handler بيتحط في مكانه حسب سطره في الـ source (الـ decorators كانت على نفس الدالة).
+    """
+    routers = [premium_router, admin_router, search_router, reminder_router, start_router,
+               add_task_router, list_tasks_router, callbacks_router]
+    by_module = {r.name: r for r in routers}
+    copies: dict[str, Router] = {}
+    for r in routers:
+        copy = Router(name=f"legacy_{r.name}")
+        for name, observer in r.observers.items():
+            copy.observers[name].handlers = list(observer.handlers)
+        copies[r.name] = copy
+
+    for label, handler in buttons_router.message.table.items():
+        owner = handler.callback.__module__.rsplit(".", 1)[-1]
+        handlers = copies[by_module[owner].name].message.handlers
+        line = handler.callback.__code__.co_firstlineno
+        pos = next(
+            (i for i, h in enumerate(handlers) if h.callback.__code__.co_firstlineno > line),
+            len(handlers),
+        )
+        handlers.insert(pos, stub(HandlerObject(callback=handler.callback,
+                                                filters=[FilterObject(F.text == label)])))
+    return [copies[r.name] for r in routers]
+
+
+def stub_routers() -> None:
+    for r in (premium_router, buttons_router, admin_router, search_router, reminder_router, start_router,
+              add_task_router, list_tasks_router, callbacks_router):
+        for observer in r.observers.values():
+            for handler in observer.handlers:
+                stub(handler)
+
+
+def build(kind: str) -> Dispatcher:
+    dp = Dispatcher()
+    if kind == "legacy":
+        dp.include_routers(*legacy_routers())
+    else:
+        dp.include_routers(premium_router, buttons_router, admin_router, search_router, reminder_router,
+                           start_router, add_task_router, list_tasks_router, callbacks_router)
+    return dp
+
+
+def make_update(text: str) -> Update:
+    return Update(
+        update_id=1,
+        message=Message(message_id=1, date=datetime.now(), chat=CHAT, from_user=USER, text=text),
+    )
+
+
+async def measure(dp: Dispatcher, bot: Bot, text: str, state: State | None, repeat: int):
+    global FILTER_CALLS
+    key = StorageKey(bot_id=bot.id, chat_id=CHAT.id, user_id=USER.id)
+    await dp.storage.set_state(key, state)
+    update = make_update(text)
+
+    FILTER_CALLS = 0
+    result = await dp.feed_update(bot, update)
+    filters = FILTER_CALLS
+
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        await dp.feed_update(bot, update)
+    secs = (time.perf_counter() - t0) / repeat
+    return ("—" if result is UNHANDLED else result), filters, secs
+
+
+async def run(repeat: int) -> int:
+    bot = Bot(TOKEN)
+    stub_routers()
+    # legacy لازم يتبني قبل table: include_routers بيربط الـ router بـ parent واحد بس
+    dps = {"legacy": build("legacy"), "table": build("table")}
+
+    print(f"{'scenario':<14} {'legacy µs':>10} {'filters':>8} {'table µs':>10} {'filters':>8}  handler")
+    problems = []
+    totals = {"legacy": 0.0, "table": 0.0}
+    for name, text, state in SCENARIOS:
+        out = {}
+        for kind, dp in dps.items():
+            out[kind] = await measure(dp, bot, text, state, repeat)
+            totals[kind] += out[kind][2]
+        (lh, lf, ls), (th, tf, ts) = out["legacy"], out["table"]
+        changed = "" if lh == th else f"  (legacy → {lh})"
+        print(f"{name:<14} {ls * 1e6:10.1f} {lf:8d} {ts * 1e6:10.1f} {tf:8d}  {th}{changed}")
+        if lh != th and name not in EXPECTED_CHANGES:
+            problems.append(f"{name}: {lh} → {th}")
+
+    n = len(SCENARIOS)
+    print(f"{'mean':<14} {totals['legacy'] / n * 1e6:10.1f} {'':>8} {totals['table'] / n * 1e6:10.1f}")
+    await bot.session.close()
+    for p in problems:
+        print(f"MISMATCH {p}")
+    return 1 if problems else 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=2000)
+    args = ap.parse_args()
+    return asyncio.run(run(args.repeat))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+benchmarks/bench_expiry.py – انتهاء الاشتراكات: scan كل ساعة مقابل expiry.py (heap)
+
+1) التكلفة الثابتة مع N مشترك (مواعيدهم متوزعة على 30 يوم):
+   - scan     : SELECT ... WHERE is_premium = 1 AND sub_end <= ? (24 مرة في اليوم)
+   - heap load: get_subscription_ends + heapify (مرة عند التشغيل) + watch() لكل تجديد
+2) التأخير عن الميعاد: --due اشتراك بيخلصوا خلال ثانيتين، بيشغّل ExpiryQueue.run
+   قدام bot وهمي وبيقيس (وقت الرسالة - sub_end). الـ scan كل ساعة تأخيره 0..3600s (متوسط 30 دقيقة).
+
+التشغيل:
+    python benchmarks/bench_expiry.py [--subs 1000 10000 100000] [--due 300]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import expiry
+from database import CAIRO, init_db
+
+
+def seed(path: str, subs: int, due: int) -> dict[int, float]:
+    """subs مشترك على 30 يوم + due بيخلصوا في أول ثانيتين → {user_id: epoch الانتهاء} للـ due"""
+    now = datetime.now(CAIRO)
+    rows, due_at = [], {}
+    for uid in range(1, subs + 1):
+        end = now + timedelta(days=1 + (uid * 7919) % (30 * 24) / 24)
+        rows.append((uid, end.isoformat()))
+    for i in range(due):
+        uid = subs + 1 + i
+        end = now + timedelta(seconds=0.5 + 1.5 * i / max(due, 1))
+        rows.append((uid, end.isoformat()))
+        due_at[uid] = end.timestamp()
+    with sqlite3.connect(path) as db:
+        db.execute("DELETE FROM users")
+        db.executemany(
+            "INSERT INTO users (user_id, is_premium, sub_end, warned_end) VALUES (?, 1, ?, ?)",
+            [(uid, end, end) for uid, end in rows],  # warned_end = sub_end: الانتهاء بس
+        )
+    return due_at
+
+
+class FakeBot:
+    def __init__(self, due_at: dict[int, float]) -> None:
+        self.due_at = due_at
+        self.late: list[float] = []
+        self.done = asyncio.get_running_loop().create_future()
+
+    async def send_message(self, user_id: int, text: str, **kwargs) -> None:
+        self.late.append(time.time() - self.due_at[user_id])
+        if len(self.late) == len(self.due_at) and not self.done.done():
+            self.done.set_result(None)
+
+
+def pct(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)] * 1e3
+
+
+async def run(args) -> None:
+    await init_db()
+    path = database.DB_PATH
+    print(f"{'subs':>7} {'scan ms':>8} {'scan/day ms':>12} {'load ms':>8} {'watch µs':>9} {'heap MB':>8}")
+    for n in args.subs:
+        seed(path, n, 0)
+        now_iso = datetime.now(CAIRO).isoformat()
+        with sqlite3.connect(path) as db:
+            t0 = time.perf_counter()
+            for _ in range(10):
+                db.execute(
+                    "SELECT user_id FROM users WHERE is_premium = 1 AND sub_end <= ?", (now_iso,)
+                ).fetchall()
+            scan = (time.perf_counter() - t0) / 10 * 1e3
+
+        q = expiry.ExpiryQueue()
+        t0 = time.perf_counter()
+        await q.load()
+        load = (time.perf_counter() - t0) * 1e3
+        end = datetime.now(CAIRO) + timedelta(days=30)
+        t0 = time.perf_counter()
+        for uid in range(1, 1001):
+            q.watch(uid, end)
+        watch = (time.perf_counter() - t0) / 1000 * 1e6
+        heap_mb = sys.getsizeof(q._heap) / 1e6 + len(q._heap) * 150 / 1e6  # list + tuples تقريبًا
+        print(f"{n:>7} {scan:8.2f} {scan * 24:12.1f} {load:8.1f} {watch:9.1f} {heap_mb:8.1f}")
+
+    due_at = seed(path, args.subs[0], args.due)
+    bot = FakeBot(due_at)
+    q = expiry.ExpiryQueue()
+    task = asyncio.create_task(q.run(bot))
+    try:
+        await asyncio.wait_for(bot.done, timeout=30)
+    finally:
+        task.cancel()
+    with sqlite3.connect(path) as db:
+        left = db.execute(
+            f"SELECT COUNT(*) FROM users WHERE is_premium = 1 AND user_id > {args.subs[0]}"
+        ).fetchone()[0]
+    if left:
+        raise SystemExit(f"{left} subscriptions not expired")
+    print(
+        f"\n{args.due} expiries in 2s: lateness p50 {pct(bot.late, .5):.1f} ms, "
+        f"p99 {pct(bot.late, .99):.1f} ms (hourly scan: mean 1800000 ms)"
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--subs", type=int, nargs="+", default=[1000, 10000, 100000])
+    ap.add_argument("--due", type=int, default=300)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_PATH = os.path.join(tmp, "bench.db")
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
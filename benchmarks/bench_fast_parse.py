@@ -0,0 +1,89 @@
+"""
+benchmarks/bench_fast_parse.py – fast_parse: مطابقة مع dateparser + hit rate + latency
+
+بيشغّل كل جملة في الـ corpus على fast_parse وعلى dateparser بنفس "الآن"
+(RELATIVE_BASE) لمجموعة أوقات مختلفة، ويطلع:
+  - نسبة الجمل اللي الـ fast path لقطها
+  - الاختلافات عن dateparser (للمراجعة – dateparser نفسه بيقارن الوقت بالـ UTC
+    وبيلف الشهر غلط آخر يوم فيه، فمش كل اختلاف غلط في الـ fast path)
+  - latency لكل parse: fast path vs dateparser
+
+التشغيل:
+    python benchmarks/bench_fast_parse.py
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dateparser
+
+from handlers.add_task import CAIRO, DATEPARSER_SETTINGS, fast_parse, normalize_arabic
+
+CORPUS = [
+    "بكرة 3 العصر", "بكره 9 الصبح", "بكرا 7 بليل", "بكرة الساعة 5",
+    "بعد ساعتين", "بعد ساعة", "بعد نص ساعة", "كمان ربع ساعة", "بعد شوية",
+    "بعد 20 دقيقة", "كمان 3 ساعات", "بعد 45 دقايق",
+    "الخميس 9 الصبح", "الجمعة 2 الضهر", "السبت 11 ص", "الحد 8 بالليل",
+    "الاتنين", "الخميس", "النهاردة 7 بالليل", "النهاردة",
+    "7 الصبح", "3 العصر", "9 بليل", "12 الضهر", "الساعه 7", "تلاته و نص العصر",
+    "اربعه إلا ربع العصر", "سبعه الصبح", "دلوقتي",
+    "in 2 hours", "in 30 minutes", "after 1 hour", "in 2 days", "in 1 week",
+    "tomorrow 3 pm", "tomorrow", "thursday 9 am", "3:30 PM", "15:00", "now",
+    # لازم تروح dateparser
+    "بعد بكرة 10 الصبح", "الاربعاء 5 المغرب", "25/12", "next friday",
+    "9", "tomorrow 9", "3 PM tomorrow", "in 2 hours 30 minutes",
+]
+
+BASES = [
+    datetime(2026, 10, 22, 8, 0),
+    datetime(2026, 10, 22, 15, 0),
+    datetime(2026, 10, 22, 23, 30),
+    datetime(2026, 10, 25, 0, 5),
+    datetime(2026, 12, 31, 21, 45),
+    datetime(2026, 3, 15, 12, 0),
+]
+
+
+def main() -> int:
+    """(exit code دايمًا 0 – ده تقرير مش gate)"""
+    hits = 0
+    total = 0
+    mismatches = []
+    fast_time = 0.0
+    slow_time = 0.0
+    for base in BASES:
+        now = CAIRO.localize(base)
+        settings = dict(DATEPARSER_SETTINGS, RELATIVE_BASE=base)
+        for text in CORPUS:
+            normalized = normalize_arabic(text)
+            t0 = time.perf_counter()
+            fast = fast_parse(normalized, now=now)
+            t1 = time.perf_counter()
+            slow = dateparser.parse(normalized, settings=settings)
+            t2 = time.perf_counter()
+            fast_time += t1 - t0
+            slow_time += t2 - t1
+            total += 1
+            if fast is None:
+                continue
+            hits += 1
+            if slow is None or fast != slow.astimezone(CAIRO):
+                mismatches.append((base, text, normalized, fast, slow))
+
+    for base, text, normalized, fast, slow in mismatches:
+        print(f"DIFF @{base} {text!r} → {normalized!r}\n  fast: {fast}\n  dateparser: {slow}")
+    print(f"fast-path hit rate: {hits}/{total} ({hits / total:.0%})")
+    print(f"agrees with dateparser: {hits - len(mismatches)}/{hits}")
+    print(f"fast_parse  {fast_time / total * 1e6:8.1f} µs/parse")
+    print(f"dateparser  {slow_time / total * 1e6:8.1f} µs/parse")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+benchmarks/bench_limits.py – حد المجاني: check ثم insert مقابل INSERT ... SELECT ... WHERE
+
+مستخدم مجاني بيبعت C إضافة في نفس اللحظة (ضغطات/رسايل ورا بعض من أكتر من جهاز):
+  - check+insert : is_premium → count_tasks → add_task (زي الأول، 3 round trips)
+  - limited      : add_task_limited (statement واحد)
+بيطبع عدد المهام اللي اتضافت (الحد FREE_TASK_LIMIT) وزمن الإضافة الواحدة.
+لو limited عدّى الحد → exit code 1.
+
+التشغيل:
+    python benchmarks/bench_limits.py [--concurrency 40] [--repeat 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from database import (
+    FREE_TASK_LIMIT, add_task, add_task_limited, count_tasks, ensure_user, init_db, is_premium,
+)
+
+USER = 1
+
+
+async def check_then_insert(title: str) -> int | None:
+    if not await is_premium(USER) and await count_tasks(USER) >= FREE_TASK_LIMIT:
+        return None
+    return await add_task(USER, title)
+
+
+def reset(path: str) -> None:
+    with sqlite3.connect(path) as db:
+        db.execute("DELETE FROM tasks")
+
+
+async def race(path: str, fn, concurrency: int) -> int:
+    reset(path)
+    await asyncio.gather(*(fn(f"task {i}") for i in range(concurrency)))
+    return await count_tasks(USER)
+
+
+async def latency(path: str, fn, repeat: int) -> float:
+    """ms للإضافة الواحدة (تحت الحد)"""
+    total = 0.0
+    for _ in range(repeat):
+        reset(path)
+        t0 = time.perf_counter()
+        await fn("task")
+        total += time.perf_counter() - t0
+    return total / repeat * 1e3
+
+
+async def run(args) -> int:
+    await init_db()
+    await ensure_user(USER)
+    path = database.DB_PATH
+    modes = {
+        "check+insert": check_then_insert,
+        "limited": lambda title: add_task_limited(USER, title),
+    }
+    print(f"free limit {FREE_TASK_LIMIT}, {args.concurrency} concurrent adds\n")
+    print(f"{'mode':<14} {'tasks':>6} {'ms/add':>8}")
+    counts = {}
+    for name, fn in modes.items():
+        counts[name] = await race(path, fn, args.concurrency)
+        print(f"{name:<14} {counts[name]:>6} {await latency(path, fn, args.repeat):8.2f}")
+    if counts["limited"] > FREE_TASK_LIMIT:
+        print(f"REGRESSION limited inserted {counts['limited']} > {FREE_TASK_LIMIT}")
+        return 1
+    return 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--concurrency", type=int, default=40)
+    ap.add_argument("--repeat", type=int, default=200)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_PATH = os.path.join(tmp, "bench.db")
+        return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+benchmarks/bench_normalize.py – normalize_arabic: مطابقة الناتج + microbenchmark
+
+بيقارن normalize_arabic الحالية بالنسخة القديمة (loop على القاموس) على:
+  1. corpus ثابت (golden)
+  2. نصوص عشوائية متركبة من كلمات القاموس (fuzz)
+ولو أي ناتج اختلف بيخرج بـ exit code 1.
+
+التشغيل:
+    python benchmarks/bench_normalize.py [--fuzz 20000] [--repeat 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from handlers.add_task import (
+    AM_WORDS,
+    ARABIC_DIGIT_MAP,
+    ARABIC_NUMBERS,
+    DAY_AR,
+    PM_WORDS,
+    RELATIVE_AR,
+    normalize_arabic,
+)
+
+# ══════════════════════════════════════════════════
+#  النسخة القديمة (مرجع للمطابقة)
+# ══════════════════════════════════════════════════
+
+_AR_CHAR = r"[\u0600-\u06FF]"
+_AM_PATTERNS = [
+    (re.compile(rf"(?<!{_AR_CHAR}){re.escape(w)}(?!{_AR_CHAR})"), " AM ")
+    for w in sorted(AM_WORDS, key=len, reverse=True)
+]
+_PM_PATTERNS = [
+    (re.compile(rf"(?<!{_AR_CHAR}){re.escape(w)}(?!{_AR_CHAR})"), " PM ")
+    for w in sorted(PM_WORDS, key=len, reverse=True)
+]
+
+
+def legacy_normalize_arabic(text: str) -> str:
+    s = text.strip()
+    s = s.translate(ARABIC_DIGIT_MAP)
+    for ar, en in RELATIVE_AR.items():
+        if ar in s:
+            s = s.replace(ar, en)
+            return s
+    for ar, en in DAY_AR.items():
+        if ar in s:
+            s = s.replace(ar, en)
+    for ar, digit in ARABIC_NUMBERS.items():
+        s = re.sub(rf"(?:^|\s){ar}(?:\s|$)", f" {digit} ", s)
+    s = re.sub(r"(\d+)\s*(?:و\s*نص(?:ف)?)", r"\1:30", s)
+    s = re.sub(r"(\d+)\s*(?:الا|إلا)\s*ربع", lambda m: f"{int(m.group(1))-1}:45", s)
+    s = re.sub(r"(\d+)\s*و\s*ربع", r"\1:15", s)
+    s = re.sub(r"(\d+)\s*و\s*(?:تلت|ثلث)", r"\1:20", s)
+    for pattern, replacement in _AM_PATTERNS:
+        s = pattern.sub(replacement, s)
+    for pattern, replacement in _PM_PATTERNS:
+        s = pattern.sub(replacement, s)
+    s = re.sub(r"(?:بعد|كمان)\s+(\d+)\s*(?:ساعه|ساعة|ساعات)", r"in \1 hours", s)
+    s = re.sub(r"(?:بعد|كمان)\s+(\d+)\s*(?:دقيقه|دقيقة|دقايق|دقائق|دقيق)", r"in \1 minutes", s)
+    s = re.sub(r"الساع[ةه]\s*(\d+)", r"\1:00", s)
+    s = re.sub(r"(?:صحيني|صحني|نبهني|فكرني|قومني|وريني|ذكرني)\s*", "", s)
+    s = re.sub(r"\s+", " ", s).strip()
+    return s
+
+
+# ══════════════════════════════════════════════════
+#  Golden corpus
+# ══════════════════════════════════════════════════
+
+GOLDEN = [
+    "بكرة 3 العصر",
+    "بكرة 3 العصر اشتري هدية",
+    "اشتري هدية بكرة 3 العصر",
+    "بعد ساعتين",
+    "بعد ساعتين كلم الدكتور",
+    "كمان نص ساعة",
+    "الخميس 9 الصبح ميتنج",
+    "الخميس الساعة 9 بليل",
+    "النهاردة 7 بالليل",
+    "بعد بكرة 10 الصبح",
+    "بعدبكره الضهر",
+    "يوم الجمعه بعد الضهر",
+    "الاربعاء 5 المغرب",
+    "التلاتاء 8 مساء",
+    "الأحد سبعه الصبح",
+    "سبعه سبعه سبعه",
+    "خمسه سبعه",
+    "تلاته و نص العصر",
+    "اربعه إلا ربع",
+    "تسعة و ربع الصبح",
+    "عشرة و تلت بليل",
+    "إحدى عشر الضهر",
+    "اثنا عشر ظهرا",
+    "الساعه ٧ صباحًا",
+    "٣ العصريه",
+    "صحيني بكره ٦ الفجر",
+    "فكرني بعد 20 دقيقة",
+    "نبهني كمان 3 ساعات",
+    "دلوقتي",
+    "بعد شوية",
+    "in 2 hours",
+    "tomorrow 9 am",
+    "call mom at 5 pm",
+    "اليوم 11 ص",
+    "السبت 2 م",
+    "الحدلوقتي",
+    "بكرالاتنين",
+    "  بكره   ٩   الصبح  ",
+    "اجتماع الفريق",
+    "",
+]
+
+
+def fuzz_corpus(n: int, seed: int = 7) -> list[str]:
+    """نصوص عشوائية من كلمات القاموس + فواصل مختلفة"""
+    rnd = random.Random(seed)
+    vocab = (
+        list(DAY_AR) + list(ARABIC_NUMBERS) + AM_WORDS + PM_WORDS + list(RELATIVE_AR)
+        + ["و نص", "إلا ربع", "و ربع", "و تلت", "الساعة", "بعد", "كمان", "دقيقة",
+           "ساعات", "اشتري", "هدية", "3", "١٠", "ص", "م", "x", "!"]
+    )
+    seps = [" ", " ", " ", "  ", "", "\n", "،"]
+    out = []
+    for _ in range(n):
+        words = [rnd.choice(vocab) for _ in range(rnd.randint(1, 6))]
+        text = words[0]
+        for w in words[1:]:
+            text += rnd.choice(seps) + w
+        out.append(text)
+    return out
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--fuzz", type=int, default=20000)
+    ap.add_argument("--repeat", type=int, default=2000)
+    args = ap.parse_args()
+
+    corpus = GOLDEN + fuzz_corpus(args.fuzz)
+    mismatches = [
+        (t, legacy_normalize_arabic(t), normalize_arabic(t))
+        for t in corpus
+        if legacy_normalize_arabic(t) != normalize_arabic(t)
+    ]
+    for text, old, new in mismatches[:20]:
+        print(f"MISMATCH {text!r}\n  old: {old!r}\n  new: {new!r}")
+    print(f"golden+fuzz: {len(corpus)} texts, {len(mismatches)} mismatches")
+
+    for name, fn in (("legacy", legacy_normalize_arabic), ("compiled", normalize_arabic)):
+        secs = timeit.timeit(lambda: [fn(t) for t in GOLDEN], number=args.repeat)
+        per_call = secs / (args.repeat * len(GOLDEN)) * 1e6
+        print(f"{name:<9} {per_call:7.2f} µs/call")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+benchmarks/bench_pagination.py – تكلفة صفحة مهام مع تاريخ بيكبر
+
+مستخدم واحد عنده OPEN مهمة نشطة + N مهمة منتهية (تاريخ/نسخ متكررة)،
+ومستخدمين تانيين عندهم نفس الحجم. لكل N بيقيس (ms/call):
+  - get_tasks()                   : SELECT * من غير limit (القديمة)
+  - get_tasks(include_done=True)  : التاريخ كله
+  - get_tasks_page() أول صفحة / صفحة من النص (cursor) / include_done
+وبيطبع EXPLAIN QUERY PLAN بتاع الصفحة (لازم SEARCH ... USING INDEX مش SCAN).
+
+التشغيل:
+    python benchmarks/bench_pagination.py [--sizes 1000 10000 100000] [--repeat 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from database import get_tasks, get_tasks_page, init_db
+
+USER = 1
+OPEN = 200
+OTHER_USERS = 3
+PAGE = 8
+
+
+def seed(path: str, history: int) -> None:
+    base = datetime(2026, 1, 1, 9, 0, tzinfo=database.CAIRO)
+    rows = []
+    for uid in range(USER, USER + 1 + OTHER_USERS):
+        for i in range(history):
+            rows.append((uid, f"done {i}", (base + timedelta(hours=i)).isoformat(), "daily", 1))
+        for i in range(OPEN):
+            due = None if i % 10 == 0 else (base + timedelta(days=300, hours=i)).isoformat()
+            rows.append((uid, f"open {i}", due, None, 0))
+    with sqlite3.connect(path) as db:
+        db.execute("DELETE FROM tasks")
+        db.executemany(
+            "INSERT INTO tasks (user_id, title, due, recurrence, is_done) VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+
+
+async def timed(fn, repeat: int) -> float:
+    await fn()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        await fn()
+    return (time.perf_counter() - t0) / repeat * 1e3
+
+
+async def run(sizes: list[int], repeat: int) -> None:
+    await init_db()
+    middle = None
+    print(f"{'history':>8} {'get_tasks':>10} {'+done':>10} {'page 1':>8} {'page mid':>9} {'page+done':>10}  (ms/call)")
+    for n in sizes:
+        seed(database.DB_PATH, n)
+        rows, _, _ = await get_tasks_page(USER, limit=OPEN // 2)
+        last = rows[-1]
+        middle = (">", last.due or "", last.id)
+        results = [
+            await timed(lambda: get_tasks(USER), repeat),
+            await timed(lambda: get_tasks(USER, include_done=True), max(repeat // 5, 1)),
+            await timed(lambda: get_tasks_page(USER, limit=PAGE), repeat),
+            await timed(lambda: get_tasks_page(USER, middle, limit=PAGE), repeat),
+            await timed(lambda: get_tasks_page(USER, middle, limit=PAGE, include_done=True), repeat),
+        ]
+        print(f"{n:>8} " + " ".join(f"{ms:>{w}.2f}" for ms, w in zip(results, (10, 10, 8, 9, 10))))
+
+    with sqlite3.connect(database.DB_PATH) as db:
+        plan = db.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM tasks WHERE user_id = ? AND is_done = 0 "
+            "AND IFNULL(due, '') >= ? AND (IFNULL(due, '') > ? OR id > ?) "
+            "ORDER BY IFNULL(due, ''), id LIMIT ?",
+            (USER, middle[1], middle[1], middle[2], PAGE),
+        ).fetchall()
+    print("\npage plan: " + " | ".join(row[3] for row in plan))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_PATH = os.path.join(tmp, "bench.db")
+        asyncio.run(run(args.sizes, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+benchmarks/bench_parse_corpus.py – corpus متعلّم عليه + regression gates لتحليل النصوص
+
+بيشغّل كل حالة في parse_corpus.json (مصري + فصحى + إنجليزي + أرقام عربية)
+على الدالة بتاعتها بـ "الآن" ثابت (base في الملف) ويطلع لكل دالة:
+  - الدقة (الناتج = المتوقع)
+  - p50 / p99 latency لكل نداء (الـ parse cache بيتمسح قبل كل نداء)
+  - الذاكرة لكل نداء (tracemalloc peak)
+وبيقارن بـ parse_baseline.json: لو حالة كانت صح وبقت غلط، أو الدقة نزلت،
+أو الـ latency/الذاكرة زادت عن الـ slack → exit code 1.
+
+صيغة التاريخ المتوقع (بالنسبة لـ base):
+  "+90m"             → base + 90 دقيقة
+  "+1d 09:00"        → يوم base + 1 الساعة 9:00 (بتوقيت القاهرة)
+  "=2026-12-25 00:00" → تاريخ ثابت
+  null               → مفيش تاريخ
+
+التشغيل:
+    python benchmarks/bench_parse_corpus.py [--repeat 5] [-v]
+    python benchmarks/bench_parse_corpus.py --update-baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import handlers.add_task as add_task
+from handlers.add_task import (
+    CAIRO,
+    normalize_arabic,
+    parse_due,
+    parse_natural_date,
+    smart_parse,
+    warm_date_parser,
+)
+from handlers.reminder import parse_interval_input, parse_reminder_message
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CORPUS_PATH = os.path.join(HERE, "parse_corpus.json")
+BASELINE_PATH = os.path.join(HERE, "parse_baseline.json")
+
+FUNCTIONS = ("normalize", "smart", "natural", "due", "reminder", "interval")
+
+
+def expected_due(spec: str | None, base: datetime) -> datetime | None:
+    if spec is None:
+        return None
+    if spec.startswith("="):
+        return CAIRO.localize(datetime.strptime(spec[1:], "%Y-%m-%d %H:%M"))
+    if spec.endswith("m"):
+        return base + timedelta(minutes=int(spec[1:-1]))
+    days, clock = spec[1:].split()
+    hour, minute = map(int, clock.split(":"))
+    local = base.replace(tzinfo=None) + timedelta(days=int(days[:-1]))
+    return CAIRO.localize(local.replace(hour=hour, minute=minute, second=0, microsecond=0))
+
+
+def same_due(a: datetime | None, b: datetime | None) -> bool:
+    if a is None or b is None:
+        return a is b
+    return abs((a - b).total_seconds()) < 1
+
+
+def call(case: dict, base: datetime):
+    fn, text = case["fn"], case["text"]
+    if fn == "normalize":
+        return normalize_arabic(text)
+    if fn == "smart":
+        return smart_parse(text, base)
+    if fn == "natural":
+        return parse_natural_date(text, base)
+    if fn == "due":
+        return parse_due(text, base)
+    if fn == "reminder":
+        return parse_reminder_message(text)
+    if fn == "interval":
+        return parse_interval_input(text)
+    raise ValueError(f"unknown fn {fn!r}")
+
+
+def check(case: dict, got, base: datetime) -> bool:
+    fn = case["fn"]
+    if fn == "normalize":
+        return got == case["normalized"]
+    if fn in ("smart", "due"):
+        return same_due(got, expected_due(case["due"], base))
+    if fn == "natural":
+        title, due = got
+        return title == case["title"] and same_due(due, expected_due(case["due"], base))
+    if fn == "reminder":
+        if case["interval"] is None:
+            return got is None
+        return got == (case["title"], case["interval"])
+    if fn == "interval":
+        return got == case["interval"]
+    return False
+
+
+def fresh(case: dict, base: datetime):
+    """نداء من غير ما الـ parse cache يرد بدالنا"""
+    add_task._span_cache.clear()
+    add_task._message_cache.clear()
+    return call(case, base)
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+
+def run(cases: list[dict], base: datetime, repeat: int) -> dict:
+    results = {fn: {"cases": 0, "passed": [], "failed": [], "times": [], "alloc": []}
+               for fn in FUNCTIONS}
+
+    for case in cases:
+        r = results[case["fn"]]
+        r["cases"] += 1
+        got = fresh(case, base)
+        (r["passed"] if check(case, got, base) else r["failed"]).append((case, got))
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fresh(case, base)
+            r["times"].append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    for case in cases:
+        fresh(case, base)  # تسخين (regex/locale caches)
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        fresh(case, base)
+        _, peak = tracemalloc.get_traced_memory()
+        results[case["fn"]]["alloc"].append(peak - before)
+    tracemalloc.stop()
+    return results
+
+
+def summarize(results: dict) -> dict:
+    summary = {"passing": [], "accuracy": {}, "p50_us": {}, "p99_us": {}, "alloc_kb": {}}
+    for fn, r in results.items():
+        if not r["cases"]:
+            continue
+        summary["passing"] += [case["id"] for case, _ in r["passed"]]
+        summary["accuracy"][fn] = round(len(r["passed"]) / r["cases"], 4)
+        summary["p50_us"][fn] = round(percentile(r["times"], 0.50) * 1e6, 1)
+        summary["p99_us"][fn] = round(percentile(r["times"], 0.99) * 1e6, 1)
+        summary["alloc_kb"][fn] = round(sum(r["alloc"]) / len(r["alloc"]) / 1024, 2)
+    summary["passing"].sort()
+    return summary
+
+
+def gate(summary: dict, baseline: dict, latency_slack: float, alloc_slack: float) -> list[str]:
+    problems = []
+    regressed = sorted(set(baseline["passing"]) - set(summary["passing"]))
+    if regressed:
+        problems.append(f"cases that used to pass now fail: {', '.join(regressed)}")
+    for fn, acc in baseline["accuracy"].items():
+        if summary["accuracy"].get(fn, 0) < acc:
+            problems.append(f"{fn}: accuracy {summary['accuracy'].get(fn, 0):.1%} < baseline {acc:.1%}")
+    for fn, p99 in baseline["p99_us"].items():
+        if latency_slack and summary["p99_us"].get(fn, 0) > p99 * latency_slack:
+            problems.append(f"{fn}: p99 {summary['p99_us'][fn]:.0f}µs > {latency_slack}× baseline {p99:.0f}µs")
+    for fn, kb in baseline["alloc_kb"].items():
+        if alloc_slack and summary["alloc_kb"].get(fn, 0) > max(kb, 1.0) * alloc_slack:
+            problems.append(f"{fn}: {summary['alloc_kb'][fn]:.1f}KB/call > {alloc_slack}× baseline {kb:.1f}KB")
+    return problems
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--latency-slack", type=float, default=3.0, help="0 = من غير latency gate")
+    ap.add_argument("--alloc-slack", type=float, default=1.5, help="0 = من غير allocation gate")
+    ap.add_argument("--update-baseline", action="store_true")
+    ap.add_argument("-v", "--verbose", action="store_true", help="اطبع الحالات الغلط")
+    args = ap.parse_args()
+
+    with open(CORPUS_PATH, encoding="utf-8") as f:
+        corpus = json.load(f)
+    base = CAIRO.localize(datetime.strptime(corpus["base"], "%Y-%m-%d %H:%M"))
+
+    warm_date_parser()
+    results = run(corpus["cases"], base, args.repeat)
+    summary = summarize(results)
+
+    print(f"{'fn':<10} {'cases':>5} {'accuracy':>9} {'p50 µs':>9} {'p99 µs':>9} {'KB/call':>8}")
+    for fn, r in results.items():
+        if not r["cases"]:
+            continue
+        print(
+            f"{fn:<10} {r['cases']:>5} {summary['accuracy'][fn]:>9.1%} "
+            f"{summary['p50_us'][fn]:>9.1f} {summary['p99_us'][fn]:>9.1f} {summary['alloc_kb'][fn]:>8.2f}"
+        )
+        if args.verbose:
+            for case, got in r["failed"]:
+                want = {k: v for k, v in case.items() if k not in ("id", "fn", "text")}
+                print(f"   ✗ {case['id']} {case['text']!r}\n       want {want}\n       got  {got}")
+
+    if args.update_baseline:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"baseline written → {os.path.relpath(BASELINE_PATH)}")
+        return 0
+
+    if not os.path.exists(BASELINE_PATH):
+        print("no baseline yet (run with --update-baseline)")
+        return 0
+    with open(BASELINE_PATH, encoding="utf-8") as f:
+        baseline = json.load(f)
+    problems = gate(summary, baseline, args.latency_slack, args.alloc_slack)
+    for p in problems:
+        print(f"REGRESSION {p}")
+    newly = sorted(set(summary["passing"]) - set(baseline["passing"]))
+    if newly:
+        print(f"newly passing (consider --update-baseline): {', '.join(newly)}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+benchmarks/bench_parse_pool.py – تأخير الـ event loop وقت تحليل التواريخ
+
+بيشغّل N رسالة بتحتاج dateparser (مش الـ fast path) بالتوازي، مرة inline
+جوه الـ loop ومرة عن طريق parse_pool، وفي نفس الوقت task بتنام 10ms
+وتقيس اتأخرت قد إيه (نفس فكرة monitor_loop_lag).
+
+التشغيل:
+    python benchmarks/bench_parse_pool.py [--messages 40] [--kind thread|process]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from handlers.add_task import parse_natural_date, warm_date_parser
+from parse_pool import ParsePool
+
+MESSAGES = [
+    "ميعاد الدكتور الاتنين الساعه ٧ مساء في العيادة",
+    "remind me to buy milk in 2 hours",
+    "meeting thursday 9 am with the team",
+    "25/12 عيد ميلاد سارة",
+]
+
+
+async def probe(lags: list[float], stop: asyncio.Event, interval: float = 0.01) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(loop.time() - expected, 0.0))
+
+
+async def scenario(name: str, parse, n: int) -> None:
+    lags: list[float] = []
+    stop = asyncio.Event()
+    prober = asyncio.create_task(probe(lags, stop))
+    await asyncio.sleep(0.05)
+
+    async def one(i: int) -> None:
+        await parse(MESSAGES[i % len(MESSAGES)])
+        await asyncio.sleep(0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n)))
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    await prober
+
+    print(
+        f"{name:<8} {elapsed * 1000:7.0f} ms total  "
+        f"loop lag max {max(lags, default=0) * 1000:6.1f} ms  ({len(lags)} probes)"
+    )
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--messages", type=int, default=40)
+    ap.add_argument("--kind", default="thread")
+    args = ap.parse_args()
+
+    warm_date_parser()
+    pool = ParsePool(kind=args.kind, max_pending=args.messages)
+
+    async def inline(text):
+        return parse_natural_date(text)
+
+    async def pooled(text):
+        return await pool.run(parse_natural_date, text, default=(text, None))
+
+    await pooled(MESSAGES[0])  # تشغيل الـ workers قبل القياس
+    await scenario("inline", inline, args.messages)
+    await scenario(args.kind, pooled, args.messages)
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,131 @@
+"""
+benchmarks/bench_payments.py – تفعيل Premium: UPDATE sub_end = now+30 مقابل activate_premium (ledger)
+
+1) الصحة: مستخدم بيدفع --renewals مرة (تجديد بدري)، وكل successful_payment بيوصل
+   --dupes مرة في نفس اللحظة (Telegram بيعيد الـ update):
+   - overwrite : sub_end = now + 30 يوم (زي الأول) → الأيام المدفوعة بتضيع
+   - ledger    : activate_premium → المتوقع renewals × 30 يوم ودفعة واحدة لكل charge_id
+2) /stats مع N دفعة في الـ ledger: scan (COUNT/SUM على payments + users) مقابل get_stats
+لو الـ ledger طلع أيام أو مدفوعات غلط → exit code 1.
+
+التشغيل:
+    python benchmarks/bench_payments.py [--renewals 3] [--dupes 5] [--payments 10000 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiosqlite
+
+import database
+from database import CAIRO, activate_premium, get_stats, init_db
+
+USER = 1
+DAYS = 30
+
+
+async def overwrite(user_id: int, charge_id: str) -> None:
+    """الطريقة القديمة: sub_end = now + DAYS من غير سجل"""
+    async with aiosqlite.connect(database.DB_PATH) as db:
+        await db.execute(
+            "UPDATE users SET is_premium = 1, sub_end = ? WHERE user_id = ?",
+            ((datetime.now(CAIRO) + timedelta(days=DAYS)).isoformat(), user_id),
+        )
+        await db.commit()
+
+
+async def ledger(user_id: int, charge_id: str) -> None:
+    await activate_premium(user_id, charge_id, 299, "XTR", days=DAYS)
+
+
+async def paid_days(path: str, fn, renewals: int, dupes: int) -> tuple[float, int]:
+    with sqlite3.connect(path) as db:
+        db.execute("DELETE FROM payments")
+        db.execute("INSERT OR REPLACE INTO users (user_id, is_premium) VALUES (?, 0)", (USER,))
+    for n in range(renewals):
+        await asyncio.gather(*(fn(USER, f"charge-{n}") for _ in range(dupes)))
+    with sqlite3.connect(path) as db:
+        sub_end = db.execute("SELECT sub_end FROM users WHERE user_id = ?", (USER,)).fetchone()[0]
+        payments = db.execute("SELECT COUNT(*) FROM payments").fetchone()[0]
+    days = (datetime.fromisoformat(sub_end) - datetime.now(CAIRO)).total_seconds() / 86400
+    return days, payments
+
+
+def seed(path: str, n: int) -> None:
+    now = datetime.now(CAIRO)
+    with sqlite3.connect(path) as db:
+        db.execute("DELETE FROM payments")
+        db.execute("DELETE FROM users")
+        db.execute("UPDATE stats SET value = 0")
+        db.executemany(
+            "INSERT INTO users (user_id, is_premium, sub_end) VALUES (?, ?, ?)",
+            ((uid, uid % 3 == 0, (now + timedelta(days=uid % 30)).isoformat()) for uid in range(n // 4)),
+        )
+        db.executemany(
+            "INSERT INTO payments (charge_id, user_id, amount, currency, days, sub_start, sub_end) "
+            "VALUES (?, ?, 299, 'XTR', 30, ?, ?)",
+            ((f"c{i}", i % (n // 4), now.isoformat(), now.isoformat()) for i in range(n)),
+        )
+
+
+def scan_stats(path: str) -> dict[str, int]:
+    with sqlite3.connect(path) as db:
+        payments, revenue = db.execute("SELECT COUNT(*), SUM(amount) FROM payments").fetchone()
+        active = db.execute("SELECT COUNT(*) FROM users WHERE is_premium = 1").fetchone()[0]
+    return {"active_subscribers": active, "payments": payments, "revenue_XTR": revenue}
+
+
+async def run(args) -> int:
+    await init_db()
+    path = database.DB_PATH
+    expected = args.renewals * DAYS
+    print(f"{args.renewals} renewals × {args.dupes} duplicate deliveries (expected ~{expected} days)\n")
+    print(f"{'mode':<10} {'days':>7} {'payments':>9}")
+    status = 0
+    for name, fn in (("overwrite", overwrite), ("ledger", ledger)):
+        days, payments = await paid_days(path, fn, args.renewals, args.dupes)
+        print(f"{name:<10} {days:7.1f} {payments:>9}")
+        if name == "ledger" and (round(days) != expected or payments != args.renewals):
+            print(f"REGRESSION ledger: {days:.1f} days / {payments} payments")
+            status = 1
+
+    print(f"\n{'payments':>9} {'scan ms':>8} {'stats ms':>9}")
+    for n in args.payments:
+        seed(path, n)
+        t0 = time.perf_counter()
+        scanned = scan_stats(path)
+        scan = (time.perf_counter() - t0) * 1e3
+        t0 = time.perf_counter()
+        stats = await get_stats()
+        fast = (time.perf_counter() - t0) * 1e3
+        print(f"{n:>9} {scan:8.2f} {fast:9.2f}")
+        if any(stats.get(k, 0) != v for k, v in scanned.items()):
+            print(f"REGRESSION stats {stats} != scan {scanned}")
+            status = 1
+    return status
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--renewals", type=int, default=3)
+    ap.add_argument("--dupes", type=int, default=5)
+    ap.add_argument("--payments", type=int, nargs="+", default=[10000, 100000])
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_PATH = os.path.join(tmp, "bench.db")
+        return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
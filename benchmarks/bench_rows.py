@@ -0,0 +1,127 @@
+"""
+benchmarks/bench_rows.py – قراءة الصفوف: dict(aiosqlite.Row) مقابل models.Task (__slots__)
+
+مستخدم عنده N مهمة (كلها بموعد)، وبيقرا SELECT * FROM tasks بطريقتين:
+  - dict  : row_factory = aiosqlite.Row ثم dict(r) (زي الأول)
+  - model : row_factory = Task.row_factory() (database.get_tasks)
+لكل طريقة:
+  - load ms   : الـ query + بناء الصفوف
+  - MB        : الذاكرة اللي الـ list ماسكاها (tracemalloc، run منفصل)
+  - use ms    : الـ due بيتقرا 3 مرات لكل مهمة (format + مقارنة + sort زي الـ handlers):
+                dict بيعمل fromisoformat كل مرة، model مرة واحدة وبعد كده من الكاش
+
+التشغيل:
+    python benchmarks/bench_rows.py [--rows 10000 100000] [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiosqlite
+
+import database
+from database import CAIRO, get_tasks, init_db
+
+USER = 1
+
+
+async def get_tasks_dict(user_id: int) -> list[dict]:
+    """الطريقة القديمة"""
+    async with aiosqlite.connect(database.DB_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute(
+            "SELECT * FROM tasks WHERE user_id = ? AND is_done = 0 ORDER BY due ASC", (user_id,)
+        ) as cur:
+            return [dict(r) for r in await cur.fetchall()]
+
+
+def use_dict(tasks: list[dict], now: datetime) -> int:
+    late = 0
+    for t in tasks:
+        datetime.fromisoformat(t["due"]).strftime("%I:%M %p")
+        late += datetime.fromisoformat(t["due"]) < now
+    tasks.sort(key=lambda t: datetime.fromisoformat(t["due"]))
+    return late
+
+
+def use_model(tasks: list, now: datetime) -> int:
+    late = 0
+    for t in tasks:
+        t.due_at.strftime("%I:%M %p")
+        late += t.due_at < now
+    tasks.sort(key=lambda t: t.due_at)
+    return late
+
+
+def seed(path: str, n: int) -> None:
+    now = datetime.now(CAIRO)
+    with sqlite3.connect(path) as db:
+        db.execute("DELETE FROM tasks")
+        db.executemany(
+            "INSERT INTO tasks (user_id, title, due, recurrence) VALUES (?, ?, ?, ?)",
+            (
+                (USER, f"مهمة رقم {i} – اجتماع الفريق", (now + timedelta(minutes=i - n // 2)).isoformat(),
+                 "daily" if i % 7 == 0 else None)
+                for i in range(n)
+            ),
+        )
+
+
+async def measure(load, use, repeat: int) -> tuple[float, float, float]:
+    best_load = best_use = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        tasks = await load(USER)
+        best_load = min(best_load, time.perf_counter() - t0)
+        now = datetime.now(CAIRO)
+        t0 = time.perf_counter()
+        use(tasks, now)
+        best_use = min(best_use, time.perf_counter() - t0)
+        del tasks
+
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    tasks = await load(USER)
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del tasks
+    return best_load * 1e3, held / 1e6, best_use * 1e3
+
+
+async def run(args) -> None:
+    await init_db()
+    print(f"{'rows':>7} {'mode':<6} {'load ms':>8} {'MB':>7} {'use ms':>8}")
+    for n in args.rows:
+        seed(database.DB_PATH, n)
+        for name, load, use in (("dict", get_tasks_dict, use_dict), ("model", get_tasks, use_model)):
+            load_ms, mb, use_ms = await measure(load, use, args.repeat)
+            print(f"{n:>7} {name:<6} {load_ms:8.1f} {mb:7.1f} {use_ms:8.1f}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_PATH = os.path.join(tmp, "bench.db")
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+benchmarks/bench_search.py – search_items (FTS5) مقابل LIKE '%...%' على tasks
+
+بيملى DB مؤقتة بـ N مهمة متوزعة على مستخدمين (كلام عشوائي + كلمات مصري/فصحى/إنجليزي
+بتشكيل وأشكال ألف/تاء مربوطة مختلفة في ~20% من العناوين) + تذكيرات، وبيقيس p50/p99 لكل query لمستخدم "تقيل".
+  - like : SELECT ... WHERE user_id = ? AND title LIKE '%w%' (من غير تطبيع)
+  - fts  : search_items (تطبيع + prefix + bm25)
+وبيطبع عدد النتايج لكل واحدة (LIKE بيفوّت "الإجتماع" لما تدور على "اجتماع" مثلًا).
+
+التشغيل:
+    python benchmarks/bench_search.py [--tasks 100000] [--users 200] [--repeat 50]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from database import init_db, search_items
+
+WORDS = [
+    "اجتماع", "الإجتماع", "مُراجعة", "مراجعه", "التقرير", "تقرير", "الدكتور", "دكتور",
+    "اشتري", "عيش", "لبن", "هدية", "هديه", "المدرسة", "مدرسه", "فاتورة", "الكهربا",
+    "ماما", "أحمد", "احمد", "الجيم", "مذاكرة", "امتحان", "السفر", "تذكرة",
+    "meeting", "report", "gym", "call", "invoice", "team", "doctor",
+]
+# كلام "عادي" كتير (حروف عشوائية) عشان الكلمات اللي بندور عليها تبقى نادرة زي الواقع
+_LETTERS = "ابتثجحخدذرزسشصضطظعغفقكلمنهوي"
+QUERIES = ["اجتماع", "مدرسة", "احمد", "تقرير الدكتور", "meet", "فاتوره الكهربا", "مش موجود"]
+
+
+def seed(path: str, tasks: int, users: int, heavy: int) -> None:
+    rng = random.Random(7)
+    filler = ["".join(rng.choices(_LETTERS, k=rng.randint(3, 7))) for _ in range(20_000)]
+    rows = []
+    for i in range(tasks):
+        uid = heavy if i % 4 == 0 else rng.randrange(users)
+        words = rng.choices(filler, k=rng.randint(2, 6))
+        if rng.random() < 0.2:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(WORDS))
+        title = " ".join(words)
+        rows.append((uid, title, rng.random() < 0.7))
+    with sqlite3.connect(path) as db:
+        db.execute("INSERT OR IGNORE INTO users (user_id) VALUES (?)", (heavy,))
+        db.executemany("INSERT INTO tasks (user_id, title, is_done) VALUES (?, ?, ?)", rows)
+        db.executemany(
+            "INSERT INTO reminders (user_id, text, interval_mins, next_fire) VALUES (?, ?, 60, '')",
+            [(heavy, " ".join(rng.sample(WORDS, 2))) for _ in range(200)],
+        )
+
+
+def like_search(path: str, uid: int, query: str, limit: int = 20) -> list:
+    with sqlite3.connect(path) as db:
+        sql = "SELECT id, title FROM tasks WHERE user_id = ?"
+        words = query.split()
+        sql += "".join(" AND title LIKE ?" for _ in words) + " LIMIT ?"
+        return db.execute(sql, (uid, *(f"%{w}%" for w in words), limit)).fetchall()
+
+
+def pct(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)] * 1e3
+
+
+async def run(args) -> None:
+    await init_db()
+    t0 = time.perf_counter()
+    seed(database.DB_PATH, args.tasks, args.users, heavy=args.users)
+    print(f"seeded {args.tasks} tasks (+ FTS triggers) in {time.perf_counter() - t0:.1f}s; "
+          f"heavy user has ~{args.tasks // 4} tasks\n")
+
+    uid = args.users
+    print(f"{'query':<18} {'like p50':>9} {'p99':>7} {'hits':>5}   {'fts p50':>8} {'p99':>7} {'hits':>5}  (ms)")
+    for q in QUERIES:
+        like_t, fts_t = [], []
+        for _ in range(args.repeat):
+            t = time.perf_counter()
+            like_hits = like_search(database.DB_PATH, uid, q)
+            like_t.append(time.perf_counter() - t)
+            t = time.perf_counter()
+            fts_hits = await search_items(uid, q)
+            fts_t.append(time.perf_counter() - t)
+        print(
+            f"{q:<18} {pct(like_t, .5):9.2f} {pct(like_t, .99):7.2f} {len(like_hits):5d}   "
+            f"{pct(fts_t, .5):8.2f} {pct(fts_t, .99):7.2f} {len(fts_hits):5d}"
+        )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tasks", type=int, default=100_000)
+    ap.add_argument("--users", type=int, default=200)
+    ap.add_argument("--repeat", type=int, default=50)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_PATH = os.path.join(tmp, "bench.db")
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+benchmarks/bench_session.py – throughput لـ send_message على Bot API محلي وهمي
+
+التشغيل:
+    python benchmarks/bench_session.py [--requests 2000] [--concurrency 50] [--latency 0.02]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+
+from session import TunedAiohttpSession
+
+TOKEN = "123456:TEST-benchmark-token"
+
+
+def make_app(latency: float) -> web.Application:
+    """Bot API وهمي: كل sendMessage بيرجع بعد latency ثانية"""
+    counter = {"id": 0}
+
+    async def send_message(request: web.Request) -> web.Response:
+        form = await request.post()
+        await asyncio.sleep(latency)
+        counter["id"] += 1
+        result = {
+            "message_id": counter["id"],
+            "date": int(time.time()),
+            "chat": {"id": int(form["chat_id"]), "type": "private"},
+            "text": form["text"],
+        }
+        return web.Response(
+            text=json.dumps({"ok": True, "result": result}),
+            content_type="application/json",
+        )
+
+    app = web.Application()
+    app.router.add_post(f"/bot{TOKEN}/sendMessage", send_message)
+    return app
+
+
+def serve(port: int, latency: float) -> None:
+    """السيرفر الوهمي في بروسيس منفصل عشان ما يشاركش الـ CPU مع الـ client"""
+    web.run_app(make_app(latency), host="127.0.0.1", port=port, print=None, access_log=None)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def wait_ready(port: int) -> None:
+    for _ in range(100):
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.05)
+    raise RuntimeError("stand-in Bot API server did not start")
+
+
+async def run(session, base: str, n: int, concurrency: int) -> float:
+    bot = Bot(TOKEN, session=session)
+    session.api = TelegramAPIServer.from_base(base)
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with sem:
+            await bot.send_message(1000 + i % 50, f"تذكير #{i}")
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n)))
+    elapsed = time.perf_counter() - t0
+    await bot.session.close()
+    return elapsed
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--concurrency", type=int, default=50)
+    ap.add_argument("--latency", type=float, default=0.02)
+    args = ap.parse_args()
+
+    port = free_port()
+    server = multiprocessing.Process(target=serve, args=(port, args.latency), daemon=True)
+    server.start()
+    await wait_ready(port)
+    base = f"http://127.0.0.1:{port}"
+
+    for name, session in (
+        ("default AiohttpSession", AiohttpSession()),
+        ("TunedAiohttpSession", TunedAiohttpSession(pool_per_host=args.concurrency)),
+    ):
+        elapsed = await run(session, base, args.requests, args.concurrency)
+        print(f"{name:<24} {args.requests / elapsed:8.0f} msg/s  ({elapsed:.2f}s)")
+
+    print("connection stats:", TunedAiohttpSession.stats())
+    server.terminate()
+    server.join()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,173 @@
+"""
+benchmarks/bench_startup.py – الـ cold start: زمن الـ import لكل module + من التشغيل لحد أول polling
+
+Render free tier بيطفي الـ worker ويرجّعه، فالـ cold start بيفرق مع المستخدم مباشرة.
+
+1) startup profile: `python -X importtime` على main + كل الـ routers،
+   وبيطبع أتقل الـ packages (cumulative) وأتقل الـ modules (self)،
+   وبيتأكد إن dateparser مش بيتحمّل وقت الـ import (بيتحمّل أول ما يتطلب).
+2) import → أول polling: بيشغّل `python main.py` في بروسيس جديد قدام Bot API وهمي
+   (BOT_API_URL) و DB مؤقتة، ويقيس من التشغيل لحد أول getUpdates.
+
+لو الـ median عدّى الـ budget (أو dateparser اتحمّل وقت الـ import) → exit code 1.
+
+التشغيل:
+    python benchmarks/bench_startup.py [--runs 3] [--budget 8.0] [--top 15]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+from aiohttp import web
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOKEN = "123456:TEST-benchmark-token"
+
+# زي اللي main() بيعمله قبل الـ polling
+IMPORTS = (
+    "import main, handlers.premium, handlers.start, handlers.add_task, "
+    "handlers.list_tasks, handlers.callbacks, handlers.reminder, handlers.admin, handlers.search, "
+    "middlewares.throttling, middlewares.tracing, parse_pool"
+)
+# modules تقيلة مش المفروض تتحمّل قبل أول استخدام
+DEFERRED = ("dateparser",)
+
+
+def child_env(**extra: str) -> dict[str, str]:
+    env = dict(os.environ, BOT_TOKEN=TOKEN, METRICS_PORT="0", PYTHONDONTWRITEBYTECODE="1")
+    env.update(extra)
+    return env
+
+
+# ══════════════════════════════════════════════════
+#  1) startup profile (-X importtime)
+# ══════════════════════════════════════════════════
+
+def import_profile() -> list[tuple[str, int, int, int]]:
+    """يرجع (module, self µs, cumulative µs, depth) لكل module اتحمّل"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORTS],
+        cwd=ROOT, env=child_env(), capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cum_us), depth))
+    return rows
+
+
+def print_profile(rows: list[tuple[str, int, int, int]], top: int) -> list[str]:
+    total = sum(self_us for _, self_us, _, _ in rows)
+    print(f"import profile: {len(rows)} modules, {total / 1e3:.0f} ms total")
+
+    packages: dict[str, int] = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        packages[name.split(".")[0]] += self_us
+    print(f"\n{'package':<28} {'ms':>8} {'share':>7}")
+    for pkg, us in sorted(packages.items(), key=lambda kv: -kv[1])[:top]:
+        print(f"{pkg:<28} {us / 1e3:8.1f} {us / total:7.1%}")
+
+    print(f"\n{'module (self)':<48} {'self ms':>8} {'cum ms':>8}")
+    for name, self_us, cum_us, _ in sorted(rows, key=lambda r: -r[1])[:top]:
+        print(f"{name:<48} {self_us / 1e3:8.1f} {cum_us / 1e3:8.1f}")
+
+    loaded = {name for name, _, _, _ in rows}
+    return [m for m in DEFERRED if m in loaded]
+
+
+# ══════════════════════════════════════════════════
+#  2) import → أول polling
+# ══════════════════════════════════════════════════
+
+def make_app(first_poll: asyncio.Future) -> web.Application:
+    """Bot API وهمي: deleteWebhook / getMe / getUpdates (فاضي)"""
+    results = {
+        "deleteWebhook": True,
+        "getMe": {"id": 123456, "is_bot": True, "first_name": "TelePot", "username": "telepot_bench_bot"},
+        "getUpdates": [],
+    }
+
+    async def handle(request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        if method == "getUpdates":
+            if not first_poll.done():
+                first_poll.set_result(time.perf_counter())
+            await asyncio.sleep(0.5)
+        return web.Response(
+            text=json.dumps({"ok": True, "result": results.get(method, True)}),
+            content_type="application/json",
+        )
+
+    app = web.Application()
+    app.router.add_post(f"/bot{TOKEN}/{{method}}", handle)
+    return app
+
+
+async def time_to_first_poll(timeout: float) -> float:
+    first_poll = asyncio.get_running_loop().create_future()
+    runner = web.AppRunner(make_app(first_poll), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = child_env(
+            BOT_API_URL=f"http://127.0.0.1:{port}",
+            DB_PATH=os.path.join(tmp, "bot.db"),
+        )
+        t0 = time.perf_counter()
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, "main.py", cwd=ROOT, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            return await asyncio.wait_for(first_poll, timeout) - t0
+        finally:
+            proc.terminate()
+            await proc.wait()
+            await runner.cleanup()
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--budget", type=float, default=float(os.getenv("STARTUP_BUDGET", "8.0")),
+                    help="أقصى median بالثواني من التشغيل لأول polling (0 = من غير gate)")
+    ap.add_argument("--top", type=int, default=15)
+    args = ap.parse_args()
+
+    eager = print_profile(import_profile(), args.top)
+
+    times = [asyncio.run(time_to_first_poll(timeout=60.0)) for _ in range(args.runs)]
+    median = statistics.median(times)
+    print(
+        f"\nstart → first getUpdates: median {median:.2f}s  "
+        f"(min {min(times):.2f}s, max {max(times):.2f}s, {args.runs} runs)"
+    )
+
+    problems = []
+    if eager:
+        problems.append(f"loaded at import time (should be deferred): {', '.join(eager)}")
+    if args.budget and median > args.budget:
+        problems.append(f"startup median {median:.2f}s > budget {args.budget:.2f}s")
+    for p in problems:
+        print(f"REGRESSION {p}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+"""
+benchmarks/bench_text_analysis.py – text_analysis: مطابقة مع الدوال القديمة + throughput
+
+بيشغّل parse_reminder_message و parse_interval_input الجديدة (text_analysis.py)
+والقديمة (سلسلة re.search / re.match) على نفس الـ corpus:
+  - حالات reminder/interval من parse_corpus.json + توليفات عشوائية
+  - الفترات لازم تطابق القديم بالظبط (exit code 1 لو لأ)
+  - رسائل ذكرني: الاختلافات بتتطبع مع المتوقع من الـ corpus لو موجود
+  - رسائل/ثانية لكل نسخة
+
+التشغيل:
+    python benchmarks/bench_text_analysis.py [--fuzz 5000] [--repeat 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_analysis import ARABIC_DIGIT_MAP, parse_interval_input, parse_reminder_message
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# ══════════════════════════════════════════════════
+#  النسخة القديمة (handlers/reminder.py قبل text_analysis)
+# ══════════════════════════════════════════════════
+
+def legacy_parse_reminder_message(text: str) -> tuple[str, int] | None:
+    """
+    تحليل رسالة ذكرني مباشرة:
+    "ذكرني بالاستغفار كل 5 دقايق" → ("الاستغفار", 5)
+    "ذكرني اشرب ماء كل ساعة" → ("اشرب ماء", 60)
+    "ذكرني كل ساعتين اشرب ماء" → ("اشرب ماء", 120)
+    "remind me to drink water every 30 minutes" → ("drink water", 30)
+    """
+    s = text.translate(ARABIC_DIGIT_MAP).strip()
+
+    # ─── Arabic patterns (فصحى + مصري) ───
+    verb = r"(?:ذكر|فكر|نبه)(?:ني|نى)"
+
+    # "ذكرني بـ<text> كل <N> <unit>"
+    m = re.search(
+        rf"{verb}\s+(?:ب|بال|بأ|بإ|بان|بالـ|إن(?:ي|ى)\s+)?(.+?)\s+كل\s+(.+)",
+        s,
+    )
+    if m:
+        reminder_text = m.group(1).strip()
+        interval = legacy_parse_arabic_interval(m.group(2).strip())
+        if interval and reminder_text:
+            return reminder_text, interval
+
+    # "ذكرني كل <N> <unit> <text>"
+    m = re.search(
+        rf"{verb}\s+كل\s+(.+?)\s+([\u0600-\u06FF\w].+)",
+        s,
+    )
+    if m:
+        interval = legacy_parse_arabic_interval(m.group(1).strip())
+        reminder_text = m.group(2).strip()
+        if interval and reminder_text:
+            return reminder_text, interval
+
+    # "ذكرني <text> كل <N> <unit>" (بدون باء)
+    m = re.search(
+        rf"{verb}\s+(.+?)\s+كل\s+(.+)",
+        s,
+    )
+    if m:
+        reminder_text = m.group(1).strip()
+        interval = legacy_parse_arabic_interval(m.group(2).strip())
+        if interval and reminder_text:
+            return reminder_text, interval
+
+    # ─── English patterns ───
+
+    # "remind me to <text> every <N> <unit>"
+    m = re.search(
+        r"remind\s+me\s+(?:to\s+)?(.+?)\s+every\s+(.+)",
+        s, re.IGNORECASE,
+    )
+    if m:
+        reminder_text = m.group(1).strip()
+        interval = legacy_parse_english_interval(m.group(2).strip())
+        if interval and reminder_text:
+            return reminder_text, interval
+
+    return None
+
+
+def legacy_parse_arabic_interval(s: str) -> int | None:
+    """تحليل فترة عربية (مصري + فصحى) → دقائق"""
+    s = s.translate(ARABIC_DIGIT_MAP).strip()
+
+    # "5 دقايق" / "10 دقائق" / "دقيقة" / "5 دقيقه"
+    m = re.match(r"(\d+)\s*(?:دقيق[ةه]|دقايق|دقائق|دقيق|دق)", s)
+    if m:
+        return int(m.group(1))
+
+    # "دقيقة" / "دقيقتين"
+    if re.match(r"دقيق(?:ه|ة|تين)", s):
+        return 2 if "تين" in s else 1
+
+    # "X ساعه/ساعة/ساعات"
+    m = re.match(r"(\d+)\s*(?:ساع[ةه]|ساعات)", s)
+    if m:
+        return int(m.group(1)) * 60
+
+    # "ساعة" / "ساعتين"
+    if re.match(r"^ساع[ةه]$", s):
+        return 60
+    if s == "ساعتين":
+        return 120
+
+    # "نص ساعه" / "نصف ساعة"
+    if re.match(r"نص(?:ف)?\s*ساع[ةه]", s):
+        return 30
+
+    # "ربع ساعة"
+    if re.match(r"ربع\s*ساع[ةه]", s):
+        return 15
+
+    # "تلت ساعة" (ثلث ساعة = 20 دقيقة)
+    if re.match(r"(?:تلت|ثلث)\s*ساع[ةه]", s):
+        return 20
+
+    # "ساعة و نص" / "ساعه ونص"
+    if re.match(r"ساع[ةه]\s*و?\s*نص(?:ف)?", s):
+        return 90
+
+    # "ساعة وربع"
+    if re.match(r"ساع[ةه]\s*و?\s*ربع", s):
+        return 75
+
+    return None
+
+
+def legacy_parse_english_interval(s: str) -> int | None:
+    """تحليل فترة إنجليزية → دقائق"""
+    s = s.strip().lower()
+
+    m = re.match(r"(\d+)\s*min(?:ute)?s?", s)
+    if m:
+        return int(m.group(1))
+
+    m = re.match(r"(\d+)\s*hours?", s)
+    if m:
+        return int(m.group(1)) * 60
+
+    if s in ("hour", "an hour", "1 hour"):
+        return 60
+    if s in ("half hour", "half an hour", "30 min"):
+        return 30
+
+    return None
+
+
+def legacy_parse_interval_input(text: str) -> int | None:
+    """تحليل إدخال الفترة من المستخدم (في FSM)"""
+    s = text.translate(ARABIC_DIGIT_MAP).strip()
+
+    s = re.sub(r"^كل\s*", "", s).strip()
+    if "كل" in s:
+        s = s.split("كل", 1)[1].strip()
+    s = re.sub(r"^every\s*", "", s, flags=re.IGNORECASE).strip()
+
+    result = legacy_parse_arabic_interval(s)
+    if result:
+        return result
+
+    result = legacy_parse_english_interval(s)
+    if result:
+        return result
+
+    m = re.match(r"^(\d+)$", s)
+    if m:
+        val = int(m.group(1))
+        if val > 0:
+            return val
+
+    return None
+
+
+# ══════════════════════════════════════════════════
+#  Corpus
+# ══════════════════════════════════════════════════
+
+VERBS = ["ذكرني", "فكرني", "نبهني", "ذكرنى", "remind me to", "remind me"]
+PAYLOADS = ["بالاستغفار", "اشرب ماء", "بالدوا", "اقوم اتحرك", "drink water", "stretch", "بإني اتمشى"]
+INTERVALS = [
+    "5 دقايق", "١٠ دقائق", "دقيقة", "دقيقتين", "ساعة", "ساعتين", "3 ساعات", "نص ساعة",
+    "ربع ساعة", "تلت ساعة", "ساعة ونص", "ساعة وربع", "30 minutes", "2 hours", "hour",
+    "half an hour", "شوية", "يوم",
+]
+
+
+def fuzz_corpus(n: int, seed: int = 11) -> list[str]:
+    rnd = random.Random(seed)
+    out = []
+    for _ in range(n):
+        verb, payload, interval = rnd.choice(VERBS), rnd.choice(PAYLOADS), rnd.choice(INTERVALS)
+        every = "every" if verb.startswith("remind") else "كل"
+        if rnd.random() < 0.5:
+            out.append(f"{verb} {payload} {every} {interval}")
+        else:
+            out.append(f"{verb} {every} {interval} {payload}")
+    return out
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--fuzz", type=int, default=5000)
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    with open(os.path.join(HERE, "parse_corpus.json"), encoding="utf-8") as f:
+        cases = json.load(f)["cases"]
+    labels = {
+        c["text"]: (c["title"], c["interval"]) if c["interval"] else None
+        for c in cases if c["fn"] == "reminder"
+    }
+    messages = list(labels) + fuzz_corpus(args.fuzz)
+    intervals = [c["text"] for c in cases if c["fn"] == "interval"] + INTERVALS + [
+        f"كل {i}" for i in INTERVALS
+    ] + [f"every {i}" for i in INTERVALS]
+
+    interval_diffs = [
+        (t, legacy_parse_interval_input(t), parse_interval_input(t))
+        for t in intervals
+        if legacy_parse_interval_input(t) != parse_interval_input(t)
+    ]
+    for text, old, new in interval_diffs:
+        print(f"INTERVAL MISMATCH {text!r}: old={old} new={new}")
+
+    diffs = {}
+    for t in messages:
+        old, new = legacy_parse_reminder_message(t), parse_reminder_message(t)
+        if old != new:
+            diffs[t] = (old, new)
+    for text, (old, new) in list(diffs.items())[:20]:
+        want = f"  expected={labels[text]}" if text in labels else ""
+        print(f"DIFF {text!r}\n  old={old}\n  new={new}{want}")
+    fixed = sum(1 for t, (_, new) in diffs.items() if t in labels and new == labels[t])
+    print(
+        f"reminder: {len(messages)} messages, {len(diffs)} differ "
+        f"({fixed} now match the labelled corpus)"
+    )
+    print(f"interval: {len(intervals)} inputs, {len(interval_diffs)} mismatches")
+
+    for name, reminder, interval in (
+        ("legacy", legacy_parse_reminder_message, legacy_parse_interval_input),
+        ("grammar", parse_reminder_message, parse_interval_input),
+    ):
+        secs = timeit.timeit(lambda: [reminder(t) for t in messages], number=args.repeat)
+        isecs = timeit.timeit(lambda: [interval(t) for t in intervals], number=args.repeat)
+        print(
+            f"{name:<8} {len(messages) * args.repeat / secs:10.0f} reminder msg/s  "
+            f"{len(intervals) * args.repeat / isecs:10.0f} interval msg/s"
+        )
+    return 1 if interval_diffs else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
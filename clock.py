@@ -0,0 +1,107 @@
+"""
+clock.py – مصدر "الآن" واحد للبوت كله (بدل datetime.now(CAIRO) في كل حتة)
+- now(): datetime بتوقيت القاهرة. جوه tick (update / job بتاع الـ scheduler) نفس القيمة
+  طول العملية: حساب واحد بدل واحد لكل مهمة، وكل المقارنات على نفس اللحظة
+- tick() / ticked / ClockMiddleware (middlewares/clock.py): بيثبّتوا الـ now في contextvar
+- VirtualClock: وقت افتراضي بيتقدم بـ advance() – scheduler.simulate بيلف بيه أيام
+  في ثواني (load tests / benchmarks). use() بيركّبه بدل الساعة الحقيقية
+"""
+
+from __future__ import annotations
+
+import functools
+import time as _time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Iterator, TypeVar
+
+import pytz
+
+CAIRO = pytz.timezone("Africa/Cairo")
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+
+class Clock:
+    """الساعة الحقيقية"""
+
+    virtual = False
+
+    def now(self) -> datetime:
+        return datetime.now(CAIRO)
+
+    def time(self) -> float:
+        return _time.time()
+
+
+class VirtualClock(Clock):
+    """وقت افتراضي: ثابت لحد ما حد يقدّمه"""
+
+    virtual = True
+
+    def __init__(self, start: datetime | None = None) -> None:
+        self._t = (start or datetime.now(CAIRO)).timestamp()
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self._t, CAIRO)
+
+    def time(self) -> float:
+        return self._t
+
+    def advance(self, delta: timedelta | float) -> datetime:
+        self._t += delta.total_seconds() if isinstance(delta, timedelta) else delta
+        return self.now()
+
+    def set(self, when: datetime) -> None:
+        self._t = when.timestamp()
+
+
+_clock: Clock = Clock()
+_tick: ContextVar[datetime | None] = ContextVar("telepot_now", default=None)
+
+
+def use(clock: Clock) -> Clock:
+    """تركيب ساعة (VirtualClock للمحاكاة) → الساعة اللي كانت شغالة"""
+    global _clock
+    previous, _clock = _clock, clock
+    return previous
+
+
+def current() -> Clock:
+    return _clock
+
+
+def now() -> datetime:
+    """الآن بتوقيت القاهرة (نفس القيمة طول الـ tick الحالي)"""
+    cached = _tick.get()
+    return cached if cached is not None else _clock.now()
+
+
+def time() -> float:
+    """epoch seconds من نفس الساعة (حقيقية أو افتراضية)"""
+    return _clock.time()
+
+
+def is_virtual() -> bool:
+    return _clock.virtual
+
+
+@contextmanager
+def tick() -> Iterator[datetime]:
+    """تثبيت now() لحد آخر الـ block"""
+    token = _tick.set(_clock.now())
+    try:
+        yield _tick.get()
+    finally:
+        _tick.reset(token)
+
+
+def ticked(func: F) -> F:
+    """decorator لـ job: الـ job كلها بتشوف نفس الـ now()"""
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with tick():
+            return await func(*args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
@@ -1,21 +1,38 @@
 """
 database.py – SQLite async layer (aiosqlite)
 جداول: users + tasks + reminders (تذكيرات متكررة كل X دقيقة)
++ payments (سجل المدفوعات) + stats (إجماليات بتتحدث بالـ triggers)
++ tasks_fts / reminders_fts: بحث FTS5 متزامن بالـ triggers
 """
 
 import aiosqlite
+import logging
 import os
+import re
+import sqlite3
 from datetime import datetime, timedelta
 
 import pytz
 
-DB_PATH = os.path.join(os.path.dirname(__file__), "bot.db")
+import clock
+from models import Reminder, Task, User
+from text_analysis import AR_CHAR, FOLD_PAIRS, fold_arabic
+from tracing import traced_db
+
+log = logging.getLogger(__name__)
+
+DB_PATH = os.getenv("DB_PATH", os.path.join(os.path.dirname(__file__), "bot.db"))
 CAIRO = pytz.timezone("Africa/Cairo")
 
 # ─── الحد الأقصى للمهام للمستخدم المجاني ───
 FREE_TASK_LIMIT = 15
 FREE_REMINDER_LIMIT = 3
 
+# ─── الصفوف → models.py (Task / Reminder / User) بدل dict(row) ───
+_task_row = Task.row_factory()
+_reminder_row = Reminder.row_factory()
+_user_row = User.row_factory()
+
 
 async def init_db() -> None:
     """إنشاء الجداول إذا لم تكن موجودة"""
@@ -26,9 +43,14 @@ async def init_db() -> None:
                 username   TEXT,
                 is_premium INTEGER DEFAULT 0,
                 sub_end    TEXT,          -- ISO-format datetime (Cairo)
+                warned_end TEXT,          -- sub_end اللي اتبعت عنه تنبيه قرب الانتهاء
                 created_at TEXT DEFAULT (datetime('now'))
             )
         """)
+        # DB قديمة من قبل warned_end
+        async with db.execute("PRAGMA table_info(users)") as cur:
+            if "warned_end" not in {row[1] for row in await cur.fetchall()}:
+                await db.execute("ALTER TABLE users ADD COLUMN warned_end TEXT")
         await db.execute("""
             CREATE TABLE IF NOT EXISTS tasks (
                 id          INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -54,13 +76,201 @@ async def init_db() -> None:
                 FOREIGN KEY (user_id) REFERENCES users(user_id)
             )
         """)
+        # ── indexes للصفحات (keyset): الصفحة بتبدأ من الـ cursor على طول ──
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_user_open "
+            "ON tasks(user_id, is_done, IFNULL(due, ''), id)"
+        )
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_user_due "
+            "ON tasks(user_id, IFNULL(due, ''), id)"
+        )
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_reminders_user_active "
+            "ON reminders(user_id, is_active, id)"
+        )
+        # ── مواعيد انتهاء الاشتراكات (expiry.py بيحمّلها مرة عند التشغيل) ──
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_users_premium_end ON users(is_premium, sub_end)"
+        )
+        await _init_payments(db)
+        await _init_search(db)
         await db.commit()
 
 
+# ══════════════════════════════════════════════════
+#  المدفوعات + الإحصائيات
+#  payments: صف لكل عملية دفع، telegram_payment_charge_id هو المفتاح
+#  (نفس الـ successful_payment لو وصل مرتين → مرة واحدة بس)
+#  stats: name → value، بتتحدث بالـ triggers مع كل دفع / تغيير is_premium،
+#  فـ /stats بيقرا صفوف معدودة ومش بيلف على payments أو users
+# ══════════════════════════════════════════════════
+
+async def _init_payments(db: aiosqlite.Connection) -> None:
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS payments (
+            charge_id   TEXT    PRIMARY KEY,   -- telegram_payment_charge_id
+            user_id     INTEGER NOT NULL,
+            amount      INTEGER NOT NULL,
+            currency    TEXT    NOT NULL,
+            days        INTEGER NOT NULL,
+            sub_start   TEXT    NOT NULL,      -- ISO-format: المدة دي بدأت منين
+            sub_end     TEXT    NOT NULL,      -- ISO-format: sub_end بعد الدفع ده
+            created_at  TEXT DEFAULT (datetime('now')),
+            FOREIGN KEY (user_id) REFERENCES users(user_id)
+        ) WITHOUT ROWID
+    """)
+    await db.execute(
+        "CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL) WITHOUT ROWID"
+    )
+    # أول مرة بس (DB قديمة): القيم من الجداول نفسها، بعد كده الـ triggers
+    await db.execute(
+        "INSERT OR IGNORE INTO stats (name, value) "
+        "SELECT 'active_subscribers', COUNT(*) FROM users WHERE is_premium = 1"
+    )
+    await db.execute(
+        "INSERT OR IGNORE INTO stats (name, value) SELECT 'payments', COUNT(*) FROM payments"
+    )
+    await db.execute(
+        "INSERT OR IGNORE INTO stats (name, value) "
+        "SELECT 'revenue_' || currency, SUM(amount) FROM payments GROUP BY currency"
+    )
+    await db.executescript("""
+        CREATE TRIGGER IF NOT EXISTS payments_stats_ai AFTER INSERT ON payments BEGIN
+            INSERT INTO stats (name, value) VALUES ('payments', 1), ('revenue_' || new.currency, new.amount)
+            ON CONFLICT (name) DO UPDATE SET value = value + excluded.value;
+        END;
+        CREATE TRIGGER IF NOT EXISTS users_stats_ai AFTER INSERT ON users WHEN new.is_premium = 1 BEGIN
+            UPDATE stats SET value = value + 1 WHERE name = 'active_subscribers';
+        END;
+        CREATE TRIGGER IF NOT EXISTS users_stats_au AFTER UPDATE OF is_premium ON users
+        WHEN new.is_premium IS NOT old.is_premium BEGIN
+            UPDATE stats SET value = value + (CASE WHEN new.is_premium = 1 THEN 1 ELSE -1 END)
+            WHERE name = 'active_subscribers';
+        END;
+        CREATE TRIGGER IF NOT EXISTS users_stats_ad AFTER DELETE ON users WHEN old.is_premium = 1 BEGIN
+            UPDATE stats SET value = value - 1 WHERE name = 'active_subscribers';
+        END;
+    """)
+
+
+@traced_db
+async def get_stats() -> dict[str, int]:
+    """الإجماليات: active_subscribers، payments، revenue_<currency>"""
+    async with aiosqlite.connect(DB_PATH) as db:
+        async with db.execute("SELECT name, value FROM stats") as cur:
+            return {name: value for name, value in await cur.fetchall()}
+
+
+# ══════════════════════════════════════════════════
+#  البحث (FTS5)
+#  tasks_fts / reminders_fts: rowid = id المهمة/التذكير، body = النص بعد fold_arabic،
+#  owner = "u<user_id>" (indexed عشان الـ MATCH يتقاطع مع مستخدم واحد بس)
+# ══════════════════════════════════════════════════
+
+SEARCH_AVAILABLE = True
+_FTS_SOURCES = {"tasks_fts": ("tasks", "title"), "reminders_fts": ("reminders", "text")}
+
+
+def _fold_sql(expr: str) -> str:
+    """fold_arabic كـ SQL (replace متداخلة) للـ triggers"""
+    for src, dst in FOLD_PAIRS:
+        expr = f"replace({expr}, '{src}', '{dst}')"
+    return expr
+
+
+async def _init_search(db: aiosqlite.Connection) -> None:
+    global SEARCH_AVAILABLE
+    for fts, (table, column) in _FTS_SOURCES.items():
+        async with db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts,)
+        ) as cur:
+            exists = await cur.fetchone() is not None
+        try:
+            await db.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} "
+                "USING fts5(body, owner, tokenize = 'unicode61 remove_diacritics 2')"
+            )
+        except sqlite3.OperationalError as e:
+            # SQLite متبني من غير FTS5 → البوت يشتغل عادي من غير بحث
+            SEARCH_AVAILABLE = False
+            log.warning("FTS5 unavailable, search disabled: %s", e)
+            return
+        body = _fold_sql(f"new.{column}")
+        await db.executescript(f"""
+            CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts} (rowid, body, owner) VALUES (new.id, {body}, 'u' || new.user_id);
+            END;
+            CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+                DELETE FROM {fts} WHERE rowid = old.id;
+            END;
+            CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {column}, user_id ON {table} BEGIN
+                UPDATE {fts} SET body = {body}, owner = 'u' || new.user_id WHERE rowid = new.id;
+            END;
+        """)
+        if not exists:
+            # أول مرة: index للصفوف اللي كانت موجودة قبل الـ triggers
+            await db.execute(
+                f"INSERT INTO {fts} (rowid, body, owner) "
+                f"SELECT id, {_fold_sql(column)}, 'u' || user_id FROM {table}"
+            )
+
+
+_WORD_RE = re.compile(r"\w+")
+_AR_WORD_RE = re.compile(AR_CHAR)
+SEARCH_MAX_TERMS = 8
+
+
+def _match_query(user_id: int, query: str) -> str | None:
+    """
+    نص المستخدم → FTS5 MATCH: كل كلمة prefix، وكلهم لازم يتلاقوا (AND).
+    الكلمة من غير "ال" بتلاقي اللي بـ "ال" كمان ("اجتماع" → "الاجتماع").
+    """
+    words = _WORD_RE.findall(fold_arabic(query).lower())[:SEARCH_MAX_TERMS]
+    if not words:
+        return None
+    return f"owner:u{user_id} AND body:({' AND '.join(_match_term(w) for w in words)})"
+
+
+def _match_term(word: str) -> str:
+    if word.startswith("ال") or not _AR_WORD_RE.match(word):
+        return f'"{word}"*'
+    return f'("{word}"* OR "ال{word}"*)'
+
+
+@traced_db
+async def search_items(user_id: int, query: str, limit: int = 20) -> list[dict]:
+    """
+    بحث في مهام وتذكيرات المستخدم بترتيب bm25 (النشط الأول).
+    كل صف: kind ("task" | "reminder")، id، text، due، interval_mins، inactive
+    """
+    match = _match_query(user_id, query)
+    if match is None or not SEARCH_AVAILABLE:
+        return []
+    async with aiosqlite.connect(DB_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute(
+            """SELECT 'task' AS kind, t.id, t.title AS text, t.due, NULL AS interval_mins,
+                      t.is_done AS inactive, bm25(tasks_fts) AS score
+               FROM tasks_fts JOIN tasks t ON t.id = tasks_fts.rowid
+               WHERE tasks_fts MATCH ?
+               UNION ALL
+               SELECT 'reminder', r.id, r.text, NULL, r.interval_mins,
+                      1 - r.is_active, bm25(reminders_fts)
+               FROM reminders_fts JOIN reminders r ON r.id = reminders_fts.rowid
+               WHERE reminders_fts MATCH ?
+               ORDER BY inactive, score
+               LIMIT ?""",
+            (match, match, limit),
+        ) as cur:
+            return [dict(r) for r in await cur.fetchall()]
+
+
 # ══════════════════════════════════════════════════
 #  User helpers
 # ══════════════════════════════════════════════════
 
+@traced_db
 async def ensure_user(user_id: int, username: str | None = None) -> None:
     """تسجيل المستخدم إذا لم يكن موجودًا"""
     async with aiosqlite.connect(DB_PATH) as db:
@@ -71,91 +281,158 @@ async def ensure_user(user_id: int, username: str | None = None) -> None:
         await db.commit()
 
 
+@traced_db
 async def is_premium(user_id: int) -> bool:
-    """هل المستخدم premium (ولم ينتهِ اشتراكه)؟"""
+    """
+    هل المستخدم premium (ولم ينتهِ اشتراكه)؟
+    read بس: is_premium = 0 بيتكتب في expiry.py في ميعاد الانتهاء بالظبط،
+    والشرط على sub_end هنا بيغطي الثواني لحد ما يحصل.
+    """
     async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+        db.row_factory = _user_row
         async with db.execute(
             "SELECT is_premium, sub_end FROM users WHERE user_id = ?",
             (user_id,),
         ) as cur:
-            row = await cur.fetchone()
-            if not row or not row["is_premium"]:
+            user = await cur.fetchone()
+            if not user or not user.is_premium:
                 return False
-            if row["sub_end"]:
-                end = datetime.fromisoformat(row["sub_end"])
-                if end < datetime.now(CAIRO):
-                    # الاشتراك انتهى – نرجّع False ونحدّث
-                    await db.execute(
-                        "UPDATE users SET is_premium = 0 WHERE user_id = ?",
-                        (user_id,),
-                    )
-                    await db.commit()
-                    return False
+            if user.sub_end:
+                return user.sub_end_at >= clock.now()
             return True
 
 
-async def update_premium(user_id: int, days: int = 30) -> None:
-    """تفعيل Premium لمدة days يوم"""
-    sub_end = (datetime.now(CAIRO) + timedelta(days=days)).isoformat()
+@traced_db
+async def activate_premium(
+    user_id: int, charge_id: str, amount: int, currency: str, days: int = 30,
+) -> datetime | None:
+    """
+    تسجيل الدفع + تفعيل/تمديد Premium في transaction واحدة → sub_end الجديد (لـ expiry.watch)
+    - المدة بتتضاف من max(now, sub_end): التجديد قبل الانتهاء ما بيضيّعش الأيام الباقية
+    - charge_id اتسجل قبل كده (نفس الـ update اتبعت تاني) → None ومفيش أي تغيير
+    """
+    now = clock.now()
     async with aiosqlite.connect(DB_PATH) as db:
+        # IMMEDIATE: الـ write lock من الأول، فدفعتين لنفس المستخدم ما يقروش نفس sub_end
+        await db.execute("BEGIN IMMEDIATE")
+        async with db.execute(
+            "SELECT is_premium, sub_end FROM users WHERE user_id = ?", (user_id,)
+        ) as cur:
+            row = await cur.fetchone()
+        start = now
+        if row and row[0] and row[1]:
+            start = max(now, datetime.fromisoformat(row[1]))
+        sub_end = (start + timedelta(days=days)).astimezone(CAIRO)  # offset الصيفي/الشتوي الصح
+
+        async with db.execute(
+            """INSERT INTO payments (charge_id, user_id, amount, currency, days, sub_start, sub_end)
+               VALUES (?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT (charge_id) DO NOTHING
+               RETURNING charge_id""",
+            (charge_id, user_id, amount, currency, days, start.isoformat(), sub_end.isoformat()),
+        ) as cur:
+            if await cur.fetchone() is None:
+                await db.rollback()
+                return None
         await db.execute(
-            "UPDATE users SET is_premium = 1, sub_end = ? WHERE user_id = ?",
-            (sub_end, user_id),
+            """INSERT INTO users (user_id, is_premium, sub_end) VALUES (?, 1, ?)
+               ON CONFLICT (user_id) DO UPDATE SET is_premium = 1, sub_end = excluded.sub_end""",
+            (user_id, sub_end.isoformat()),
         )
         await db.commit()
+    return sub_end
 
 
-async def get_subscription_info(user_id: int) -> dict | None:
+@traced_db
+async def get_subscription_info(user_id: int) -> User | None:
     """إرجاع معلومات اشتراك المستخدم"""
     async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+        db.row_factory = _user_row
         async with db.execute(
             "SELECT is_premium, sub_end, created_at FROM users WHERE user_id = ?",
             (user_id,),
         ) as cur:
             row = await cur.fetchone()
-            return dict(row) if row else None
+            return row
 
 
-async def get_premium_users() -> list[dict]:
+@traced_db
+async def get_premium_users() -> list[User]:
     """إرجاع كل المستخدمين الـ premium الفعالين"""
     async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        now_iso = datetime.now(CAIRO).isoformat()
+        db.row_factory = _user_row
+        now_iso = clock.now().isoformat()
         async with db.execute(
-            "SELECT user_id FROM users WHERE is_premium = 1 AND sub_end > ?",
+            "SELECT user_id FROM users WHERE is_premium = 1 AND julianday(sub_end) > julianday(?)",
             (now_iso,),
         ) as cur:
-            rows = await cur.fetchall()
-            return [dict(r) for r in rows]
+            return await cur.fetchall()
 
 
-async def check_expired_subscriptions() -> list[int]:
-    """إرجاع وتحديث المستخدمين اللي اشتراكهم انتهى"""
+# ─── انتهاء الاشتراكات (expiry.py) ───
+
+@traced_db
+async def get_subscription_ends() -> list[User]:
+    """كل الاشتراكات اللي ليها نهاية: user_id، sub_end، warned_end (من idx_users_premium_end)"""
     async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        now_iso = datetime.now(CAIRO).isoformat()
+        db.row_factory = _user_row
         async with db.execute(
-            "SELECT user_id FROM users WHERE is_premium = 1 AND sub_end <= ?",
-            (now_iso,),
+            "SELECT user_id, sub_end, warned_end FROM users "
+            "WHERE is_premium = 1 AND sub_end IS NOT NULL",
         ) as cur:
-            rows = await cur.fetchall()
-            expired = [r["user_id"] for r in rows]
-        if expired:
-            placeholders = ",".join("?" * len(expired))
-            await db.execute(
-                f"UPDATE users SET is_premium = 0 WHERE user_id IN ({placeholders})",
-                expired,
-            )
-            await db.commit()
+            return await cur.fetchall()
+
+
+# الـ (user_id, sub_end) بالظبط مش "sub_end <= now": اللي جدّد في الوقت ده sub_end بتاعه
+# اتغيّر فمش هيتلمس، ومفيش مقارنة نصوص ISO بـ offset مختلف (+02:00 / +03:00 في الصيفي)
+def _pairs_sql(n: int) -> str:
+    return ", ".join("(?, ?)" for _ in range(n))
+
+
+@traced_db
+async def expire_subscriptions(due: list[tuple[int, str]]) -> list[int]:
+    """is_premium = 0 لـ [(user_id, sub_end)] اللي ميعادهم جه → user_ids اللي اتلغت فعلًا"""
+    if not due:
+        return []
+    async with aiosqlite.connect(DB_PATH) as db:
+        async with db.execute(
+            f"""UPDATE users SET is_premium = 0
+                WHERE is_premium = 1 AND (user_id, sub_end) IN (VALUES {_pairs_sql(len(due))})
+                RETURNING user_id""",
+            [v for pair in due for v in pair],
+        ) as cur:
+            expired = [row[0] for row in await cur.fetchall()]
+        await db.commit()
         return expired
 
 
+@traced_db
+async def mark_expiry_warned(due: list[tuple[int, str]]) -> list[User]:
+    """
+    تسجيل إن التنبيه اتبعت لـ sub_end ده (مرة واحدة لكل اشتراك، حتى بعد restart)
+    → [User(user_id, sub_end)] اللي لسه محتاجين تنبيه
+    """
+    if not due:
+        return []
+    async with aiosqlite.connect(DB_PATH) as db:
+        db.row_factory = _user_row
+        async with db.execute(
+            f"""UPDATE users SET warned_end = sub_end
+                WHERE is_premium = 1 AND IFNULL(warned_end, '') != sub_end
+                  AND (user_id, sub_end) IN (VALUES {_pairs_sql(len(due))})
+                RETURNING user_id, sub_end""",
+            [v for pair in due for v in pair],
+        ) as cur:
+            warned = await cur.fetchall()
+        await db.commit()
+        return warned
+
+
 # ══════════════════════════════════════════════════
 #  Task helpers
 # ══════════════════════════════════════════════════
 
+@traced_db
 async def count_tasks(user_id: int) -> int:
     """عدد المهام النشطة (غير المنتهية)"""
     async with aiosqlite.connect(DB_PATH) as db:
@@ -167,6 +444,7 @@ async def count_tasks(user_id: int) -> int:
             return row[0] if row else 0
 
 
+@traced_db
 async def add_task(
     user_id: int,
     title: str,
@@ -184,10 +462,47 @@ async def add_task(
         return cur.lastrowid
 
 
-async def get_tasks(user_id: int, include_done: bool = False) -> list[dict]:
+# ─── إضافة بحد المجاني في statement واحد ───
+# الـ INSERT ... SELECT ... WHERE بيتنفذ كله جوه الـ write lock، فإضافتين في نفس
+# اللحظة ما يعدّوش الحد مع بعض (مفيش فجوة بين الـ check والـ insert)،
+# وهي round trip واحدة بدل is_premium + count + insert.
+# premium = نفس شرط is_premium(): is_premium = 1 والاشتراك ما انتهاش
+# julianday بيحوّل الـ offset لـ UTC: مقارنة النص مباشرة بتغلط لما +02/+03 يختلفوا
+_PREMIUM_ACTIVE = (
+    "EXISTS (SELECT 1 FROM users WHERE user_id = :uid AND is_premium = 1"
+    " AND (sub_end IS NULL OR julianday(sub_end) >= julianday(:now)))"
+)
+
+
+@traced_db
+async def add_task_limited(
+    user_id: int,
+    title: str,
+    due: datetime | None = None,
+    recurrence: str | None = None,
+    limit: int = FREE_TASK_LIMIT,
+) -> int | None:
+    """زي add_task بس لو المستخدم مجاني وعنده limit مهمة نشطة → None ومفيش إضافة"""
+    async with aiosqlite.connect(DB_PATH) as db:
+        cur = await db.execute(
+            f"""INSERT INTO tasks (user_id, title, due, recurrence)
+                SELECT :uid, :title, :due, :recurrence
+                WHERE {_PREMIUM_ACTIVE}
+                   OR (SELECT COUNT(*) FROM tasks WHERE user_id = :uid AND is_done = 0) < :limit""",
+            {
+                "uid": user_id, "title": title, "due": due.isoformat() if due else None,
+                "recurrence": recurrence, "now": clock.now().isoformat(), "limit": limit,
+            },
+        )
+        await db.commit()
+        return cur.lastrowid if cur.rowcount else None
+
+
+@traced_db
+async def get_tasks(user_id: int, include_done: bool = False) -> list[Task]:
     """جلب مهام المستخدم"""
     async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+        db.row_factory = _task_row
         if include_done:
             query = "SELECT * FROM tasks WHERE user_id = ? ORDER BY due ASC"
             params = (user_id,)
@@ -195,10 +510,86 @@ async def get_tasks(user_id: int, include_done: bool = False) -> list[dict]:
             query = "SELECT * FROM tasks WHERE user_id = ? AND is_done = 0 ORDER BY due ASC"
             params = (user_id,)
         async with db.execute(query, params) as cur:
+            return await cur.fetchall()
+
+
+# ─── keyset pagination لقائمة المهام ───
+# الترتيب: due (اللي من غير موعد الأول، زي ORDER BY due) وبعدين id
+# cursor = (op, due, id): ">" الصفحة اللي بعده، "<" اللي قبله، ">=" نفس الصفحة من أولها
+TASK_CURSOR_OPS = (">", "<", ">=")
+TASK_COLUMNS = frozenset(
+    {"id", "user_id", "title", "due", "recurrence", "is_done", "reminded", "created_at"}
+)
+TASK_LIST_COLUMNS = ("id", "title", "due", "recurrence", "is_done")
+_TASK_KEY = "IFNULL(due, '')"   # ترتيب الـ cursor بس (نص)
+# متأخرة = موعدها فات: julianday زي _PREMIUM_ACTIVE (الـ offset ممكن +02 أو +03)،
+# و NULL / '' بيطلعوا NULL فمش متأخرين
+_TASK_OVERDUE = "julianday(due) < julianday(?)"
+
+
+def _projection(columns: tuple[str, ...], allowed: frozenset[str], required: tuple[str, ...]) -> str:
+    """الأعمدة المطلوبة بس (+ اللي الـ cursor محتاجها) – من whitelist عشان بتتحط في الـ SQL"""
+    cols = tuple(dict.fromkeys((*required, *columns)))
+    unknown = set(cols) - allowed
+    if unknown:
+        raise ValueError(f"unknown columns: {sorted(unknown)}")
+    return ", ".join(cols)
+
+
+@traced_db
+async def get_tasks_page(
+    user_id: int,
+    cursor: tuple[str, str, int] | None = None,
+    limit: int = 10,
+    columns: tuple[str, ...] = TASK_LIST_COLUMNS,
+    include_done: bool = False,
+) -> tuple[list[Task], int, int]:
+    """
+    صفحة مهام بعد/قبل cursor + (العدد الكلي، المتأخرة) في نفس الـ query.
+    الـ index بيبدأ من الـ cursor على طول (مش OFFSET)، فتكلفة الصفحة ثابتة
+    مهما التاريخ كبر؛ والعدّ بيمشي على الـ index بس (covering).
+    """
+    op, due, task_id = cursor or (">", "", 0)
+    if op not in TASK_CURSOR_OPS:
+        raise ValueError(f"bad cursor op {op!r}")
+    strict = op[0]                       # ">" / "<" على الـ due
+    order = "DESC" if op == "<" else "ASC"
+    done = "" if include_done else "AND is_done = 0"
+    # (key, id) op (due, id) مكتوبة بالشكل ده عشان SQLite يعمل range seek على الـ index
+    after = f"{_TASK_KEY} {strict}= ? AND ({_TASK_KEY} {strict} ? OR id {op} ?)"
+    now_iso = clock.now().isoformat()
+
+    async with aiosqlite.connect(DB_PATH) as db:
+        async with db.execute(
+            f"""WITH counts AS (
+                    SELECT COUNT(*) AS total,
+                           COUNT(CASE WHEN is_done = 0 AND {_TASK_OVERDUE} THEN 1 END) AS overdue
+                    FROM tasks WHERE user_id = ? {done}
+                ),
+                page AS (
+                    SELECT {_projection(columns, TASK_COLUMNS, ("id", "due"))} FROM tasks
+                    WHERE user_id = ? {done} AND {after}
+                    ORDER BY {_TASK_KEY} {order}, id {order}
+                    LIMIT ?
+                )
+                SELECT counts.total AS _total, counts.overdue AS _overdue, page.*
+                FROM counts LEFT JOIN page
+                ORDER BY IFNULL(page.due, '') {order}, page.id {order}""",
+            (now_iso, user_id, user_id, due, due, task_id, limit),
+        ) as cur:
             rows = await cur.fetchall()
-            return [dict(r) for r in rows]
+            columns = tuple(d[0] for d in cur.description)[2:]
+
+    total, overdue = rows[0][0], rows[0][1]
+    # أول عمودين _total/_overdue والباقي أعمدة المهمة (None كلها لو الصفحة فاضية)
+    id_at = columns.index("id") + 2
+    tasks = [Task.from_row(columns, r[2:]) for r in rows if r[id_at] is not None]
+    if op == "<":
+        tasks.reverse()
+    return tasks, total, overdue
 
 
+@traced_db
 async def mark_done(task_id: int, user_id: int) -> bool:
     """تحديد مهمة كمنتهية"""
     async with aiosqlite.connect(DB_PATH) as db:
@@ -210,6 +601,7 @@ async def mark_done(task_id: int, user_id: int) -> bool:
         return cur.rowcount > 0
 
 
+@traced_db
 async def delete_task(task_id: int, user_id: int) -> bool:
     """حذف مهمة"""
     async with aiosqlite.connect(DB_PATH) as db:
@@ -221,11 +613,76 @@ async def delete_task(task_id: int, user_id: int) -> bool:
         return cur.rowcount > 0
 
 
-async def get_due_tasks() -> list[dict]:
+# ─── عمليات جماعية: statement واحد (أو chunk) بدل round trip لكل مهمة ───
+# SQLite القديم حده 999 parameter في الـ statement
+_IN_CHUNK = 500
+
+
+async def _tasks_where_ids(sql: str, user_id: int, task_ids) -> int:
+    """sql فيه "{ids}" مكان الـ IN list؛ الكل في transaction واحدة → عدد الصفوف"""
+    ids = list(dict.fromkeys(int(i) for i in task_ids))
+    if not ids:
+        return 0
+    changed = 0
+    async with aiosqlite.connect(DB_PATH) as db:
+        for i in range(0, len(ids), _IN_CHUNK):
+            chunk = ids[i:i + _IN_CHUNK]
+            cur = await db.execute(
+                sql.format(ids=", ".join("?" * len(chunk))), (user_id, *chunk)
+            )
+            changed += cur.rowcount
+        await db.commit()
+    return changed
+
+
+@traced_db
+async def mark_done_many(user_id: int, task_ids) -> int:
+    """تحديد كذا مهمة كمنتهية مرة واحدة → عدد اللي اتغيّر"""
+    return await _tasks_where_ids(
+        "UPDATE tasks SET is_done = 1 WHERE user_id = ? AND is_done = 0 AND id IN ({ids})",
+        user_id, task_ids,
+    )
+
+
+@traced_db
+async def delete_tasks(user_id: int, task_ids) -> int:
+    """حذف كذا مهمة مرة واحدة → عدد اللي اتحذف"""
+    return await _tasks_where_ids(
+        "DELETE FROM tasks WHERE user_id = ? AND id IN ({ids})", user_id, task_ids,
+    )
+
+
+@traced_db
+async def mark_overdue_done(user_id: int) -> int:
+    """كل المهام المتأخرة (ليها موعد فات) → منتهية؛ نفس تعريف overdue في get_tasks_page"""
+    now_iso = clock.now().isoformat()
+    async with aiosqlite.connect(DB_PATH) as db:
+        cur = await db.execute(
+            f"""UPDATE tasks SET is_done = 1
+                WHERE user_id = ? AND is_done = 0 AND {_TASK_OVERDUE}""",
+            (user_id, now_iso),
+        )
+        await db.commit()
+        return cur.rowcount
+
+
+@traced_db
+async def delete_done_tasks(user_id: int) -> int:
+    """حذف كل المهام المنتهية → عدد اللي اتحذف"""
+    async with aiosqlite.connect(DB_PATH) as db:
+        cur = await db.execute(
+            "DELETE FROM tasks WHERE user_id = ? AND is_done = 1", (user_id,)
+        )
+        await db.commit()
+        return cur.rowcount
+
+
+@traced_db
+async def get_due_tasks() -> list[Task]:
     """المهام المستحقة الآن (due <= now) وغير منتهية وغير مُذَكَّر بها"""
-    now_iso = datetime.now(CAIRO).isoformat()
+    now_iso = clock.now().isoformat()
     async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+        db.row_factory = _task_row
         async with db.execute(
             """SELECT * FROM tasks
                WHERE is_done = 0
@@ -234,10 +691,10 @@ async def get_due_tasks() -> list[dict]:
                  AND due <= ?""",
             (now_iso,),
         ) as cur:
-            rows = await cur.fetchall()
-            return [dict(r) for r in rows]
+            return await cur.fetchall()
 
 
+@traced_db
 async def mark_reminded(task_id: int) -> None:
     """وسم المهمة أنه تم التذكير بها"""
     async with aiosqlite.connect(DB_PATH) as db:
@@ -247,13 +704,14 @@ async def mark_reminded(task_id: int) -> None:
         await db.commit()
 
 
-async def get_today_tasks(user_id: int) -> list[dict]:
+@traced_db
+async def get_today_tasks(user_id: int) -> list[Task]:
     """مهام اليوم (من بداية اليوم لنهايته) + المتأخرة"""
-    now = datetime.now(CAIRO)
+    now = clock.now()
     start = now.replace(hour=0, minute=0, second=0).isoformat()
     end = now.replace(hour=23, minute=59, second=59).isoformat()
     async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+        db.row_factory = _task_row
         async with db.execute(
             """SELECT * FROM tasks
                WHERE user_id = ?
@@ -263,26 +721,24 @@ async def get_today_tasks(user_id: int) -> list[dict]:
                ORDER BY due ASC""",
             (user_id, end),
         ) as cur:
-            rows = await cur.fetchall()
-            return [dict(r) for r in rows]
+            return await cur.fetchall()
 
 
-async def handle_recurring_task(task: dict) -> None:
+async def handle_recurring_task(task: Task) -> None:
     """إعادة جدولة مهمة متكررة (daily/weekly)"""
-    if not task.get("recurrence"):
+    if not task.recurrence:
         return
-    due = datetime.fromisoformat(task["due"])
-    if task["recurrence"] == "daily":
-        new_due = due + timedelta(days=1)
-    elif task["recurrence"] == "weekly":
-        new_due = due + timedelta(weeks=1)
+    if task.recurrence == "daily":
+        new_due = task.due_at + timedelta(days=1)
+    elif task.recurrence == "weekly":
+        new_due = task.due_at + timedelta(weeks=1)
     else:
         return
     await add_task(
-        user_id=task["user_id"],
-        title=task["title"],
+        user_id=task.user_id,
+        title=task.title,
         due=new_due,
-        recurrence=task["recurrence"],
+        recurrence=task.recurrence,
     )
 
 
@@ -290,9 +746,10 @@ async def handle_recurring_task(task: dict) -> None:
 #  Reminder helpers (تذكيرات متكررة كل X دقيقة)
 # ══════════════════════════════════════════════════
 
+@traced_db
 async def add_reminder(user_id: int, text: str, interval_mins: int) -> int:
     """إضافة تذكير متكرر وإرجاع الـ ID"""
-    next_fire = (datetime.now(CAIRO) + timedelta(minutes=interval_mins)).isoformat()
+    next_fire = (clock.now() + timedelta(minutes=interval_mins)).isoformat()
     async with aiosqlite.connect(DB_PATH) as db:
         cur = await db.execute(
             "INSERT INTO reminders (user_id, text, interval_mins, next_fire) VALUES (?, ?, ?, ?)",
@@ -302,21 +759,44 @@ async def add_reminder(user_id: int, text: str, interval_mins: int) -> int:
         return cur.lastrowid
 
 
-async def get_due_reminders() -> list[dict]:
+@traced_db
+async def add_reminder_limited(
+    user_id: int, text: str, interval_mins: int, limit: int = FREE_REMINDER_LIMIT,
+) -> int | None:
+    """زي add_reminder بس لو المستخدم مجاني وعنده limit تذكير نشط → None (نفس فكرة add_task_limited)"""
+    now = clock.now()
+    async with aiosqlite.connect(DB_PATH) as db:
+        cur = await db.execute(
+            f"""INSERT INTO reminders (user_id, text, interval_mins, next_fire)
+                SELECT :uid, :text, :interval, :next_fire
+                WHERE {_PREMIUM_ACTIVE}
+                   OR (SELECT COUNT(*) FROM reminders WHERE user_id = :uid AND is_active = 1) < :limit""",
+            {
+                "uid": user_id, "text": text, "interval": interval_mins,
+                "next_fire": (now + timedelta(minutes=interval_mins)).isoformat(),
+                "now": now.isoformat(), "limit": limit,
+            },
+        )
+        await db.commit()
+        return cur.lastrowid if cur.rowcount else None
+
+
+@traced_db
+async def get_due_reminders() -> list[Reminder]:
     """التذكيرات المستحقة الآن (next_fire <= now) والنشطة"""
-    now_iso = datetime.now(CAIRO).isoformat()
+    now_iso = clock.now().isoformat()
     async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+        db.row_factory = _reminder_row
         async with db.execute(
             """SELECT * FROM reminders
                WHERE is_active = 1
                  AND next_fire <= ?""",
             (now_iso,),
         ) as cur:
-            rows = await cur.fetchall()
-            return [dict(r) for r in rows]
+            return await cur.fetchall()
 
 
+@traced_db
 async def advance_reminder(reminder_id: int) -> None:
     """تقديم موعد التذكير القادم بعد الإرسال"""
     async with aiosqlite.connect(DB_PATH) as db:
@@ -328,7 +808,7 @@ async def advance_reminder(reminder_id: int) -> None:
             if not row:
                 return
         next_fire = (
-            datetime.now(CAIRO) + timedelta(minutes=row["interval_mins"])
+            clock.now() + timedelta(minutes=row["interval_mins"])
         ).isoformat()
         await db.execute(
             "UPDATE reminders SET next_fire = ? WHERE id = ?",
@@ -337,18 +817,61 @@ async def advance_reminder(reminder_id: int) -> None:
         await db.commit()
 
 
-async def get_user_reminders(user_id: int) -> list[dict]:
+@traced_db
+async def get_user_reminders(user_id: int) -> list[Reminder]:
     """جلب تذكيرات المستخدم النشطة"""
     async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+        db.row_factory = _reminder_row
         async with db.execute(
             "SELECT * FROM reminders WHERE user_id = ? AND is_active = 1 ORDER BY id",
             (user_id,),
+        ) as cur:
+            return await cur.fetchall()
+
+
+REMINDER_COLUMNS = frozenset(
+    {"id", "user_id", "text", "interval_mins", "next_fire", "is_active", "created_at"}
+)
+REMINDER_LIST_COLUMNS = ("id", "text", "interval_mins", "is_active")
+
+
+@traced_db
+async def get_user_reminders_page(
+    user_id: int,
+    after_id: int = 0,
+    limit: int = 10,
+    columns: tuple[str, ...] = REMINDER_LIST_COLUMNS,
+) -> tuple[list[Reminder], int]:
+    """
+    صفحة من التذكيرات النشطة بعد after_id (بترتيب id زي get_user_reminders)
+    + العدد الكلي في نفس الـ query
+    """
+    async with aiosqlite.connect(DB_PATH) as db:
+        async with db.execute(
+            f"""WITH counts AS (
+                    SELECT COUNT(*) AS total FROM reminders
+                    WHERE user_id = ? AND is_active = 1
+                ),
+                page AS (
+                    SELECT {_projection(columns, REMINDER_COLUMNS, ("id",))} FROM reminders
+                    WHERE user_id = ? AND is_active = 1 AND id > ?
+                    ORDER BY id
+                    LIMIT ?
+                )
+                SELECT counts.total AS _total, page.*
+                FROM counts LEFT JOIN page
+                ORDER BY page.id""",
+            (user_id, user_id, after_id, limit),
         ) as cur:
             rows = await cur.fetchall()
-            return [dict(r) for r in rows]
+            columns = tuple(d[0] for d in cur.description)[1:]
+
+    id_at = columns.index("id") + 1
+    reminders = [Reminder.from_row(columns, r[1:]) for r in rows if r[id_at] is not None]
+    return reminders, rows[0][0]
 
 
+@traced_db
 async def count_reminders(user_id: int) -> int:
     """عدد التذكيرات النشطة"""
     async with aiosqlite.connect(DB_PATH) as db:
@@ -360,6 +883,7 @@ async def count_reminders(user_id: int) -> int:
             return row[0] if row else 0
 
 
+@traced_db
 async def pause_reminder(reminder_id: int, user_id: int) -> bool:
     """إيقاف تذكير"""
     async with aiosqlite.connect(DB_PATH) as db:
@@ -371,9 +895,10 @@ async def pause_reminder(reminder_id: int, user_id: int) -> bool:
         return cur.rowcount > 0
 
 
+@traced_db
 async def resume_reminder(reminder_id: int, user_id: int) -> bool:
     """استئناف تذكير"""
-    next_fire = (datetime.now(CAIRO) + timedelta(minutes=1)).isoformat()
+    next_fire = (clock.now() + timedelta(minutes=1)).isoformat()
     async with aiosqlite.connect(DB_PATH) as db:
         cur = await db.execute(
             "UPDATE reminders SET is_active = 1, next_fire = ? WHERE id = ? AND user_id = ?",
@@ -383,6 +908,7 @@ async def resume_reminder(reminder_id: int, user_id: int) -> bool:
         return cur.rowcount > 0
 
 
+@traced_db
 async def delete_reminder(reminder_id: int, user_id: int) -> bool:
     """حذف تذكير"""
     async with aiosqlite.connect(DB_PATH) as db:
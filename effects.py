@@ -0,0 +1,117 @@
+"""
+effects.py – رد فوري على الـ callback والتنفيذ بعده (optimistic)
+- acknowledge(): callback.answer على طول (الـ spinner يختفي) + زمن من وصول الـ update للرد
+- defer(): الـ DB + edit في طابور الشات بتاع UpdateExecutor بعد الـ handler،
+  فأي update جاي من نفس الشات بعد الضغطة بيشوف التغيير (ترتيب الشات محفوظ)
+- لو الـ effect وقع → تعديل تاني للرسالة بيقول إنها ما اتنفذتش (والأزرار زي ما هي)
+- نفس الزرار (شات + callback data) اتداس تاني والـ effect الأول لسه في الطابور / شغال
+  → الضغطة التانية اترد عليها خلاص (acknowledge) فبتتشال من غير effect تاني
+  (حذف تاني كان بيكتب MISSING_TASK فوق "تم الحذف"، و done تاني كان بيطلع FAILED_NOTE)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable
+
+from aiogram import types
+
+import metrics
+from executor import UpdateExecutor
+
+log = logging.getLogger(__name__)
+
+_answer_seconds = metrics.histogram(
+    "telepot_callback_answer_seconds",
+    "من وصول الـ callback (getUpdates) لحد answerCallbackQuery",
+    ("handler",),
+)
+_effect_seconds = metrics.histogram(
+    "telepot_callback_effect_seconds", "زمن الـ effect (DB + edit) بعد الرد", ("handler",)
+)
+_effects = metrics.counter(
+    "telepot_callback_effects_total", "نتيجة الـ effects (ok / missing / error / merged)", ("handler", "result")
+)
+
+FAILED_NOTE = "⚠️ <b>ما اتنفذش</b> – حصلت مشكلة، جرّب تاني."
+
+# main.py بيربطه بـ executor الـ Dispatcher؛ من غيره (benchmarks) → task عادي
+_executor: UpdateExecutor | None = None
+_tasks: set[asyncio.Task] = set()
+# (شات، callback data) ليها effect من ساعة ما اتحط في الطابور لحد ما يخلص
+_pending: set[tuple[int, str | None]] = set()
+
+
+def bind(executor: UpdateExecutor | None) -> None:
+    global _executor
+    _executor = executor
+
+
+def _name(callback: types.CallbackQuery) -> str:
+    """prefix الـ callback_data ("done" / "rpause" ...) كـ label"""
+    return (callback.data or "").split(":", 1)[0] or "unknown"
+
+
+async def acknowledge(
+    callback: types.CallbackQuery,
+    text: str | None = None,
+    received_at: float | None = None,
+    show_alert: bool = False,
+) -> None:
+    """الرد على الضغطة قبل أي DB / edit"""
+    await callback.answer(text, show_alert=show_alert)
+    if received_at is not None:
+        _answer_seconds.observe(time.perf_counter() - received_at, handler=_name(callback))
+
+
+def defer(callback: types.CallbackQuery, effect: Callable[[], Awaitable[bool]]) -> None:
+    """
+    effect بيرجع True لو اتنفذ، False لو الحاجة مش موجودة (وهو اللي بيعدّل الرسالة ساعتها).
+    exception → الرسالة بتتعدّل بـ FAILED_NOTE.
+    """
+    name = _name(callback)
+    message = callback.message
+    # نفس مفتاح executor.chat_key للـ callback
+    key = message.chat.id if message is not None else callback.from_user.id
+    pending = (key, callback.data)
+    if pending in _pending:
+        _effects.inc(handler=name, result="merged")
+        return
+    _pending.add(pending)
+
+    async def job() -> None:
+        t0 = time.perf_counter()
+        try:
+            ok = await effect()
+        except Exception:
+            log.exception("Callback effect %s failed", name)
+            _effects.inc(handler=name, result="error")
+            await _report_failure(callback)
+        else:
+            _effects.inc(handler=name, result="ok" if ok else "missing")
+        finally:
+            _pending.discard(pending)
+            _effect_seconds.observe(time.perf_counter() - t0, handler=name)
+
+    if _executor is not None:
+        _executor.defer(key, job)
+    else:
+        task = asyncio.create_task(job())
+        _tasks.add(task)
+        task.add_done_callback(_tasks.discard)
+
+
+async def _report_failure(callback: types.CallbackQuery) -> None:
+    message = callback.message
+    if not isinstance(message, types.Message):
+        return
+    try:
+        await message.edit_text(
+            f"{message.html_text}\n\n{FAILED_NOTE}",
+            parse_mode="HTML",
+            reply_markup=message.reply_markup,
+        )
+    except Exception as e:
+        log.warning("Could not report failed effect on message %s: %s", message.message_id, e)
@@ -0,0 +1,163 @@
+"""
+executor.py – تنفيذ الـ updates بحد أقصى للتوازي + ترتيب لكل شات
+- Semaphore عام: أقصى عدد handlers شغالين في نفس الوقت
+- طابور FIFO لكل شات: رسائل نفس الشات تتنفذ بالترتيب (مهم للـ FSM)
+- Backpressure: لو الطوابير اتملت، الـ polling يستنى وما يسحبش updates جديدة
+- defer(): شغل بعد الـ handler (effects.py) في نفس طابور الشات، من غير backpressure
+- كل update بياخد received_at (perf_counter لحظة ما اتسحب) في الـ data بتاعة الـ handlers
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+
+log = logging.getLogger(__name__)
+
+# ─── القيم الافتراضية ───
+DEFAULT_MAX_CONCURRENCY = 16    # handlers شغالين في نفس الوقت
+DEFAULT_MAX_PENDING = 256       # updates مستنية في كل الطوابير
+
+
+def chat_key(update: Update) -> int:
+    """مفتاح الترتيب: الشات (أو المستخدم) اللي جاي منه الـ update"""
+    event = update.event
+    chat = getattr(event, "chat", None)
+    if chat is None:
+        msg = getattr(event, "message", None)
+        chat = getattr(msg, "chat", None)
+    if chat is not None:
+        return chat.id
+    user = getattr(event, "from_user", None)
+    if user is not None:
+        return user.id
+    # update ملوش شات ولا مستخدم → مفيش حاجة نرتبها
+    return -update.update_id
+
+
+class UpdateExecutor:
+    """منفّذ الـ updates: توازي محدود بين الشاتات + ترتيب جوه الشات الواحد"""
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_pending: int = DEFAULT_MAX_PENDING,
+    ) -> None:
+        self._running = asyncio.Semaphore(max_concurrency)
+        self._pending = asyncio.Semaphore(max_pending)
+        # (job, gated): gated = واخد مكان من _pending (جاي من submit)
+        self._queues: dict[int, deque[tuple[Callable[[], Awaitable[Any]], bool]]] = {}
+        self._workers: set[asyncio.Task] = set()
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self.in_flight = 0
+
+    @property
+    def queued(self) -> int:
+        """عدد الـ updates المستنية في الطوابير"""
+        return sum(len(q) for q in self._queues.values())
+
+    async def submit(self, key: int, job: Callable[[], Awaitable[Any]]) -> None:
+        """
+        إضافة job لطابور الشات.
+        بيستنى لو عدد الـ pending وصل للحد (backpressure على الـ polling).
+        """
+        await self._pending.acquire()
+        self._enqueue(key, job, gated=True)
+
+    def defer(self, key: int, job: Callable[[], Awaitable[Any]]) -> None:
+        """
+        job بعد اللي في طابور الشات دلوقتي (من جوه handler).
+        من غير _pending: الـ handler نفسه شايل مكان، فلو استنى هنا والطوابير مليانة
+        كل الـ workers ممكن يقفوا على بعض. كل update بيعمل job واحدة بالكتير.
+        """
+        self._enqueue(key, job, gated=False)
+
+    def _enqueue(self, key: int, job: Callable[[], Awaitable[Any]], gated: bool) -> None:
+        queue = self._queues.get(key)
+        if queue is not None:
+            # فيه worker شغال للشات ده → هيلقطها بالترتيب
+            queue.append((job, gated))
+            return
+        self._queues[key] = deque([(job, gated)])
+        worker = asyncio.create_task(self._drain(key))
+        self._workers.add(worker)
+        worker.add_done_callback(self._workers.discard)
+
+    async def _drain(self, key: int) -> None:
+        """تفريغ طابور شات واحد بالترتيب"""
+        queue = self._queues[key]
+        try:
+            while queue:
+                job, gated = queue.popleft()
+                try:
+                    async with self._running:
+                        self.in_flight += 1
+                        try:
+                            await job()
+                        finally:
+                            self.in_flight -= 1
+                except Exception as e:
+                    log.error("Update job error for chat %s: %s", key, e)
+                finally:
+                    if gated:
+                        self._pending.release()
+        finally:
+            del self._queues[key]
+
+    async def join(self) -> None:
+        """استنى كل الـ updates اللي اتسحبت لحد ما تخلص"""
+        while self._workers:
+            await asyncio.gather(*self._workers, return_exceptions=True)
+
+
+class BoundedDispatcher(Dispatcher):
+    """Dispatcher بيمرر كل update على UpdateExecutor بدل task مفتوح لكل update"""
+
+    def __init__(self, *, executor: UpdateExecutor | None = None, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.executor = executor or UpdateExecutor()
+
+    async def _polling(
+        self,
+        bot: Bot,
+        polling_timeout: int = 30,
+        handle_as_tasks: bool = True,
+        backoff_config: Any = None,
+        allowed_updates: list[str] | None = None,
+        tasks_concurrency_limit: int | None = None,
+        **kwargs: Any,
+    ) -> None:
+        user = await bot.me()
+        log.info(
+            "Run bounded polling for @%s (concurrency=%d, pending=%d)",
+            user.username,
+            self.executor.max_concurrency,
+            self.executor.max_pending,
+        )
+        listen_kwargs: dict[str, Any] = {
+            "polling_timeout": polling_timeout,
+            "allowed_updates": allowed_updates,
+        }
+        if backoff_config is not None:
+            listen_kwargs["backoff_config"] = backoff_config
+
+        try:
+            async for update in self._listen_updates(bot, **listen_kwargs):
+                # الـ offset ما بيتقدمش غير بعد ما submit ترجع،
+                # فلو الطوابير مليانة Telegram بيحتفظ بالباقي عنده
+                await self.executor.submit(
+                    chat_key(update),
+                    lambda u=update, t=time.perf_counter(): self._process_update(
+                        bot=bot, update=u, received_at=t, **kwargs
+                    ),
+                )
+        finally:
+            await self.executor.join()
+            log.info("Bounded polling stopped for @%s", user.username)
@@ -0,0 +1,223 @@
+"""
+expiry.py – انتهاء اشتراكات Premium في ميعادها بالظبط (بدل scan على users كل ساعة)
+- min-heap بـ (الميعاد، النوع، user_id، sub_end): بيتحمّل مرة عند التشغيل (idx_users_premium_end)
+- task واحدة نايمة لحد أقرب ميعاد، أو لحد ما watch() يحط ميعاد أقرب منه
+- المواعيد اللي جت مع بعض (نفس اللحظة / اللي اتراكم وقت الـ restart) → UPDATE واحد + رسايل على دفعات
+- تنبيه قبل الانتهاء بـ EXPIRY_WARN_HOURS بنفس الطريقة (warned_end: مرة لكل اشتراك حتى بعد restart)
+- التجديد: watch() بميعاد جديد، والقديم بيتشال lazy (sub_end بتاعه مش هو الحالي)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+
+from aiogram import Bot
+
+import clock
+import metrics
+from database import (
+    FREE_REMINDER_LIMIT,
+    FREE_TASK_LIMIT,
+    expire_subscriptions,
+    get_subscription_ends,
+    mark_expiry_warned,
+)
+
+log = logging.getLogger(__name__)
+
+WARN_BEFORE = timedelta(hours=float(os.getenv("EXPIRY_WARN_HOURS", "72")))
+BATCH_SIZE = 200            # أقصى users في UPDATE واحد
+NOTICES_PER_SECOND = 25     # تحت حد Telegram (~30 رسالة/ثانية)
+RETRY_AFTER = 60.0          # لو الـ DB وقع، الدفعة (أو الـ load الأولاني) بتتعاد بعد كده
+MAX_SLEEP = 3600.0          # صحيان احتياطي (الساعة اتغيّرت/suspend) – من غير أي query
+
+WARN, EXPIRE = 0, 1         # WARN الأول لو الميعادين واحد
+_KINDS = {WARN: "warn", EXPIRE: "expire"}
+
+_events = metrics.counter(
+    "telepot_subscription_events_total", "تنبيهات/انتهاء اشتراكات اتنفذت", ("kind",)
+)
+_lateness = metrics.histogram(
+    "telepot_subscription_event_lateness_seconds", "التأخير عن الميعاد المحدد", ("kind",)
+)
+_heap_size = metrics.gauge("telepot_subscription_heap_size", "مواعيد في الـ heap (شاملة القديمة)")
+
+
+def warning_text(sub_end: str) -> str:
+    end = datetime.fromisoformat(sub_end)
+    return (
+        "━━━━━━━━━━━━━━━━━━━━\n"
+        "⏳ <b>اشتراكك Premium قرب يخلص!</b>\n"
+        "━━━━━━━━━━━━━━━━━━━━\n\n"
+        f"📅 بينتهي: <b>{end.strftime('%Y-%m-%d %I:%M %p')}</b>\n\n"
+        "📦 بعدها هترجع للخطة المجانية:\n"
+        f"  📝 {FREE_TASK_LIMIT} مهمة كحد أقصى\n"
+        f"  🔔 {FREE_REMINDER_LIMIT} تذكيرات كحد أقصى\n\n"
+        "🔄 جدّد دلوقتي والـ 30 يوم هيتضافوا على الباقي: /premium\n"
+        "📊 حالة اشتراكك: /my_subscription"
+    )
+
+
+EXPIRED_TEXT = (
+    "━━━━━━━━━━━━━━━━━━━━\n"
+    "⚠️ <b>انتهى اشتراكك Premium!</b>\n"
+    "━━━━━━━━━━━━━━━━━━━━\n\n"
+    "📦 رجعت للخطة المجانية:\n"
+    f"  📝 {FREE_TASK_LIMIT} مهمة كحد أقصى\n"
+    f"  🔔 {FREE_REMINDER_LIMIT} تذكيرات كحد أقصى\n\n"
+    "⭐ جدّد اشتراكك: /premium\n\n"
+    "💙 شكرًا لاستخدامك TelePot!"
+)
+
+
+class ExpiryQueue:
+    """مواعيد التنبيه والانتهاء لكل المشتركين في min-heap"""
+
+    def __init__(self) -> None:
+        # (epoch، WARN/EXPIRE، user_id، sub_end iso)
+        self._heap: list[tuple[float, int, int, str]] = []
+        # user_id → sub_end الحالي؛ أي entry بـ sub_end تاني اتلغى (تجديد)
+        self._ends: dict[int, str] = {}
+        self._wake = asyncio.Event()
+
+    def _entries(self, user_id: int, sub_end: str, warned_end: str | None) -> list[tuple[float, int, int, str]]:
+        end = datetime.fromisoformat(sub_end)
+        entries = [(end.timestamp(), EXPIRE, user_id, sub_end)]
+        if warned_end != sub_end:
+            # لو ميعاد التنبيه فات (اشتراك أقصر من WARN_BEFORE / restart) → بيطلع على طول
+            entries.append(((end - WARN_BEFORE).timestamp(), WARN, user_id, sub_end))
+        return entries
+
+    def watch(self, user_id: int, sub_end: datetime | str, warned_end: str | None = None) -> None:
+        """اشتراك جديد/اتجدد: مواعيده تدخل الـ heap (والقديمة بتتشال لما تطلع)"""
+        sub_end = sub_end if isinstance(sub_end, str) else sub_end.isoformat()
+        self._ends[user_id] = sub_end
+        top = self._heap[0][0] if self._heap else float("inf")
+        for entry in self._entries(user_id, sub_end, warned_end):
+            heapq.heappush(self._heap, entry)
+        _heap_size.set(len(self._heap))
+        if self._heap[0][0] < top:
+            self._wake.set()
+
+    async def load(self) -> None:
+        """
+        كل الاشتراكات اللي ليها نهاية → heap (heapify مرة واحدة).
+        اللي اتعمله watch() قبل ما الـ load ينجح (retry) بيفضل زي ما هو
+        """
+        rows = await get_subscription_ends()
+        ends, heap, entries = self._ends, self._heap, self._entries
+        for u in rows:
+            if u.user_id not in ends:
+                ends[u.user_id] = u.sub_end
+                heap += entries(u.user_id, u.sub_end, u.warned_end)
+        heapq.heapify(heap)
+        _heap_size.set(len(self._heap))
+        log.info("⏳ Expiry queue: %d subscriptions loaded", len(rows))
+
+    def next_at(self) -> float | None:
+        """epoch أقرب ميعاد لسه صالح (بيرمي القديم من فوق)"""
+        while self._heap:
+            _, _, user_id, sub_end = self._heap[0]
+            if self._ends.get(user_id) == sub_end:
+                return self._heap[0][0]
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_due(self, now: float) -> dict[int, list[tuple[float, int, str]]]:
+        """المواعيد اللي جت (<= now) → {kind: [(when, user_id, sub_end)]}"""
+        batch: dict[int, list[tuple[float, int, str]]] = {WARN: [], EXPIRE: []}
+        while (
+            self._heap and self._heap[0][0] <= now
+            and len(batch[WARN]) < BATCH_SIZE and len(batch[EXPIRE]) < BATCH_SIZE
+        ):
+            when, kind, user_id, sub_end = heapq.heappop(self._heap)
+            if self._ends.get(user_id) != sub_end:
+                continue
+            if kind == WARN and datetime.fromisoformat(sub_end).timestamp() <= now:
+                continue  # خلص خلاص (restart بعد الميعاد) → رسالة الانتهاء بس
+            if kind == EXPIRE:
+                del self._ends[user_id]
+            batch[kind].append((when, user_id, sub_end))
+        _heap_size.set(len(self._heap))
+        return batch
+
+    def _retry(self, batch: dict[int, list[tuple[float, int, str]]]) -> None:
+        at = clock.time() + RETRY_AFTER
+        for kind, items in batch.items():
+            for _, user_id, sub_end in items:
+                if kind == EXPIRE:
+                    self._ends.setdefault(user_id, sub_end)
+                if self._ends.get(user_id) == sub_end:
+                    heapq.heappush(self._heap, (at, kind, user_id, sub_end))
+
+    async def _initial_load(self) -> None:
+        """load لحد ما ينجح: الـ DB لو مش جاهزة وقت التشغيل الـ task ما تموتش"""
+        while True:
+            try:
+                await self.load()
+                return
+            except Exception:
+                log.exception("Expiry queue load failed, retrying in %.0fs", RETRY_AFTER)
+                await asyncio.sleep(RETRY_AFTER)
+
+    async def run(self, bot: Bot) -> None:
+        """الـ loop: نوم لحد أقرب ميعاد → دفعة → ..."""
+        await self._initial_load()
+        while True:
+            now = clock.time()
+            next_at = self.next_at()
+            if next_at is None or next_at > now:
+                timeout = MAX_SLEEP if next_at is None else min(next_at - now, MAX_SLEEP)
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            batch = self.pop_due(now)
+            try:
+                await self._fire(bot, batch, now)
+            except Exception:
+                log.exception("Expiry batch failed, retrying in %.0fs", RETRY_AFTER)
+                self._retry(batch)
+
+    async def _fire(self, bot: Bot, batch: dict[int, list[tuple[float, int, str]]], now: float) -> None:
+        notices: list[tuple[int, str]] = []
+        if batch[WARN]:
+            warned = await mark_expiry_warned([(user_id, end) for _, user_id, end in batch[WARN]])
+            notices += [(u.user_id, warning_text(u.sub_end)) for u in warned]
+            _events.inc(len(warned), kind="warn")
+        if batch[EXPIRE]:
+            expired = await expire_subscriptions([(user_id, end) for _, user_id, end in batch[EXPIRE]])
+            notices += [(user_id, EXPIRED_TEXT) for user_id in expired]
+            _events.inc(len(expired), kind="expire")
+
+        for kind, items in batch.items():
+            for when, _, _ in items:
+                _lateness.observe(max(now - when, 0.0), kind=_KINDS[kind])
+        await send_notices(bot, notices)
+
+
+async def send_notices(bot: Bot, notices: list[tuple[int, str]]) -> None:
+    """الرسايل على دفعات: NOTICES_PER_SECOND في الثانية بالتوازي"""
+    for i in range(0, len(notices), NOTICES_PER_SECOND):
+        t0 = time.monotonic()
+        chunk = notices[i:i + NOTICES_PER_SECOND]
+        results = await asyncio.gather(
+            *(bot.send_message(user_id, text, parse_mode="HTML") for user_id, text in chunk),
+            return_exceptions=True,
+        )
+        for (user_id, _), result in zip(chunk, results):
+            if isinstance(result, Exception):
+                log.error("Subscription notice error for user %s: %s", user_id, result)
+        if i + NOTICES_PER_SECOND < len(notices):
+            await asyncio.sleep(max(1.0 - (time.monotonic() - t0), 0.0))
+
+
+queue = ExpiryQueue()
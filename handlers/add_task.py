@@ -2,29 +2,43 @@
 handlers/add_task.py – إضافة مهمة بـ FSM + dateparser (عربي/إنجليزي)
 يدعم الإدخال المباشر (رسالة واحدة) أو خطوات FSM.
 + normalize_arabic: تحويل التعبيرات العربية لصيغة يفهمها dateparser
++ التحليل نفسه بيتنفذ في parse_pool (برّه الـ event loop)
++ dateparser بيتحمّل أول ما يتطلب (مش وقت الـ import)
 """
 
 from __future__ import annotations
 
 import logging
 import re
+import time
 from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import TYPE_CHECKING
 
-import dateparser
 import pytz
 from aiogram import Router, types, F
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import StatesGroup, State
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, ReplyKeyboardRemove
 
+import clock
+import metrics
+from parse_cache import ParseCache
+from parse_pool import run_parse
+from text_analysis import AR_CHAR, ARABIC_DIGIT_MAP, ARABIC_RE
+from tracing import parse_span
+from handlers.buttons import button
 from database import (
-    add_task,
+    add_task_limited,
     count_tasks,
     is_premium,
     ensure_user,
     FREE_TASK_LIMIT,
 )
 
+if TYPE_CHECKING:
+    from dateparser import DateDataParser
+
 CAIRO = pytz.timezone("Africa/Cairo")
 log = logging.getLogger(__name__)
 
@@ -45,9 +59,14 @@ DATEPARSER_SETTINGS = {
     "PREFER_DATES_FROM": "future",
     "DATE_ORDER": "DMY",
 }
+# اللغات اللي البوت بيستقبلها فعلًا (من غير language detection على كل الـ locales)
+DATEPARSER_LANGUAGES = ["ar", "en"]
 
-# ─── تحويل الأرقام العربية للإنجليزية ───
-ARABIC_DIGIT_MAP = str.maketrans("٠١٢٣٤٥٦٧٨٩", "0123456789")
+# جمل تسخين بتلمس كل مسار في dateparser (locale data + regex cache)
+_WARMUP_PHRASES = (
+    "tomorrow 3 PM", "in 2 hours", "thursday 9 AM", "25/12", "next friday",
+    "بكرة", "الخميس",
+)
 
 # ─── أرقام عربية مكتوبة (فصحى + مصري) ───
 ARABIC_NUMBERS = {
@@ -89,16 +108,6 @@ PM_WORDS = [
     "م",
 ]
 
-# ─── بناء regex آمن للـ AM/PM (عشان "ص" ما يتلقطش جوه "العصر") ───
-_AR_CHAR = r"[\u0600-\u06FF]"
-_AM_PATTERNS = [
-    (re.compile(rf"(?<!{_AR_CHAR}){re.escape(w)}(?!{_AR_CHAR})"), " AM ")
-    for w in sorted(AM_WORDS, key=len, reverse=True)
-]
-_PM_PATTERNS = [
-    (re.compile(rf"(?<!{_AR_CHAR}){re.escape(w)}(?!{_AR_CHAR})"), " PM ")
-    for w in sorted(PM_WORDS, key=len, reverse=True)
-]
 RELATIVE_AR = {
     # بعد + وقت
     "بعد ساعه": "in 1 hour", "بعد ساعة": "in 1 hour",
@@ -138,6 +147,129 @@ DAY_AR = {
 }
 
 
+# ══════════════════════════════════════════════════
+#  القاموس متجمّع مرة واحدة وقت الـ import
+#  كل مرحلة = regex واحد (alternation) بيعدّي على النص مرة واحدة،
+#  وبيطلع نفس ناتج الـ replace المتتالي القديم بالظبط.
+# ══════════════════════════════════════════════════
+
+
+def _alternation(words) -> str:
+    """alternation بالأطول أولًا (عشان "بعد الضهر" تكسب "الضهر")"""
+    return "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+
+class _OrderedReplacer:
+    """
+    بديل one-pass لـ:  for k, v in table.items(): s = s.replace(k, v)
+    الـ replace المتتالي معناه إن المفتاح الأسبق في الـ dict بيكسب لو اتداخل مع غيره.
+    - مفتاح بيحتوي مفتاح أسبق منه عمره ما بيتطبق → بيتشال
+    - الباقي في regex واحد مرتب بالأولوية
+    - لو اتلقط تطابق ممكن يتداخل جزئيًا مع مفتاح تاني → نرجع للـ loop القديم (نادر جدًا)
+    """
+
+    def __init__(self, table: dict[str, str]) -> None:
+        self.table = table
+        keys = list(table)
+        live = [k for i, k in enumerate(keys) if not any(e in k for e in keys[:i])]
+        self.pattern = re.compile("|".join(re.escape(k) for k in live))
+        # key → [(طول التداخل, المفتاح اللي ممكن يبدأ جوه آخره)]
+        self.tail_overlaps: dict[str, list[tuple[int, str]]] = {}
+        # key → [(طول التداخل, المفتاح اللي ممكن ينتهي جوه أوله)]
+        self.head_overlaps: dict[str, list[tuple[int, str]]] = {}
+        for a in live:
+            for b in live:
+                for n in range(1, min(len(a), len(b))):
+                    if a[-n:] == b[:n]:
+                        self.tail_overlaps.setdefault(a, []).append((n, b))
+                        self.head_overlaps.setdefault(b, []).append((n, a))
+
+    def _ambiguous(self, s: str, m: re.Match) -> bool:
+        key, start, end = m.group(), m.start(), m.end()
+        for n, other in self.tail_overlaps.get(key, ()):
+            if s.startswith(other, end - n):
+                return True
+        for n, other in self.head_overlaps.get(key, ()):
+            if start + n - len(other) >= 0 and s.startswith(other, start + n - len(other)):
+                return True
+        return False
+
+    def sub(self, s: str) -> str:
+        matches = list(self.pattern.finditer(s))
+        if not matches:
+            return s
+        if any(self._ambiguous(s, m) for m in matches):
+            for ar, en in self.table.items():
+                if ar in s:
+                    s = s.replace(ar, en)
+            return s
+        parts = []
+        pos = 0
+        for m in matches:
+            parts.append(s[pos:m.start()])
+            parts.append(self.table[m.group()])
+            pos = m.end()
+        parts.append(s[pos:])
+        return "".join(parts)
+
+
+# ─── تعبيرات نسبية: أي مفتاح موجود؟ (لو لأ نكمّل من غير loop) ───
+_RELATIVE_RE = re.compile(_alternation(RELATIVE_AR))
+
+# ─── أيام ───
+_DAYS = _OrderedReplacer(DAY_AR)
+
+# ─── أرقام مكتوبة: كلمة كاملة بين مسافات ───
+# المفاتيح اللي فيها مسافة ("إحدى عشر") آخر كلمة فيها مفتاح أسبق ("عشر") فعمرها ما بتتطبق
+_NUMBER_WORDS = {k: v for k, v in ARABIC_NUMBERS.items() if " " not in k}
+_NUMBERS_RE = re.compile(rf"(?<!\S)(?:{_alternation(_NUMBER_WORDS)})(?!\S)")
+
+# ─── AM/PM بحدود عربية (عشان "ص" ما يتلقطش جوه "العصر") ───
+_AMPM = {w: " AM " for w in AM_WORDS}
+_AMPM.update({w: " PM " for w in PM_WORDS})
+_AMPM_RE = re.compile(rf"(?<!{AR_CHAR})(?:{_alternation(_AMPM)})(?!{AR_CHAR})")
+
+# ─── باقي القواعد متجمّعة ───
+_HALF_RE = re.compile(r"(\d+)\s*(?:و\s*نص(?:ف)?)")
+_QUARTER_TO_RE = re.compile(r"(\d+)\s*(?:الا|إلا)\s*ربع")
+_QUARTER_RE = re.compile(r"(\d+)\s*و\s*ربع")
+_THIRD_RE = re.compile(r"(\d+)\s*و\s*(?:تلت|ثلث)")
+_IN_HOURS_RE = re.compile(r"(?:بعد|كمان)\s+(\d+)\s*(?:ساعه|ساعة|ساعات)")
+_IN_MINUTES_RE = re.compile(r"(?:بعد|كمان)\s+(\d+)\s*(?:دقيقه|دقيقة|دقايق|دقائق|دقيق)")
+_AT_HOUR_RE = re.compile(r"الساع[ةه]\s*(\d+)")
+_WAKE_VERBS_RE = re.compile(r"(?:صحيني|صحني|نبهني|فكرني|قومني|وريني|ذكرني)\s*")
+_SPACES_RE = re.compile(r"\s+")
+
+
+def _replace_number_words(s: str) -> str:
+    """
+    "سبعه" → "7" (كلمة كاملة).
+    الـ re.sub القديم لكل مفتاح كان بياكل المسافة اللي بعد الكلمة،
+    فنفس الكلمة متكررة ورا بعض بمسافة واحدة كانت بتتبدل مرة وتتساب مرة.
+    """
+    parts = []
+    pos = 0
+    last_word, last_end = None, -2
+    for m in _NUMBERS_RE.finditer(s):
+        word, start = m.group(), m.start()
+        if word == last_word and start == last_end + 1:
+            # المسافة اللي قبلها اتاكلت مع التطابق اللي فات
+            last_word = None
+            continue
+        parts.append(s[pos:start])
+        parts.append(_NUMBER_WORDS[word])
+        pos = last_end = m.end()
+        last_word = word
+    if not parts:
+        return s
+    parts.append(s[pos:])
+    return "".join(parts)
+
+
+def _quarter_to(m: re.Match) -> str:
+    return f"{int(m.group(1)) - 1}:45"
+
+
 def normalize_arabic(text: str) -> str:
     """تحويل التعبيرات العربية (مصري + فصحى) لصيغة يفهمها dateparser"""
     s = text.strip()
@@ -145,70 +277,243 @@ def normalize_arabic(text: str) -> str:
     # أرقام عربية ← إنجليزية (٧ → 7)
     s = s.translate(ARABIC_DIGIT_MAP)
 
-    # تعبيرات نسبية (بعد ساعة، كمان ساعتين...)
-    for ar, en in RELATIVE_AR.items():
-        if ar in s:
-            s = s.replace(ar, en)
-            return s
+    # تعبيرات نسبية (بعد ساعة، كمان ساعتين...) – أول مفتاح في الترتيب بيكسب
+    if _RELATIVE_RE.search(s):
+        for ar, en in RELATIVE_AR.items():
+            if ar in s:
+                return s.replace(ar, en)
 
     # أيام (بكرة، النهاردة، الخميس...)
-    for ar, en in DAY_AR.items():
-        if ar in s:
-            s = s.replace(ar, en)
+    s = _DAYS.sub(s)
 
     # أرقام مكتوبة بالعربي (سبعه → 7)
-    for ar, digit in ARABIC_NUMBERS.items():
-        s = re.sub(rf"(?:^|\s){ar}(?:\s|$)", f" {digit} ", s)
+    s = _replace_number_words(s)
 
     # "X و نص/نصف" → "X:30" (مصري: "تلاته و نص" → "3:30")
-    s = re.sub(r"(\d+)\s*(?:و\s*نص(?:ف)?)", r"\1:30", s)
+    s = _HALF_RE.sub(r"\1:30", s)
     # "X إلا ربع" → ساعة - 15 دقيقة (مثال: "4 إلا ربع" → "3:45")
-    s = re.sub(r"(\d+)\s*(?:الا|إلا)\s*ربع", lambda m: f"{int(m.group(1))-1}:45", s)
+    s = _QUARTER_TO_RE.sub(_quarter_to, s)
     # "X و ربع" → "X:15"
-    s = re.sub(r"(\d+)\s*و\s*ربع", r"\1:15", s)
+    s = _QUARTER_RE.sub(r"\1:15", s)
     # "X و تلت" → "X:20"
-    s = re.sub(r"(\d+)\s*و\s*(?:تلت|ثلث)", r"\1:20", s)
+    s = _THIRD_RE.sub(r"\1:20", s)
 
     # تعبيرات AM/PM: "7 الصبح" → "7 AM" ، "3 العصر" → "3 PM"
-    # نستخدم regex بحدود عربية عشان "ص" ما يتلقطش جوه "العصر"
-    for pattern, replacement in _AM_PATTERNS:
-        s = pattern.sub(replacement, s)
-    for pattern, replacement in _PM_PATTERNS:
-        s = pattern.sub(replacement, s)
+    s = _AMPM_RE.sub(lambda m: _AMPM[m.group()], s)
 
     # "بعد/كمان X ساعه/ساعات" → "in X hours"
-    s = re.sub(r"(?:بعد|كمان)\s+(\d+)\s*(?:ساعه|ساعة|ساعات)", r"in \1 hours", s)
+    s = _IN_HOURS_RE.sub(r"in \1 hours", s)
 
     # "بعد/كمان X دقيقه/دقايق" → "in X minutes"
-    s = re.sub(r"(?:بعد|كمان)\s+(\d+)\s*(?:دقيقه|دقيقة|دقايق|دقائق|دقيق)", r"in \1 minutes", s)
+    s = _IN_MINUTES_RE.sub(r"in \1 minutes", s)
 
     # "الساعه 7" / "الساعة 7" → "7:00"
-    s = re.sub(r"الساع[ةه]\s*(\d+)", r"\1:00", s)
+    s = _AT_HOUR_RE.sub(r"\1:00", s)
 
     # "صحيني" / "نبهني" / "فكرني" / "قومني" → شيلهم (مش جزء من الوقت)
-    s = re.sub(r"(?:صحيني|صحني|نبهني|فكرني|قومني|وريني|ذكرني)\s*", "", s)
+    s = _WAKE_VERBS_RE.sub("", s)
 
     # تنظيف مسافات زيادة
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _SPACES_RE.sub(" ", s).strip()
 
     return s
 
 
-def smart_parse(text: str) -> datetime | None:
-    """تحليل نص بعد التحويل العربي ← إنجليزي"""
-    normalized = normalize_arabic(text)
+# ══════════════════════════════════════════════════
+#  Fast path: الصيغ الشائعة بعد normalize_arabic من غير dateparser
+#  "tomorrow 3 PM" / "thursday 9 AM" / "in 2 hours" / "7:00" / "now"
+#  نفس قواعد PREFER_DATES_FROM=future بس محسوبة بتوقيت القاهرة
+#  (dateparser بيقارن الوقت/اليوم بالـ UTC فبيغلط في أول 2-3 ساعات من اليوم)
+# ══════════════════════════════════════════════════
+
+_WEEKDAYS = {
+    "monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3,
+    "friday": 4, "saturday": 5, "sunday": 6,
+}
+_UNIT_DELTA = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+}
+_FAST_RELATIVE_RE = re.compile(r"(?:in|after) (\d{1,4}) (minute|hour|day|week)s?")
+_FAST_CLOCK_RE = re.compile(
+    r"(?:(today|tomorrow|" + "|".join(_WEEKDAYS) + r")(?: |$))?"
+    r"(?:(?:at )?(?:(\d{1,2})(?::(\d{2}))? ?(am|pm)|(\d{1,2}):(\d{2})))?"
+)
+
+_parse_total = metrics.counter(
+    "telepot_date_parse_total", "smart_parse calls by resolution path", ["path"]
+)
+_parse_seconds = metrics.histogram(
+    "telepot_date_parse_seconds", "smart_parse latency by resolution path", ["path"]
+)
+
+
+def fast_parse(normalized: str, now: datetime | None = None) -> datetime | None:
+    """parser صغير للصيغ الشائعة. يرجع None لو الصيغة مش معروفة (→ dateparser)"""
+    return _fast_parse(normalized, now)[0]
+
+
+def _fast_parse(normalized: str, now: datetime | None = None) -> tuple[datetime | None, bool]:
+    """fast_parse + relative: النتيجة محسوبة من "الآن" نفسه (مش ساعة على الحيطة)"""
+    s = normalized.lower()
+    if not s:
+        return None, False
+    if now is None:
+        now = clock.now()
+    local = now.replace(tzinfo=None)
+
+    if s == "now":
+        return now, True
+
+    m = _FAST_RELATIVE_RE.fullmatch(s)
+    if m:
+        delta = int(m.group(1)) * _UNIT_DELTA[m.group(2)]
+        if m.group(2) in ("minute", "hour"):
+            # وقت فعلي بيعدّي (حتى لو فيه تغيير توقيت صيفي)
+            return (now + delta).astimezone(CAIRO), True
+        # أيام/أسابيع: نفس الساعة على الحيطة
+        return CAIRO.localize(local + delta), True
+
+    m = _FAST_CLOCK_RE.fullmatch(s)
+    if not m:
+        return None, False
+    day, h12, m12, ampm, h24, m24 = m.groups()
+
+    if ampm:
+        hour, minute = int(h12), int(m12 or 0)
+        if not 1 <= hour <= 12:
+            return None, False
+        hour = hour % 12 + (12 if ampm == "pm" else 0)
+    elif h24 is not None:
+        hour, minute = int(h24), int(m24)
+        if hour > 23:
+            return None, False
+    elif day:
+        hour = minute = None
+    else:
+        return None, False
+    if minute is not None and minute > 59:
+        return None, False
+
+    if day in (None, "today", "tomorrow"):
+        base = local + timedelta(days=1) if day == "tomorrow" else local
+        if hour is None:
+            # "بكرة" من غير ساعة → نفس ساعة "الآن"
+            return CAIRO.localize(base), True
+        result = base.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if day is None and result <= local:
+            # وقت بس وعدّى النهاردة → بكرة
+            result += timedelta(days=1)
+        return CAIRO.localize(result), False
+
+    # يوم في الأسبوع: المرة الجاية (لو النهاردة نفس اليوم → الأسبوع الجاي)
+    ahead = (_WEEKDAYS[day] - local.weekday() - 1) % 7 + 1
+    result = (local + timedelta(days=ahead)).replace(
+        hour=hour or 0, minute=minute or 0, second=0, microsecond=0
+    )
+    return CAIRO.localize(result), False
+
+
+_span_cache = ParseCache("span")
+_message_cache = ParseCache("message")
+
+
+def smart_parse(text: str, now: datetime | None = None) -> datetime | None:
+    """
+    تحليل نص بعد التحويل العربي ← إنجليزي.
+    now: "الآن" ثابت (للـ benchmarks) – الافتراضي الساعة الحالية بتوقيت القاهرة.
+    """
+    return _cached_parse(text, normalize_arabic(text), now)[0]
+
+
+def _cached_parse(
+    text: str, normalized: str, now: datetime | None = None
+) -> tuple[datetime | None, bool]:
+    """_parse_normalized من ورا الـ cache (المفتاح = النص الأصلي اللي بيتحلل) → (due, relative)"""
+    base = now or clock.now()
+    hit, _, due, relative = _span_cache.lookup(text, base)
+    if hit:
+        return due, relative
+    due, relative = _parse_normalized(text, normalized, now)
+    _span_cache.store(text, base, None, due, relative)
+    return due, relative
+
+
+def _parse_normalized(
+    text: str, normalized: str, now: datetime | None = None
+) -> tuple[datetime | None, bool]:
+    """
+    smart_parse لنص اتعمله normalize_arabic خلاص (من غير ما نعيده).
+    relative حسب الطريق: fast_parse بيعرف بنفسه، ونتيجة dateparser دايمًا نسبية
+    (ممكن تكون شايلة ساعة "الآن": "الجمعة"، "بعد 3 أيام").
+    """
+    t0 = time.perf_counter()
     log.debug("Normalized: %r → %r", text, normalized)
 
-    parsed = dateparser.parse(normalized, settings=DATEPARSER_SETTINGS)
+    parsed, relative = _fast_parse(normalized, now)
     if parsed:
-        return parsed.astimezone(CAIRO)
+        _record_parse("fast", t0)
+        return parsed, relative
 
-    # fallback: جرب النص الأصلي
-    parsed = dateparser.parse(text, settings=DATEPARSER_SETTINGS)
+    with parse_span():
+        parsed = _dateparser_parse(normalized, now)
     if parsed:
-        return parsed.astimezone(CAIRO)
+        _record_parse("dateparser", t0)
+        return parsed.astimezone(CAIRO), True
+
+    # fallback: جرب النص الأصلي (لو normalize غيّرت فيه حاجة أصلًا)
+    if text != normalized:
+        with parse_span():
+            parsed = _dateparser_parse(text, now)
+        if parsed:
+            _record_parse("dateparser", t0)
+            return parsed.astimezone(CAIRO), True
 
-    return None
+    _record_parse("miss", t0)
+    return None, False
+
+
+def _dateparser_parse(text: str, now: datetime | None = None) -> datetime | None:
+    if now is None and clock.is_virtual():
+        now = clock.now()  # المحاكاة: "بكرة" من الوقت الافتراضي مش الحقيقي
+    parser = _default_parser() if now is None else _parser_at(now.replace(tzinfo=None))
+    data = parser.get_date_data(text)
+    return data["date_obj"] if data else None
+
+
+def _new_parser(settings: dict) -> DateDataParser:
+    # import dateparser هنا مش فوق: بياخد ~0.7s (regex tables + locale data)
+    # وأغلب الـ updates ضغط زراير مش محتاجاه → الـ cold start ما يستناهوش
+    from dateparser import DateDataParser
+
+    return DateDataParser(languages=DATEPARSER_LANGUAGES, settings=settings)
+
+
+@lru_cache(maxsize=1)
+def _default_parser() -> DateDataParser:
+    """parser واحد متظبط بيتعاد استخدامه – dateparser.parse(settings=...) بيبني واحد جديد كل مرة"""
+    return _new_parser(DATEPARSER_SETTINGS)
+
+
+@lru_cache(maxsize=8)
+def _parser_at(base: datetime) -> DateDataParser:
+    """parser بـ RELATIVE_BASE ثابت (للـ "now" الثابت بتاع الـ benchmarks)"""
+    return _new_parser(dict(DATEPARSER_SETTINGS, RELATIVE_BASE=base))
+
+
+def warm_date_parser() -> float:
+    """تحميل locale data بتاعة dateparser قبل أول رسالة. يرجع الزمن بالثواني"""
+    t0 = time.perf_counter()
+    for phrase in _WARMUP_PHRASES:
+        _dateparser_parse(phrase)
+    return time.perf_counter() - t0
+
+
+def _record_parse(path: str, t0: float) -> None:
+    _parse_total.inc(path=path)
+    _parse_seconds.observe(time.perf_counter() - t0, path=path)
 
 
 # أفعال تُشيل من العنوان (مش جزء من المهمة)
@@ -231,75 +536,123 @@ def clean_title(raw: str) -> str:
     return t if t else raw.strip()
 
 
-def _is_pure_date(text: str) -> bool:
-    """
-    بعد normalize_arabic، لو لسه فيه حروف عربية
-    يبقى فيه كلام مش تاريخ (كلمة من العنوان دخلت بالغلط).
-    """
-    normalized = normalize_arabic(text)
-    return not re.search(r"[\u0600-\u06FF]", normalized)
-
+# ══════════════════════════════════════════════════
+#  تحديد جزء التاريخ في الرسالة
+#  كل كلمة بتتعلّم مرة واحدة: "ممكن تبقى تاريخ" ولا "أكيد عنوان".
+#  الكلمة أكيد عنوان لو فيها حرف عربي مفيش ولا كلمة من القاموس بتغطيه –
+#  normalize_arabic عمرها ما هتشيله، فأي جزء فيه الكلمة دي مش تاريخ صافي.
+#  كده بنجرب بس الأجزاء اللي جوه أطول سلسلة كلمات تاريخ في الأول/الآخر،
+#  وكل جزء بيتعمله normalize مرة واحدة بس.
+# ══════════════════════════════════════════════════
 
-def parse_natural_date(text: str) -> tuple[str, datetime | None]:
+# كل حتة عربية ممكن قاعدة في normalize_arabic تاكلها
+_DATE_PIECES = {
+    piece
+    for phrase in (*RELATIVE_AR, *DAY_AR, *ARABIC_NUMBERS, *AM_WORDS, *PM_WORDS)
+    for piece in phrase.split()
+}
+_DATE_PIECES.update(
+    "و نص نصف الا إلا ربع تلت ثلث بعد كمان ساعه ساعة ساعات "
+    "دقيقه دقيقة دقايق دقائق دقيق الساعة الساعه "
+    "صحيني صحني نبهني فكرني قومني وريني ذكرني".split()
+)
+# lookahead: أطول حتة بتبدأ عند كل موضع (حتى لو متداخلة)
+_DATE_PIECE_RE = re.compile(rf"(?=({_alternation(_DATE_PIECES)}))")
+
+
+@lru_cache(maxsize=4096)
+def _maybe_date_word(word: str) -> bool:
+    """كل الحروف العربية في الكلمة متغطية بحتت من القاموس؟"""
+    word = word.translate(ARABIC_DIGIT_MAP)
+    if not ARABIC_RE.search(word):
+        return True
+    covered = [False] * len(word)
+    for m in _DATE_PIECE_RE.finditer(word):
+        for i in range(m.start(1), m.end(1)):
+            covered[i] = True
+    return all(covered[m.start()] for m in ARABIC_RE.finditer(word))
+
+
+def _try_date_part(
+    date_part: str, now: datetime | None = None
+) -> tuple[datetime | None, bool]:
+    """normalize مرة واحدة: لو فضل عربي يبقى مش تاريخ صافي، غير كده parse"""
+    normalized = normalize_arabic(date_part)
+    if ARABIC_RE.search(normalized):
+        return None, False
+    return _cached_parse(date_part, normalized, now)
+
+
+def parse_natural_date(
+    text: str, now: datetime | None = None
+) -> tuple[str, datetime | None]:
     """
     محاولة استخراج التاريخ من النص الطبيعي.
     يرجع (العنوان_النظيف, التاريخ أو None).
     """
-    # حاول تحليل النص كامل كتاريخ (لو كله تاريخ بدون عنوان)
-    if _is_pure_date(text):
-        parsed = smart_parse(text)
-        if parsed:
-            return text.strip(), parsed
-
+    base = now or clock.now()
+    hit, title, due, _ = _message_cache.lookup(text, base)
+    if hit:
+        return title, due
+    title, due, relative = _split_date(text, now)
+    _message_cache.store(text, base, title, due, relative)
+    return title, due
+
+
+def _split_date(
+    text: str, now: datetime | None = None
+) -> tuple[str, datetime | None, bool]:
+    """parse_natural_date من غير cache → (العنوان, التاريخ, relative)"""
     words = text.split()
-    best_date = None
-    best_title = text.strip()
+    n = len(words)
+    date_like = [_maybe_date_word(w) for w in words]
+    # طول سلسلة كلمات التاريخ من الأول ومن الآخر
+    head = next((i for i, ok in enumerate(date_like) if not ok), n)
+    tail = next((i for i, ok in enumerate(reversed(date_like)) if not ok), n)
+
+    # النص كله تاريخ (من غير عنوان)
+    if head == n:
+        parsed, relative = _try_date_part(text, now)
+        if parsed:
+            return text.strip(), parsed, relative
 
     # ──────────────────────────────────────────
-    # جرب من الأول: الأطول أولاً
-    # لكن: لازم بعد normalize ما يفضلش حروف عربية (يعني الجزء ده كله تاريخ)
-    # "بكرة 3 العصر" ✅ → "tomorrow 3 PM"
-    # "بكرة 3 العصر اشتري" ❌ → "tomorrow 3 PM اشتري" (فيه عربي)
+    # من الأول: الأطول أولاً (بحد أقصى 6 كلمات وكلمة واحدة على الأقل للعنوان)
+    # "بكرة 3 العصر اشتري" → date="بكرة 3 العصر", title="اشتري"
     # ──────────────────────────────────────────
-    max_date_words = min(len(words) - 1, 6)
-    for i in range(max_date_words, 0, -1):
-        date_part = " ".join(words[:i])
-        title_part = " ".join(words[i:])
-        if not _is_pure_date(date_part):
-            continue
-        parsed = smart_parse(date_part)
-        if parsed and title_part:
-            best_date = parsed
-            best_title = clean_title(title_part)
-            break
+    for i in range(min(n - 1, 6, head), 0, -1):
+        parsed, relative = _try_date_part(" ".join(words[:i]), now)
+        if parsed:
+            return clean_title(" ".join(words[i:])), parsed, relative
 
     # ──────────────────────────────────────────
-    # جرب من الآخر (التاريخ في نهاية الجملة)
+    # من الآخر (التاريخ في نهاية الجملة)
     # "اشتري هدية بكرة 3 العصر" → title="اشتري هدية", date="بكرة 3 العصر"
     # ──────────────────────────────────────────
-    if not best_date:
-        for i in range(1, min(len(words), 6)):
-            date_part = " ".join(words[i:])
-            title_part = " ".join(words[:i])
-            if not _is_pure_date(date_part):
-                continue
-            parsed = smart_parse(date_part)
-            if parsed and title_part:
-                best_date = parsed
-                best_title = clean_title(title_part)
-                break
+    for i in range(max(1, n - tail), min(n, 6)):
+        parsed, relative = _try_date_part(" ".join(words[i:]), now)
+        if parsed:
+            return clean_title(" ".join(words[:i])), parsed, relative
+
+    return text.strip(), None, False
+
 
-    return best_title, best_date
+def parse_due(text: str, now: datetime | None = None) -> datetime | None:
+    """رد على "امتى؟": النص كله تاريخ، أو تاريخ جواه كلام زيادة"""
+    due = smart_parse(text, now)
+    if not due:
+        _, due = parse_natural_date(text, now)
+    return due
 
 
 def is_past(dt: datetime) -> bool:
     """هل التاريخ في الماضي؟"""
-    return dt < datetime.now(CAIRO)
+    return dt < clock.now()
 
 
 def format_due(dt: datetime) -> str:
     """تنسيق التاريخ بشكل جميل مع وقت نسبي للقريب"""
-    now = datetime.now(CAIRO)
+    now = clock.now()
     diff = dt - now
     total_mins = int(diff.total_seconds() / 60)
     time_str = dt.strftime("%I:%M %p")
@@ -344,30 +697,54 @@ def format_due(dt: datetime) -> str:
 #  زر / أمر بدء الإضافة
 # ══════════════════════════════════════════════════
 
-@router.message(F.text == "➕ إضافة مهمة")
+def limit_text(current: int) -> str:
+    """رسالة "وصلت للحد" للمجاني"""
+    return (
+        "━━━━━━━━━━━━━━━━━━━━\n"
+        f"⚠️ <b>وصلت للحد الأقصى!</b>\n\n"
+        f"📦 خطتك: مجاني ({FREE_TASK_LIMIT} مهمة)\n"
+        f"📝 مهامك: {current}/{FREE_TASK_LIMIT}\n\n"
+        "⭐ <b>ترقَّ لـ Premium:</b>\n"
+        "  ♾ مهام غير محدودة\n"
+        "  🔄 تكرار يومي/أسبوعي\n"
+        "  ☀️ ملخص صباحي\n\n"
+        "👉 اضغط /premium للترقية\n"
+        "━━━━━━━━━━━━━━━━━━━━"
+    )
+
+
+async def save_task(
+    message: types.Message,
+    state: FSMContext,
+    title: str,
+    due: datetime | None = None,
+    recurrence: str | None = None,
+) -> int | None:
+    """
+    الإضافة الفعلية: الحد بيتراجع في نفس الـ INSERT (add_task_limited).
+    لو اتعدّى من وقت ما الـ flow بدأ (إضافة تانية سبقت / الاشتراك خلص) → رسالة الحد و None.
+    """
+    from handlers.start import main_keyboard
+
+    task_id = await add_task_limited(message.from_user.id, title, due, recurrence)
+    if task_id is None:
+        await state.clear()
+        current = await count_tasks(message.from_user.id)
+        await message.answer(limit_text(current), parse_mode="HTML", reply_markup=main_keyboard())
+    return task_id
+
+
+@button("➕ إضافة مهمة")
 async def start_add_task(message: types.Message, state: FSMContext) -> None:
     """بدء عملية إضافة مهمة عبر FSM"""
     await ensure_user(message.from_user.id, message.from_user.username)
     uid = message.from_user.id
 
-    # تحقق من الحد للمجاني
+    # تحقق مبكر من الحد للمجاني (عشان ما يكتبش المهمة على الفاضي)؛ الحد الفعلي في save_task
     if not await is_premium(uid):
         current = await count_tasks(uid)
         if current >= FREE_TASK_LIMIT:
-            remaining = FREE_TASK_LIMIT - current
-            await message.answer(
-                "━━━━━━━━━━━━━━━━━━━━\n"
-                f"⚠️ <b>وصلت للحد الأقصى!</b>\n\n"
-                f"📦 خطتك: مجاني ({FREE_TASK_LIMIT} مهمة)\n"
-                f"📝 مهامك: {current}/{FREE_TASK_LIMIT}\n\n"
-                "⭐ <b>ترقَّ لـ Premium:</b>\n"
-                "  ♾ مهام غير محدودة\n"
-                "  🔄 تكرار يومي/أسبوعي\n"
-                "  ☀️ ملخص صباحي\n\n"
-                "👉 اضغط /premium للترقية\n"
-                "━━━━━━━━━━━━━━━━━━━━",
-                parse_mode="HTML",
-            )
+            await message.answer(limit_text(current), parse_mode="HTML")
             return
 
     await state.set_state(AddTaskFSM.waiting_title)
@@ -404,7 +781,7 @@ async def receive_title(message: types.Message, state: FSMContext) -> None:
     from handlers.start import main_keyboard
 
     raw = message.text.strip()
-    title, due = parse_natural_date(raw)
+    title, due = await run_parse(parse_natural_date, raw, default=(raw, None))
 
     if due:
         # تحقق من أن التاريخ مش في الماضي
@@ -442,7 +819,9 @@ async def receive_title(message: types.Message, state: FSMContext) -> None:
                 ),
             )
         else:
-            task_id = await add_task(uid, title, due)
+            task_id = await save_task(message, state, title, due)
+            if task_id is None:
+                return
             await state.clear()
             await message.answer(
                 "━━━━━━━━━━━━━━━━━━━━\n"
@@ -492,7 +871,9 @@ async def receive_due(message: types.Message, state: FSMContext) -> None:
     raw = message.text.strip()
 
     if raw in ("بدون", "لا", "لأ", "مفيش", "مش عايز", "no", "none", "skip", "لا شكرا"):
-        task_id = await add_task(uid, title, due=None)
+        task_id = await save_task(message, state, title)
+        if task_id is None:
+            return
         await state.clear()
         await message.answer(
             "━━━━━━━━━━━━━━━━━━━━\n"
@@ -506,10 +887,7 @@ async def receive_due(message: types.Message, state: FSMContext) -> None:
         )
         return
 
-    due = smart_parse(raw)
-    if not due:
-        _, extracted = parse_natural_date(raw)
-        due = extracted
+    due = await run_parse(parse_due, raw, default=None)
 
     if not due:
         await message.answer(
@@ -558,7 +936,9 @@ async def receive_due(message: types.Message, state: FSMContext) -> None:
             ),
         )
     else:
-        task_id = await add_task(uid, title, due)
+        task_id = await save_task(message, state, title, due)
+        if task_id is None:
+            return
         await state.clear()
         await message.answer(
             "━━━━━━━━━━━━━━━━━━━━\n"
@@ -585,7 +965,6 @@ async def receive_recurrence(message: types.Message, state: FSMContext) -> None:
     data = await state.get_data()
     title = data["title"]
     due = datetime.fromisoformat(data["due"])
-    uid = message.from_user.id
 
     recurrence = None
     raw = message.text.strip()
@@ -594,7 +973,9 @@ async def receive_recurrence(message: types.Message, state: FSMContext) -> None:
     elif "أسبوعي" in raw or "weekly" in raw.lower():
         recurrence = "weekly"
 
-    task_id = await add_task(uid, title, due, recurrence)
+    task_id = await save_task(message, state, title, due, recurrence)
+    if task_id is None:
+        return
     await state.clear()
 
     due_display = format_due(due)
@@ -0,0 +1,103 @@
+"""
+handlers/admin.py – أوامر الأدمن
+- /perf: ملخص أداء الـ handlers من الـ tracing
+- /stats: المشتركين الفعالين + المدفوعات (من جدول stats، من غير scan)
+"""
+
+from __future__ import annotations
+
+import math
+import os
+
+from aiogram import Router, types, F
+from aiogram.filters import Command
+
+import tracing
+from database import get_stats
+
+router = Router(name="admin")
+
+# ─── IDs الأدمن (مفصولة بفاصلة) ───
+ADMIN_IDS = {
+    int(x) for x in os.getenv("ADMIN_IDS", "").replace(" ", "").split(",") if x
+}
+
+router.message.filter(F.from_user.id.in_(ADMIN_IDS))
+
+
+def _ms(seconds: float | None) -> str:
+    if seconds is None:
+        return "-"
+    if seconds == float("inf"):
+        return ">10s"
+    return f"{seconds * 1000:.0f}ms"
+
+
+def _quantile(values: list[float], q: float) -> float:
+    """nearest-rank على نفس الـ traces اللي اتحسب منها الـ avg (مش الـ histogram من أول التشغيل)"""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q * len(ordered)) - 1, 0)]
+
+
+@router.message(Command("perf"))
+async def cmd_perf(message: types.Message) -> None:
+    """ملخص زمن الـ handlers (p50/p99 + DB + API)"""
+    traces = list(tracing.recent)
+    if not traces:
+        rate = tracing.TRACE_SAMPLE_RATE
+        await message.answer(
+            "📉 <b>مفيش traces لسه</b>\n\n"
+            f"🎯 TRACE_SAMPLE_RATE = {rate:g}",
+            parse_mode="HTML",
+        )
+        return
+
+    by_handler: dict[str, list[tracing.Trace]] = {}
+    for t in traces:
+        by_handler.setdefault(t.handler, []).append(t)
+
+    lines = [
+        "━━━━━━━━━━━━━━━━━━━━",
+        f"⏱ <b>الأداء (آخر {len(traces)} update)</b>",
+        "━━━━━━━━━━━━━━━━━━━━",
+    ]
+    for name, items in sorted(by_handler.items(), key=lambda kv: -len(kv[1])):
+        n = len(items)
+        walls = [t.wall for t in items]
+        avg_wall = sum(walls) / n
+        avg_db = sum(t.db_time for t in items) / n
+        db_calls = sum(t.db_calls for t in items) / n
+        avg_api = sum(t.api_time for t in items) / n
+        api_calls = sum(t.api_calls for t in items) / n
+        avg_parse = sum(t.parse_time for t in items) / n
+        lines.append(
+            f"\n<b>{name}</b> ×{n}\n"
+            f"  🕐 avg {_ms(avg_wall)} • p50 {_ms(_quantile(walls, 0.5))}"
+            f" • p99 {_ms(_quantile(walls, 0.99))}\n"
+            f"  🗄 DB {_ms(avg_db)} ({db_calls:.1f} calls)\n"
+            f"  📅 parse {_ms(avg_parse)}\n"
+            f"  📡 API {_ms(avg_api)} ({api_calls:.1f} calls)"
+        )
+
+    slowest = max(traces, key=lambda t: t.wall)
+    lines.append(f"\n🐢 الأبطأ: <b>{slowest.handler}</b> {_ms(slowest.wall)}")
+    await message.answer("\n".join(lines), parse_mode="HTML")
+
+
+@router.message(Command("stats"))
+async def cmd_stats(message: types.Message) -> None:
+    """المشتركين الفعالين + عدد المدفوعات + الإيراد لكل عملة"""
+    stats = await get_stats()
+    revenue = [
+        f"  💰 {value} {name.removeprefix('revenue_')}"
+        for name, value in sorted(stats.items()) if name.startswith("revenue_")
+    ] or ["  💰 0"]
+    await message.answer(
+        "━━━━━━━━━━━━━━━━━━━━\n"
+        "📊 <b>الإحصائيات</b>\n"
+        "━━━━━━━━━━━━━━━━━━━━\n\n"
+        f"⭐ مشتركين Premium دلوقتي: <b>{stats.get('active_subscribers', 0)}</b>\n"
+        f"💳 عمليات الدفع: <b>{stats.get('payments', 0)}</b>\n"
+        "📈 الإيراد:\n" + "\n".join(revenue),
+        parse_mode="HTML",
+    )
@@ -0,0 +1,80 @@
+"""
+handlers/buttons.py – fast path لأزرار الـ reply keyboard
+كل زرار ("📋 مهامي"، "➕ إضافة مهمة"، ...) بيتسجل هنا بـ @button(label)
+بدل F.text == label في كل router:
+- الرسالة بتعدي على dict lookup واحد بدل سلسلة filters في 5 routers
+- النص الحر (تحليل التواريخ / FSM) بيوصل للـ routers التانية بس لو مش زرار
+- الزرار بيكسب على أي FSM state (قبل كده "📋 مهامي" وإنت في waiting_title
+  كانت بتتسجل كعنوان مهمة)، والـ state بيتمسح قبل الـ handler عشان الرسالة
+  الجاية ما تتاخدش كعنوان/موعد – ماعدا CANCEL اللي الـ state handlers بتمسكه
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from aiogram import Router
+from aiogram.dispatcher.event.bases import UNHANDLED
+from aiogram.dispatcher.event.handler import CallbackType, HandlerObject
+from aiogram.dispatcher.event.telegram import TelegramEventObserver
+from aiogram.fsm.context import FSMContext
+from aiogram.types import Message
+
+import metrics
+
+# زرار الإلغاء بتاع الـ FSM: ما بيتسجلش هنا، ومايمسحش الـ state (الـ state handler بيرد عليه)
+CANCEL = "❌ إلغاء"
+
+_button_updates = metrics.counter(
+    "telepot_button_updates_total", "Messages checked against the button table", ["result"]
+)
+
+
+class ButtonTable(TelegramEventObserver):
+    """observer للرسائل: label → handler في dict واحد (من غير filters)"""
+
+    def __init__(self, router: Router, event_name: str = "message") -> None:
+        super().__init__(router=router, event_name=event_name)
+        self.table: dict[str, HandlerObject] = {}
+
+    def add(self, label: str, callback: CallbackType) -> None:
+        if label in self.table:
+            raise ValueError(f"Button {label!r} already bound to {self.table[label].callback.__name__}")
+        self.table[label] = handler = HandlerObject(callback=callback)
+        # في handlers كمان عشان resolve_used_update_types يشوف إن فيه message handlers
+        self.handlers.append(handler)
+
+    async def trigger(self, event: Message, **kwargs: Any) -> Any:
+        handler = self.table.get(event.text) if event.text else None
+        if handler is None:
+            _button_updates.inc(result="miss")
+            return UNHANDLED
+        _button_updates.inc(result="hit")
+        state: FSMContext | None = kwargs.get("state")
+        if state is not None and event.text != CANCEL and await state.get_state() is not None:
+            # سايب FSM في النص → خروج منه (الـ handler ممكن يبدأ state جديد)
+            await state.clear()
+        # نفس اللي TelegramEventObserver.trigger بيعمله للـ handler اللي filters بتاعته عدّت:
+        # inner middlewares (tracing) + حقن الـ kwargs اللي الـ handler طالبها بس
+        kwargs["handler"] = handler
+        wrapped = self.outer_middleware.wrap_middlewares(self._resolve_middlewares(), handler.call)
+        return await wrapped(event, kwargs)
+
+
+class ButtonRouter(Router):
+    """Router الـ message observer بتاعه ButtonTable"""
+
+    def __init__(self, *, name: str | None = None) -> None:
+        super().__init__(name=name)
+        self.message = self.observers["message"] = ButtonTable(router=self)
+
+
+router = ButtonRouter(name="buttons")
+
+
+def button(label: str):
+    """decorator: يربط label زرار بالـ handler (وبيرجع الـ handler زي ما هو عشان decorators تانية)"""
+    def decorator(callback: CallbackType) -> CallbackType:
+        router.message.add(label, callback)
+        return callback
+    return decorator
@@ -1,47 +1,166 @@
 """
 handlers/callbacks.py – معالجة callback queries (done / delete)
+- done:/del: → رسايل المهام القديمة (رسالة لكل مهمة)
+- tdone:/tdel: → أزرار قائمة المهام بالصفحات (بتعدّل نفس الصفحة)
+  الأربعة بيردوا على الضغطة فورًا والـ DB + edit بعدها (effects.py)
+- ttog:/tbulk: → التحديد والعمليات الجماعية (query واحدة + تعديل واحد لكل عملية)
 """
 
 from aiogram import Router, types, F
+from aiogram.fsm.context import FSMContext
 
-from database import mark_done, delete_task
+import metrics
+from database import (
+    mark_done, delete_task,
+    mark_done_many, delete_tasks, mark_overdue_done, delete_done_tasks,
+)
+from effects import acknowledge, defer
+from handlers.list_tasks import (
+    SELECT_LIMIT, confirm_purge_keyboard, edit_page, get_selection, set_selection,
+)
 
 router = Router(name="callbacks")
 
+MISSING_TASK = "❌ <i>المهمة مش موجودة أو اتحذفت.</i>"
+
+_bulk_ops = metrics.counter(
+    "telepot_bulk_task_ops_total", "عمليات المهام الجماعية", ("op",)
+)
+_bulk_tasks = metrics.counter(
+    "telepot_bulk_tasks_total", "عدد المهام اللي اتغيّرت في عمليات جماعية", ("op",)
+)
+
 
 @router.callback_query(F.data.startswith("done:"))
-async def cb_done(callback: types.CallbackQuery) -> None:
-    """تحديد مهمة كمنتهية"""
+async def cb_done(callback: types.CallbackQuery, received_at: float | None = None) -> None:
+    """تحديد مهمة كمنتهية (الرد الأول، والتنفيذ بعده)"""
     task_id = int(callback.data.split(":")[1])
-    uid = callback.from_user.id
-    success = await mark_done(task_id, uid)
-
-    if success:
-        await callback.message.edit_text(
-            "━━━━━━━━━━━━━━━━━━━━\n"
-            "✅ <b>تم إنجاز المهمة!</b> 🎉\n"
-            "━━━━━━━━━━━━━━━━━━━━\n\n"
-            f"<s>{callback.message.text}</s>\n\n"
-            "👏 أحسنت! استمر كده!",
-            parse_mode="HTML",
-        )
-        await callback.answer("✅ برافو عليك! 🎉")
-    else:
-        await callback.answer("❌ المهمة مش موجودة أو اتحذفت.", show_alert=True)
+    await acknowledge(callback, "✅ برافو عليك! 🎉", received_at)
+    defer(callback, lambda: _apply_done(callback, task_id))
+
+
+async def _apply_done(callback: types.CallbackQuery, task_id: int) -> bool:
+    if not await mark_done(task_id, callback.from_user.id):
+        await callback.message.edit_text(MISSING_TASK, parse_mode="HTML")
+        return False
+    await callback.message.edit_text(
+        "━━━━━━━━━━━━━━━━━━━━\n"
+        "✅ <b>تم إنجاز المهمة!</b> 🎉\n"
+        "━━━━━━━━━━━━━━━━━━━━\n\n"
+        f"<s>{callback.message.text}</s>\n\n"
+        "👏 أحسنت! استمر كده!",
+        parse_mode="HTML",
+    )
+    return True
 
 
 @router.callback_query(F.data.startswith("del:"))
-async def cb_delete(callback: types.CallbackQuery) -> None:
-    """حذف مهمة"""
+async def cb_delete(callback: types.CallbackQuery, received_at: float | None = None) -> None:
+    """حذف مهمة (الرد الأول، والتنفيذ بعده)"""
     task_id = int(callback.data.split(":")[1])
+    await acknowledge(callback, "🗑 تم الحذف.", received_at)
+    defer(callback, lambda: _apply_delete(callback, task_id))
+
+
+async def _apply_delete(callback: types.CallbackQuery, task_id: int) -> bool:
+    if not await delete_task(task_id, callback.from_user.id):
+        await callback.message.edit_text(MISSING_TASK, parse_mode="HTML")
+        return False
+    await callback.message.edit_text(
+        "🗑 <i>تم حذف المهمة نهائيًا.</i>",
+        parse_mode="HTML",
+    )
+    return True
+
+
+# ══════════════════════════════════════════════════
+#  من قائمة المهام بالصفحات: "tdone:<id>:<page token>"
+# ══════════════════════════════════════════════════
+
+@router.callback_query(F.data.startswith("tdone:"))
+async def cb_page_done(callback: types.CallbackQuery, received_at: float | None = None) -> None:
+    """تحديد مهمة كمنتهية + تحديث نفس الصفحة"""
+    _, task_id, token = callback.data.split(":", 2)
+    await acknowledge(callback, "✅ برافو عليك! 🎉", received_at)
+    defer(callback, lambda: _apply_page(callback, mark_done, int(task_id), token))
+
+
+@router.callback_query(F.data.startswith("tdel:"))
+async def cb_page_delete(callback: types.CallbackQuery, received_at: float | None = None) -> None:
+    """حذف مهمة + تحديث نفس الصفحة"""
+    _, task_id, token = callback.data.split(":", 2)
+    await acknowledge(callback, "🗑 تم الحذف.", received_at)
+    defer(callback, lambda: _apply_page(callback, delete_task, int(task_id), token))
+
+
+async def _apply_page(callback: types.CallbackQuery, action, task_id: int, token: str) -> bool:
+    # لو المهمة اتشالت من مكان تاني، إعادة رسم الصفحة كفاية (مش هتظهر فيها)
+    success = await action(task_id, callback.from_user.id)
+    await edit_page(callback, token)
+    return success
+
+
+# ══════════════════════════════════════════════════
+#  تحديد كذا مهمة + عمليات جماعية: "ttog:<id>:<token>" / "tbulk:<op>:<token>"
+# ══════════════════════════════════════════════════
+
+@router.callback_query(F.data.startswith("ttog:"))
+async def cb_toggle(callback: types.CallbackQuery, state: FSMContext) -> None:
+    """☑️/⬜ مهمة في وضع التحديد"""
+    _, task_id, token = callback.data.split(":", 2)
+    selected = await get_selection(state) or set()
+    selected ^= {int(task_id)}
+    if len(selected) > SELECT_LIMIT:
+        await callback.answer(f"⚠️ أقصى حاجة {SELECT_LIMIT} مهمة في المرة.", show_alert=True)
+        return
+    await set_selection(state, selected)
+    await edit_page(callback, token, selected)
+    await callback.answer()
+
+
+@router.callback_query(F.data.startswith("tbulk:"))
+async def cb_bulk(callback: types.CallbackQuery, state: FSMContext) -> None:
+    """select / exit / done / del / overdue / purge (تأكيد) / purge! (تنفيذ)"""
+    _, op, token = callback.data.split(":", 2)
     uid = callback.from_user.id
-    success = await delete_task(task_id, uid)
-
-    if success:
-        await callback.message.edit_text(
-            "🗑 <i>تم حذف المهمة نهائيًا.</i>",
-            parse_mode="HTML",
-        )
-        await callback.answer("🗑 تم الحذف.")
+
+    if op == "select":
+        await set_selection(state, set())
+        await edit_page(callback, token, set())
+        await callback.answer("☑️ اختار المهام من الأرقام")
+        return
+    if op == "exit":
+        await set_selection(state, None)
+        await edit_page(callback, token)
+        await callback.answer()
+        return
+    if op == "purge":
+        # حذف نهائي → تأكيد الأول (الكيبورد بس)
+        await callback.message.edit_reply_markup(reply_markup=confirm_purge_keyboard(token))
+        await callback.answer("⚠️ متأكد؟ الحذف نهائي.")
+        return
+
+    if op in ("done", "del"):
+        selected = await get_selection(state) or set()
+        if not selected:
+            await callback.answer("⬜ مفيش مهام متحددة.")
+            return
+        action = mark_done_many if op == "done" else delete_tasks
+        changed = await action(uid, selected)
+        await set_selection(state, None)
+    elif op == "overdue":
+        changed = await mark_overdue_done(uid)
+    elif op == "purge!":
+        changed = await delete_done_tasks(uid)
+    else:
+        await callback.answer()
+        return
+
+    label = op.rstrip("!")
+    _bulk_ops.inc(op=label)
+    _bulk_tasks.inc(changed, op=label)
+    await edit_page(callback, token)
+    if op in ("done", "overdue"):
+        await callback.answer(f"✅ {changed} مهمة خلصت! 🎉" if changed else "مفيش حاجة اتغيّرت.")
     else:
-        await callback.answer("❌ المهمة مش موجودة أو اتحذفت.", show_alert=True)
+        await callback.answer(f"🗑 اتحذف {changed} مهمة." if changed else "مفيش حاجة اتحذفت.")
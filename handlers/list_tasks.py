@@ -1,21 +1,58 @@
 """
-handlers/list_tasks.py – عرض المهام مع inline buttons
+handlers/list_tasks.py – عرض المهام في رسالة واحدة بصفحات
+- كل صفحة TASKS_PAGE_SIZE مهمة + أزرار ✅/🗑 مترقمة
+- السابق/التالي بيعدّلوا نفس الرسالة (edit_text) بدل رسالة لكل مهمة
+- الصفحات من get_tasks_page (keyset + الأعداد في نفس الـ query) مش من تحميل كل المهام
+- عمليات جماعية: كل المتأخرة ✅ / حذف المنتهية / وضع التحديد (☑️ على كذا مهمة)
+  والتنفيذ في handlers/callbacks.py بـ query واحدة وتعديل واحد للرسالة
 """
 
 from __future__ import annotations
 
-from datetime import datetime
+import os
 
-import pytz
 from aiogram import Router, types, F
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.filters import Command
+from aiogram.fsm.context import FSMContext
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
-from database import get_tasks, is_premium, count_tasks, FREE_TASK_LIMIT
+import clock
+from handlers.buttons import button
+from database import get_tasks_page, is_premium, FREE_TASK_LIMIT
+from models import Task
 
-CAIRO = pytz.timezone("Africa/Cairo")
 router = Router(name="list_tasks")
 
+TASKS_PAGE_SIZE = int(os.getenv("TASKS_PAGE_SIZE", "8"))
+
+# ─── page token في الـ callback_data: "<op><start>:<id>:<due>" ───
+# n = بعد المهمة دي، p = قبلها، s = من أول المهمة دي (نفس الصفحة بعد ✅/🗑)
+# start = رقم أول مهمة في الصفحة (للترقيم)؛ due آخر حاجة عشان فيه ":"
+_TOKEN_OPS = {"n": ">", "p": "<", "s": ">="}
+FIRST_PAGE = "n0:0:"
+
+# ─── وضع التحديد: IDs المهام المتحددة في الـ FSM data (مش في الـ callback_data: ≤ 64 byte) ───
+SELECTION_KEY = "task_selection"
+SELECT_LIMIT = 100
+CHECKBOXES_PER_ROW = 4
+
+
+def page_token(op: str, start: int, task: Task) -> str:
+    return f"{op}{start}:{task.id}:{task.due or ''}"
+
+
+def parse_page_token(token: str) -> tuple[int, tuple[str, str, int]]:
+    """token → (start, cursor بتاع get_tasks_page)"""
+    start, task_id, due = token[1:].split(":", 2)
+    return max(int(start), 0), (_TOKEN_OPS[token[0]], due, int(task_id))
+
+
+def _callback(prefix: str, token: str) -> str:
+    data = f"{prefix}{token}"
+    # Telegram: callback_data ≤ 64 byte – لو عدّاها نرجع لأول صفحة بدل ما الإرسال يفشل
+    return data if len(data.encode()) <= 64 else f"{prefix}{FIRST_PAGE}"
+
 
 def task_keyboard(task_id: int) -> InlineKeyboardMarkup:
     """أزرار done / delete لمهمة معينة"""
@@ -29,74 +66,169 @@ def task_keyboard(task_id: int) -> InlineKeyboardMarkup:
     )
 
 
-def format_task(t: dict, idx: int) -> str:
+def format_task(t: Task, idx: int) -> str:
     """تنسيق مهمة واحدة للعرض"""
-    status = "✅" if t["is_done"] else "📌"
-    line = f"{status} <b>{idx}. {t['title']}</b>"
-    if t["due"]:
-        due_dt = datetime.fromisoformat(t["due"])
-        now = datetime.now(CAIRO)
-        due_str = due_dt.strftime("%Y-%m-%d %I:%M %p")
-        if due_dt < now and not t["is_done"]:
+    status = "✅" if t.is_done else "📌"
+    line = f"{status} <b>{idx}. {t.title}</b>"
+    if t.due:
+        now = clock.now()
+        due_str = t.due_at.strftime("%Y-%m-%d %I:%M %p")
+        if t.due_at < now and not t.is_done:
             line += f"\n   🔴 <s>{due_str}</s> ⚠️ متأخرة!"
         else:
             line += f"\n   🕐 {due_str}"
     else:
         line += "\n   ⚡ بدون موعد"
-    if t.get("recurrence"):
+    if t.recurrence:
         rec_map = {"daily": "يومي 📅", "weekly": "أسبوعي 📆"}
-        line += f"\n   🔄 {rec_map.get(t['recurrence'], t['recurrence'])}"
+        line += f"\n   🔄 {rec_map.get(t.recurrence, t.recurrence)}"
     return line
 
 
-@router.message(F.text == "📋 مهامي")
-@router.message(Command("tasks"))
-async def show_tasks(message: types.Message) -> None:
-    """عرض مهام المستخدم"""
-    uid = message.from_user.id
-    tasks = await get_tasks(uid, include_done=False)
-
-    if not tasks:
-        premium = await is_premium(uid)
-        text = (
-            "━━━━━━━━━━━━━━━━━━━━\n"
-            "📭 <b>لا توجد مهام حاليًا</b>\n"
-            "━━━━━━━━━━━━━━━━━━━━\n\n"
-            "🎯 اضغط ➕ لإضافة أول مهمة!\n"
-            "أو اكتب مباشرة:\n"
-            '<i>"بكرة 9 الصبح ميتنج"</i>'
-        )
-        if not premium:
-            text += "\n\n⭐ ترقَّ لـ Premium: مهام غير محدودة + تكرار!"
-        await message.answer(text, parse_mode="HTML")
-        return
-
-    # إحصائيات
-    total = len(tasks)
-    overdue = sum(
-        1 for t in tasks
-        if t["due"] and datetime.fromisoformat(t["due"]) < datetime.now(CAIRO)
+async def get_selection(state: FSMContext) -> set[int] | None:
+    """المهام المتحددة، أو None لو مش في وضع التحديد"""
+    selected = (await state.get_data()).get(SELECTION_KEY)
+    return None if selected is None else set(selected)
+
+
+async def set_selection(state: FSMContext, selected: set[int] | None) -> None:
+    await state.update_data({SELECTION_KEY: None if selected is None else sorted(selected)})
+
+
+def empty_text(premium: bool) -> str:
+    text = (
+        "━━━━━━━━━━━━━━━━━━━━\n"
+        "📭 <b>لا توجد مهام حاليًا</b>\n"
+        "━━━━━━━━━━━━━━━━━━━━\n\n"
+        "🎯 اضغط ➕ لإضافة أول مهمة!\n"
+        "أو اكتب مباشرة:\n"
+        '<i>"بكرة 9 الصبح ميتنج"</i>'
+    )
+    if not premium:
+        text += "\n\n⭐ ترقَّ لـ Premium: مهام غير محدودة + تكرار!"
+    return text
+
+
+async def render_page(
+    uid: int, token: str = FIRST_PAGE, selected: set[int] | None = None,
+) -> tuple[str, InlineKeyboardMarkup | None]:
+    """نص + كيبورد صفحة واحدة من المهام (selected مش None → وضع التحديد)"""
+    start, cursor = parse_page_token(token)
+    backward = cursor[0] == "<"
+    rows, total, overdue = await get_tasks_page(
+        uid, cursor, TASKS_PAGE_SIZE if backward else TASKS_PAGE_SIZE + 1,
     )
+    if not rows and token != FIRST_PAGE:
+        # الصفحة فضيت (اتنفذت/اتحذفت كل مهامها) → أول صفحة
+        return await render_page(uid, selected=selected)
+
     premium = await is_premium(uid)
+    if not rows:
+        return empty_text(premium), None
+
+    has_next = backward or len(rows) > TASKS_PAGE_SIZE
+    tasks = rows[:TASKS_PAGE_SIZE]
+    if backward and len(tasks) < TASKS_PAGE_SIZE:
+        start = 0  # مهام اتحذفت قبل الصفحة دي → الترقيم يبدأ من الأول
 
     # Header
-    header_parts = [
+    parts = [
         "━━━━━━━━━━━━━━━━━━━━\n",
         f"📋 <b>مهامك ({total})</b>",
     ]
     if overdue:
-        header_parts.append(f" • 🔴 {overdue} متأخرة")
+        parts.append(f" • 🔴 {overdue} متأخرة")
     if not premium:
-        limit_count = await count_tasks(uid)
-        header_parts.append(f"\n📦 {limit_count}/{FREE_TASK_LIMIT} (مجاني)")
-    header_parts.append("\n━━━━━━━━━━━━━━━━━━━━")
-
-    await message.answer("".join(header_parts), parse_mode="HTML")
-
-    for idx, t in enumerate(tasks, 1):
-        text = format_task(t, idx)
-        await message.answer(
-            text,
-            parse_mode="HTML",
-            reply_markup=task_keyboard(t["id"]),
-        )
+        parts.append(f"\n📦 {total}/{FREE_TASK_LIMIT} (مجاني)")
+    if selected is not None:
+        parts.append(f"\n☑️ وضع التحديد • {len(selected)} متحددة")
+    parts.append("\n━━━━━━━━━━━━━━━━━━━━\n\n")
+    parts.append("\n\n".join(format_task(t, start + i) for i, t in enumerate(tasks, 1)))
+    pages = -(-total // TASKS_PAGE_SIZE)
+    if pages > 1:
+        parts.append(f"\n\n📄 صفحة {start // TASKS_PAGE_SIZE + 1}/{pages}")
+
+    # أزرار ✅/🗑 مترقمة: بترجع لنفس الصفحة (من أول مهمة فيها)
+    here = page_token("s", start, tasks[0])
+    if selected is None:
+        keyboard = [
+            [
+                InlineKeyboardButton(text=f"✅ {start + i}", callback_data=_callback(f"tdone:{t.id}:", here)),
+                InlineKeyboardButton(text=f"🗑 {start + i}", callback_data=_callback(f"tdel:{t.id}:", here)),
+            ]
+            for i, t in enumerate(tasks, 1)
+        ]
+    else:
+        boxes = [
+            InlineKeyboardButton(
+                text=f"{'☑️' if t.id in selected else '⬜'} {start + i}",
+                callback_data=_callback(f"ttog:{t.id}:", here),
+            )
+            for i, t in enumerate(tasks, 1)
+        ]
+        keyboard = [boxes[i:i + CHECKBOXES_PER_ROW] for i in range(0, len(boxes), CHECKBOXES_PER_ROW)]
+    nav = []
+    if start > 0:
+        prev_token = page_token("p", max(start - TASKS_PAGE_SIZE, 0), tasks[0])
+        nav.append(InlineKeyboardButton(text="◀️ السابق", callback_data=_callback("tpage:", prev_token)))
+    if has_next:
+        next_token = page_token("n", start + len(tasks), tasks[-1])
+        nav.append(InlineKeyboardButton(text="التالي ▶️", callback_data=_callback("tpage:", next_token)))
+    if nav:
+        keyboard.append(nav)
+    keyboard.extend(bulk_rows(here, overdue, selected))
+    return "".join(parts), InlineKeyboardMarkup(inline_keyboard=keyboard)
+
+
+def bulk_rows(here: str, overdue: int, selected: set[int] | None) -> list[list[InlineKeyboardButton]]:
+    """صف العمليات الجماعية: "tbulk:<op>:<page token>" """
+    def btn(text: str, op: str) -> InlineKeyboardButton:
+        return InlineKeyboardButton(text=text, callback_data=_callback(f"tbulk:{op}:", here))
+
+    if selected is None:
+        row = [btn("☑️ تحديد", "select")]
+        if overdue:
+            row.append(btn(f"✅ المتأخرة ({overdue})", "overdue"))
+        row.append(btn("🧹 المنتهية", "purge"))
+        return [row]
+    rows = []
+    if selected:
+        rows.append([btn(f"✅ تم ({len(selected)})", "done"), btn(f"🗑 حذف ({len(selected)})", "del")])
+    rows.append([btn("✖️ إنهاء التحديد", "exit")])
+    return rows
+
+
+def confirm_purge_keyboard(here: str) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(
+        inline_keyboard=[[
+            InlineKeyboardButton(text="⚠️ أيوه، احذف كل المنتهية", callback_data=_callback("tbulk:purge!:", here)),
+            InlineKeyboardButton(text="↩️ رجوع", callback_data=_callback("tpage:", here)),
+        ]]
+    )
+
+
+async def edit_page(callback: types.CallbackQuery, token: str, selected: set[int] | None = None) -> None:
+    """تعديل رسالة القائمة نفسها للصفحة token"""
+    text, kb = await render_page(callback.from_user.id, token, selected)
+    try:
+        await callback.message.edit_text(text, parse_mode="HTML", reply_markup=kb)
+    except TelegramBadRequest as e:
+        # نفس المحتوى (ضغطتين ورا بعض) مش غلط
+        if "message is not modified" not in str(e):
+            raise
+
+
+@button("📋 مهامي")
+@router.message(Command("tasks"))
+async def show_tasks(message: types.Message, state: FSMContext) -> None:
+    """عرض مهام المستخدم (أول صفحة)"""
+    await set_selection(state, None)
+    text, kb = await render_page(message.from_user.id)
+    await message.answer(text, parse_mode="HTML", reply_markup=kb)
+
+
+@router.callback_query(F.data.startswith("tpage:"))
+async def cb_page(callback: types.CallbackQuery, state: FSMContext) -> None:
+    """السابق / التالي (وضع التحديد بيفضل زي ما هو)"""
+    await edit_page(callback, callback.data.split(":", 1)[1], await get_selection(state))
+    await callback.answer()
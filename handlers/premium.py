@@ -2,22 +2,22 @@
 handlers/premium.py – اشتراك Premium عبر Telegram Stars (XTR)
 - /premium أو زر "⭐ ترقية Premium"
 - pre_checkout_query + successful_payment handlers
+  (الدفع بيتسجل في payments مرة واحدة لكل charge_id، والتجديد بيتضاف على المدة الباقية)
 - /my_subscription لعرض حالة الاشتراك
 """
 
 from __future__ import annotations
 
 import logging
-from datetime import datetime
 
-import pytz
 from aiogram import Router, types, F
 from aiogram.filters import Command
 from aiogram.types import LabeledPrice
 
-from database import update_premium, is_premium, get_subscription_info
-
-CAIRO = pytz.timezone("Africa/Cairo")
+import clock
+import expiry
+from handlers.buttons import button
+from database import activate_premium, is_premium, get_subscription_info
 
 router = Router(name="premium")
 log = logging.getLogger(__name__)
@@ -33,7 +33,7 @@ PAYLOAD = "premium_monthly_v1"
 #  عرض صفحة Premium / إرسال الفاتورة
 # ══════════════════════════════════════════════════
 
-@router.message(F.text == "⭐ ترقية Premium")
+@button("⭐ ترقية Premium")
 @router.message(Command("premium"))
 async def show_premium(message: types.Message) -> None:
     """عرض مزايا Premium وإرسال فاتورة Stars"""
@@ -41,6 +41,7 @@ async def show_premium(message: types.Message) -> None:
     already = await is_premium(uid)
 
     if already:
+        # التجديد مسموح: الـ 30 يوم بيتضافوا على آخر اشتراكه الحالي
         await message.answer(
             "━━━━━━━━━━━━━━━━━━━━\n"
             "🌟 <b>أنت بالفعل مشترك Premium!</b>\n"
@@ -51,35 +52,34 @@ async def show_premium(message: types.Message) -> None:
             "  🔄 تكرار يومي/أسبوعي\n"
             "  ☀️ ملخص صباحي يومي\n\n"
             "📊 لمعرفة حالة اشتراكك: /my_subscription\n\n"
-            "💙 شكرًا لدعمك!",
+            "🔄 <b>عايز تجدّد بدري؟</b> الـ 30 يوم هيتضافوا على الأيام الباقية، مش هتخسر حاجة 👇",
             parse_mode="HTML",
         )
-        return
+    else:
+        # رسالة المزايا أولاً
+        await message.answer(
+            "━━━━━━━━━━━━━━━━━━━━\n"
+            "⭐ <b>TelePot Premium</b>\n"
+            "━━━━━━━━━━━━━━━━━━━━\n\n"
 
-    # رسالة المزايا أولاً
-    await message.answer(
-        "━━━━━━━━━━━━━━━━━━━━\n"
-        "⭐ <b>TelePot Premium</b>\n"
-        "━━━━━━━━━━━━━━━━━━━━\n\n"
+            "🆓 <b>المجاني:</b>\n"
+            "  📝 15 مهمة\n"
+            "  🔔 3 تذكيرات\n"
+            "  ❌ بدون تكرار\n"
+            "  ❌ بدون ملخص صباحي\n\n"
 
-        "🆓 <b>المجاني:</b>\n"
-        "  📝 15 مهمة\n"
-        "  🔔 3 تذكيرات\n"
-        "  ❌ بدون تكرار\n"
-        "  ❌ بدون ملخص صباحي\n\n"
+            "⭐ <b>Premium:</b>\n"
+            "  ♾ مهام <b>غير محدودة</b>\n"
+            "  ♾ تذكيرات <b>غير محدودة</b>\n"
+            "  🔄 تكرار يومي / أسبوعي\n"
+            "  ☀️ ملخص صباحي يومي 7:00\n"
+            "  🚀 أولوية في الدعم\n\n"
 
-        "⭐ <b>Premium:</b>\n"
-        "  ♾ مهام <b>غير محدودة</b>\n"
-        "  ♾ تذكيرات <b>غير محدودة</b>\n"
-        "  🔄 تكرار يومي / أسبوعي\n"
-        "  ☀️ ملخص صباحي يومي 7:00\n"
-        "  🚀 أولوية في الدعم\n\n"
-
-        "💰 <b>299 ⭐ Stars / شهر</b>\n"
-        "━━━━━━━━━━━━━━━━━━━━\n\n"
-        "👇 اضغط على زر الدفع بالأسفل:",
-        parse_mode="HTML",
-    )
+            "💰 <b>299 ⭐ Stars / شهر</b>\n"
+            "━━━━━━━━━━━━━━━━━━━━\n\n"
+            "👇 اضغط على زر الدفع بالأسفل:",
+            parse_mode="HTML",
+        )
 
     # فاتورة Stars
     desc = (
@@ -117,7 +117,18 @@ async def successful_payment(message: types.Message) -> None:
     uid = message.from_user.id
     payment = message.successful_payment
 
-    await update_premium(uid, days=SUBSCRIPTION_DAYS)
+    sub_end = await activate_premium(
+        uid,
+        payment.telegram_payment_charge_id,
+        payment.total_amount,
+        payment.currency,
+        days=SUBSCRIPTION_DAYS,
+    )
+    if sub_end is None:
+        # نفس الدفع وصل تاني (Telegram أعاد الـ update) → اتحسب قبل كده
+        log.info("Duplicate payment %s for user %s ignored", payment.telegram_payment_charge_id, uid)
+        return
+    expiry.queue.watch(uid, sub_end)
 
     await message.answer(
         "━━━━━━━━━━━━━━━━━━━━\n"
@@ -131,6 +142,7 @@ async def successful_payment(message: types.Message) -> None:
         "  🔄 تكرار يومي/أسبوعي\n"
         "  ☀️ ملخص صباحي كل يوم 7:00\n\n"
 
+        f"📅 ينتهي: {sub_end.strftime('%Y-%m-%d %I:%M %p')}\n"
         f"💳 الدفع: {payment.total_amount} ⭐ Stars\n"
         f"🔖 رقم العملية: <code>{payment.telegram_payment_charge_id}</code>\n\n"
 
@@ -144,13 +156,13 @@ async def successful_payment(message: types.Message) -> None:
 # ══════════════════════════════════════════════════
 
 @router.message(Command("my_subscription"))
-@router.message(F.text == "👤 اشتراكي")
+@button("👤 اشتراكي")
 async def my_subscription(message: types.Message) -> None:
     """عرض حالة اشتراك المستخدم"""
     uid = message.from_user.id
     info = await get_subscription_info(uid)
 
-    if not info or not info["is_premium"]:
+    if not info or not info.is_premium:
         await message.answer(
             "━━━━━━━━━━━━━━━━━━━━\n"
             "👤 <b>حالة اشتراكك</b>\n"
@@ -168,8 +180,8 @@ async def my_subscription(message: types.Message) -> None:
         )
         return
 
-    sub_end = datetime.fromisoformat(info["sub_end"])
-    now = datetime.now(CAIRO)
+    sub_end = info.sub_end_at
+    now = clock.now()
     remaining = (sub_end - now).days
     end_str = sub_end.strftime("%Y-%m-%d %I:%M %p")
 
@@ -3,6 +3,7 @@ handlers/reminder.py – تذكيرات متكررة (كل X دقيقة/ساعة
 - زر "⏰ تذكير متكرر" أو كتابة "ذكرني بـ... كل ..."
 - FSM: نص التذكير → الفترة
 - عرض + إيقاف + حذف التذكيرات
+- تحليل الرسالة والفترة في text_analysis.py
 """
 
 from __future__ import annotations
@@ -21,9 +22,11 @@ from aiogram.types import (
     InlineKeyboardButton,
 )
 
+from effects import acknowledge, defer
+from handlers.buttons import button
 from database import (
-    add_reminder,
-    get_user_reminders,
+    add_reminder_limited,
+    get_user_reminders_page,
     count_reminders,
     pause_reminder,
     delete_reminder,
@@ -31,10 +34,16 @@ from database import (
     ensure_user,
     FREE_REMINDER_LIMIT,
 )
+from models import Reminder
+from text_analysis import REMIND_VERB, parse_interval_input, parse_reminder_message
 
 log = logging.getLogger(__name__)
 router = Router(name="reminder")
 
+# تذكيرات في الصفحة (رسالة لكل تذكير) – الباقي بزرار "التالي" (rmore:<آخر id>)
+REMINDERS_SHOWN = 20
+MISSING_REMINDER = "❌ <i>التذكير مش موجود أو اتحذف.</i>"
+
 
 # ─── FSM States ───
 class ReminderFSM(StatesGroup):
@@ -42,139 +51,6 @@ class ReminderFSM(StatesGroup):
     waiting_interval = State()
 
 
-# ─── تحويل الأرقام العربية ───
-ARABIC_DIGIT_MAP = str.maketrans("٠١٢٣٤٥٦٧٨٩", "0123456789")
-
-
-def parse_reminder_message(text: str) -> tuple[str, int] | None:
-    """
-    تحليل رسالة ذكرني مباشرة:
-    "ذكرني بالاستغفار كل 5 دقايق" → ("الاستغفار", 5)
-    "ذكرني اشرب ماء كل ساعة" → ("اشرب ماء", 60)
-    "ذكرني كل ساعتين اشرب ماء" → ("اشرب ماء", 120)
-    "remind me to drink water every 30 minutes" → ("drink water", 30)
-    """
-    s = text.translate(ARABIC_DIGIT_MAP).strip()
-
-    # ─── Arabic patterns (فصحى + مصري) ───
-    verb = r"(?:ذكر|فكر|نبه)(?:ني|نى)"
-
-    # "ذكرني بـ<text> كل <N> <unit>"
-    m = re.search(
-        rf"{verb}\s+(?:ب|بال|بأ|بإ|بان|بالـ|إن(?:ي|ى)\s+)?(.+?)\s+كل\s+(.+)",
-        s,
-    )
-    if m:
-        reminder_text = m.group(1).strip()
-        interval = _parse_arabic_interval(m.group(2).strip())
-        if interval and reminder_text:
-            return reminder_text, interval
-
-    # "ذكرني كل <N> <unit> <text>"
-    m = re.search(
-        rf"{verb}\s+كل\s+(.+?)\s+([\u0600-\u06FF\w].+)",
-        s,
-    )
-    if m:
-        interval = _parse_arabic_interval(m.group(1).strip())
-        reminder_text = m.group(2).strip()
-        if interval and reminder_text:
-            return reminder_text, interval
-
-    # "ذكرني <text> كل <N> <unit>" (بدون باء)
-    m = re.search(
-        rf"{verb}\s+(.+?)\s+كل\s+(.+)",
-        s,
-    )
-    if m:
-        reminder_text = m.group(1).strip()
-        interval = _parse_arabic_interval(m.group(2).strip())
-        if interval and reminder_text:
-            return reminder_text, interval
-
-    # ─── English patterns ───
-
-    # "remind me to <text> every <N> <unit>"
-    m = re.search(
-        r"remind\s+me\s+(?:to\s+)?(.+?)\s+every\s+(.+)",
-        s, re.IGNORECASE,
-    )
-    if m:
-        reminder_text = m.group(1).strip()
-        interval = _parse_english_interval(m.group(2).strip())
-        if interval and reminder_text:
-            return reminder_text, interval
-
-    return None
-
-
-def _parse_arabic_interval(s: str) -> int | None:
-    """تحليل فترة عربية (مصري + فصحى) → دقائق"""
-    s = s.translate(ARABIC_DIGIT_MAP).strip()
-
-    # "5 دقايق" / "10 دقائق" / "دقيقة" / "5 دقيقه"
-    m = re.match(r"(\d+)\s*(?:دقيق[ةه]|دقايق|دقائق|دقيق|دق)", s)
-    if m:
-        return int(m.group(1))
-
-    # "دقيقة" / "دقيقتين"
-    if re.match(r"دقيق(?:ه|ة|تين)", s):
-        return 2 if "تين" in s else 1
-
-    # "X ساعه/ساعة/ساعات"
-    m = re.match(r"(\d+)\s*(?:ساع[ةه]|ساعات)", s)
-    if m:
-        return int(m.group(1)) * 60
-
-    # "ساعة" / "ساعتين"
-    if re.match(r"^ساع[ةه]$", s):
-        return 60
-    if s == "ساعتين":
-        return 120
-
-    # "نص ساعه" / "نصف ساعة"
-    if re.match(r"نص(?:ف)?\s*ساع[ةه]", s):
-        return 30
-
-    # "ربع ساعة"
-    if re.match(r"ربع\s*ساع[ةه]", s):
-        return 15
-
-    # "تلت ساعة" (ثلث ساعة = 20 دقيقة)
-    if re.match(r"(?:تلت|ثلث)\s*ساع[ةه]", s):
-        return 20
-
-    # "ساعة و نص" / "ساعه ونص"
-    if re.match(r"ساع[ةه]\s*و?\s*نص(?:ف)?", s):
-        return 90
-
-    # "ساعة وربع"
-    if re.match(r"ساع[ةه]\s*و?\s*ربع", s):
-        return 75
-
-    return None
-
-
-def _parse_english_interval(s: str) -> int | None:
-    """تحليل فترة إنجليزية → دقائق"""
-    s = s.strip().lower()
-
-    m = re.match(r"(\d+)\s*min(?:ute)?s?", s)
-    if m:
-        return int(m.group(1))
-
-    m = re.match(r"(\d+)\s*hours?", s)
-    if m:
-        return int(m.group(1)) * 60
-
-    if s in ("hour", "an hour", "1 hour"):
-        return 60
-    if s in ("half hour", "half an hour", "30 min"):
-        return 30
-
-    return None
-
-
 def format_interval(mins: int) -> str:
     """تنسيق الفترة بالعربي بشكل جميل"""
     if mins < 60:
@@ -192,62 +68,61 @@ def format_interval(mins: int) -> str:
     return f"{hours} ساعات و {remaining} دقيقة"
 
 
-def parse_interval_input(text: str) -> int | None:
-    """تحليل إدخال الفترة من المستخدم (في FSM)"""
-    s = text.translate(ARABIC_DIGIT_MAP).strip()
-
-    s = re.sub(r"^كل\s*", "", s).strip()
-    if "كل" in s:
-        s = s.split("كل", 1)[1].strip()
-    s = re.sub(r"^every\s*", "", s, flags=re.IGNORECASE).strip()
+# ══════════════════════════════════════════════════
+#  Auto-detect: "ذكرني ..." في أي وقت (بدون FSM)
+# ══════════════════════════════════════════════════
 
-    result = _parse_arabic_interval(s)
-    if result:
-        return result
+def limit_text(current: int) -> str:
+    """رسالة "وصلت للحد" للمجاني"""
+    return (
+        "━━━━━━━━━━━━━━━━━━━━\n"
+        "⚠️ <b>وصلت للحد الأقصى!</b>\n\n"
+        f"🔔 تذكيراتك: {current}/{FREE_REMINDER_LIMIT}\n\n"
+        "⭐ ترقَّ لـ Premium لتذكيرات غير محدودة!\n"
+        "👉 /premium\n"
+        "━━━━━━━━━━━━━━━━━━━━"
+    )
 
-    result = _parse_english_interval(s)
-    if result:
-        return result
 
-    m = re.match(r"^(\d+)$", s)
-    if m:
-        val = int(m.group(1))
-        if val > 0:
-            return val
+async def check_limit(message: types.Message) -> bool:
+    """تحقق مبكر قبل ما الـ FSM يبدأ (الحد الفعلي في save_reminder) – False لو وصل"""
+    uid = message.from_user.id
+    if await is_premium(uid):
+        return True
+    current = await count_reminders(uid)
+    if current < FREE_REMINDER_LIMIT:
+        return True
+    await message.answer(limit_text(current), parse_mode="HTML")
+    return False
+
+
+async def save_reminder(
+    message: types.Message, state: FSMContext, text: str, interval: int,
+) -> int | None:
+    """الإضافة بالحد في نفس الـ INSERT؛ لو اتعدّى → رسالة الحد + إنهاء الـ FSM و None"""
+    from handlers.start import main_keyboard
 
-    return None
+    rid = await add_reminder_limited(message.from_user.id, text, interval)
+    if rid is None:
+        await state.clear()
+        current = await count_reminders(message.from_user.id)
+        await message.answer(limit_text(current), parse_mode="HTML", reply_markup=main_keyboard())
+    return rid
 
 
-# ══════════════════════════════════════════════════
-#  Auto-detect: "ذكرني ..." في أي وقت (بدون FSM)
-# ══════════════════════════════════════════════════
-
-@router.message(F.text.regexp(r"^(?:ذكر(?:ني|نى)|فكر(?:ني|نى)|نبه(?:ني|نى)|remind\s+me)", flags=re.IGNORECASE))
+@router.message(F.text.regexp(rf"^(?:{REMIND_VERB}|remind\s+me)", flags=re.IGNORECASE))
 async def auto_remind(message: types.Message, state: FSMContext) -> None:
     """التقاط رسائل ذكرني التلقائية"""
     from handlers.start import main_keyboard
     await ensure_user(message.from_user.id, message.from_user.username)
-    uid = message.from_user.id
-
-    premium = await is_premium(uid)
-    if not premium:
-        current = await count_reminders(uid)
-        if current >= FREE_REMINDER_LIMIT:
-            await message.answer(
-                "━━━━━━━━━━━━━━━━━━━━\n"
-                "⚠️ <b>وصلت للحد الأقصى!</b>\n\n"
-                f"🔔 تذكيراتك: {current}/{FREE_REMINDER_LIMIT}\n\n"
-                "⭐ ترقَّ لـ Premium لتذكيرات غير محدودة!\n"
-                "👉 /premium\n"
-                "━━━━━━━━━━━━━━━━━━━━",
-                parse_mode="HTML",
-            )
-            return
 
     parsed = parse_reminder_message(message.text)
     if parsed:
+        # رسالة كاملة: الحد + الإضافة في statement واحد (من غير is_premium/count قبلها)
         reminder_text, interval = parsed
-        rid = await add_reminder(uid, reminder_text, interval)
+        rid = await save_reminder(message, state, reminder_text, interval)
+        if rid is None:
+            return
         await message.answer(
             "━━━━━━━━━━━━━━━━━━━━\n"
             "✅ <b>تم إنشاء التذكير!</b>\n"
@@ -260,7 +135,7 @@ async def auto_remind(message: types.Message, state: FSMContext) -> None:
             parse_mode="HTML",
             reply_markup=main_keyboard(),
         )
-    else:
+    elif await check_limit(message):
         await state.set_state(ReminderFSM.waiting_text)
         await state.update_data(raw=message.text)
         await message.answer(
@@ -280,26 +155,12 @@ async def auto_remind(message: types.Message, state: FSMContext) -> None:
 #  زر "⏰ تذكير متكرر" → FSM
 # ══════════════════════════════════════════════════
 
-@router.message(F.text == "⏰ تذكير متكرر")
+@button("⏰ تذكير متكرر")
 async def start_reminder_fsm(message: types.Message, state: FSMContext) -> None:
     """بدء إنشاء تذكير عبر FSM"""
     await ensure_user(message.from_user.id, message.from_user.username)
-    uid = message.from_user.id
-
-    premium = await is_premium(uid)
-    if not premium:
-        current = await count_reminders(uid)
-        if current >= FREE_REMINDER_LIMIT:
-            await message.answer(
-                "━━━━━━━━━━━━━━━━━━━━\n"
-                "⚠️ <b>وصلت للحد الأقصى!</b>\n\n"
-                f"🔔 تذكيراتك: {current}/{FREE_REMINDER_LIMIT}\n\n"
-                "⭐ ترقَّ لـ Premium لتذكيرات غير محدودة!\n"
-                "👉 /premium\n"
-                "━━━━━━━━━━━━━━━━━━━━",
-                parse_mode="HTML",
-            )
-            return
+    if not await check_limit(message):
+        return
 
     await state.set_state(ReminderFSM.waiting_text)
     await message.answer(
@@ -375,9 +236,10 @@ async def receive_interval(message: types.Message, state: FSMContext) -> None:
 
     data = await state.get_data()
     reminder_text = data["reminder_text"]
-    uid = message.from_user.id
 
-    rid = await add_reminder(uid, reminder_text, interval)
+    rid = await save_reminder(message, state, reminder_text, interval)
+    if rid is None:
+        return
     await state.clear()
 
     await message.answer(
@@ -399,11 +261,11 @@ async def receive_interval(message: types.Message, state: FSMContext) -> None:
 # ══════════════════════════════════════════════════
 
 @router.message(Command("reminders"))
-@router.message(F.text == "🔔 تذكيراتي")
+@button("🔔 تذكيراتي")
 async def show_reminders(message: types.Message) -> None:
     """عرض التذكيرات النشطة"""
     uid = message.from_user.id
-    reminders = await get_user_reminders(uid)
+    reminders, count = await get_user_reminders_page(uid, limit=REMINDERS_SHOWN + 1)
 
     if not reminders:
         await message.answer(
@@ -418,7 +280,6 @@ async def show_reminders(message: types.Message) -> None:
         return
 
     premium = await is_premium(uid)
-    count = len(reminders)
     limit_text = ""
     if not premium:
         limit_text = f" • 📦 {count}/{FREE_REMINDER_LIMIT}"
@@ -429,61 +290,100 @@ async def show_reminders(message: types.Message) -> None:
         "━━━━━━━━━━━━━━━━━━━━",
         parse_mode="HTML",
     )
+    await send_reminder_cards(message, reminders[:REMINDERS_SHOWN], len(reminders) > REMINDERS_SHOWN)
+
 
+async def send_reminder_cards(message: types.Message, reminders: list[Reminder], has_next: bool) -> None:
+    """رسالة لكل تذكير (بأزرار ⏸/🗑) + زرار "التالي" لو فيه كمان بعد آخر واحد"""
     for r in reminders:
-        status = "🟢 نشط" if r.get("is_active", 1) else "⏸ متوقف"
+        status = "🟢 نشط" if r.is_active else "⏸ متوقف"
         text = (
-            f"🔔 <b>{r['text']}</b>\n"
-            f"🔄 كل {format_interval(r['interval_mins'])}\n"
+            f"🔔 <b>{r.text}</b>\n"
+            f"🔄 كل {format_interval(r.interval_mins)}\n"
             f"📊 {status}"
         )
         kb = InlineKeyboardMarkup(
             inline_keyboard=[
                 [
                     InlineKeyboardButton(
-                        text="⏸ إيقاف", callback_data=f"rpause:{r['id']}"
+                        text="⏸ إيقاف", callback_data=f"rpause:{r.id}"
                     ),
                     InlineKeyboardButton(
-                        text="🗑 حذف", callback_data=f"rdel:{r['id']}"
+                        text="🗑 حذف", callback_data=f"rdel:{r.id}"
                     ),
                 ]
             ]
         )
         await message.answer(text, parse_mode="HTML", reply_markup=kb)
 
+    if has_next:
+        # cursor = id آخر تذكير اتعرض (get_user_reminders_page بيكمل من بعده)
+        await message.answer(
+            f"👇 فيه تذكيرات كمان بعد أول {len(reminders)}",
+            reply_markup=InlineKeyboardMarkup(
+                inline_keyboard=[[
+                    InlineKeyboardButton(text="التالي ▶️", callback_data=f"rmore:{reminders[-1].id}")
+                ]]
+            ),
+        )
+
+
+@router.callback_query(F.data.startswith("rmore:"))
+async def cb_more_reminders(callback: types.CallbackQuery) -> None:
+    """الصفحة اللي بعدها من التذكيرات (بعد آخر id اتعرض)"""
+    after_id = int(callback.data.split(":")[1])
+    reminders, _ = await get_user_reminders_page(
+        callback.from_user.id, after_id=after_id, limit=REMINDERS_SHOWN + 1,
+    )
+    await callback.answer()
+    # الزرار اتستخدم → يتشال عشان الصفحة ما تتبعتش مرتين
+    await callback.message.edit_reply_markup(reply_markup=None)
+    if not reminders:
+        await callback.message.answer("📭 مفيش تذكيرات تانية.")
+        return
+    await send_reminder_cards(
+        callback.message, reminders[:REMINDERS_SHOWN], len(reminders) > REMINDERS_SHOWN,
+    )
+
 
 # ══════════════════════════════════════════════════
 #  Callback: إيقاف / حذف تذكير
 # ══════════════════════════════════════════════════
 
 @router.callback_query(F.data.startswith("rpause:"))
-async def cb_pause_reminder(callback: types.CallbackQuery) -> None:
-    """إيقاف تذكير"""
+async def cb_pause_reminder(callback: types.CallbackQuery, received_at: float | None = None) -> None:
+    """إيقاف تذكير (الرد الأول، والتنفيذ بعده)"""
     rid = int(callback.data.split(":")[1])
-    uid = callback.from_user.id
-    success = await pause_reminder(rid, uid)
-    if success:
-        await callback.message.edit_text(
-            "⏸ <i>تم إيقاف التذكير.</i>\n\n"
-            "💡 لإنشاء تذكير جديد: ⏰ تذكير متكرر",
-            parse_mode="HTML",
-        )
-        await callback.answer("⏸ تم الإيقاف.")
-    else:
-        await callback.answer("❌ التذكير مش موجود أو اتحذف.", show_alert=True)
+    await acknowledge(callback, "⏸ تم الإيقاف.", received_at)
+    defer(callback, lambda: _apply_pause(callback, rid))
+
+
+async def _apply_pause(callback: types.CallbackQuery, rid: int) -> bool:
+    if not await pause_reminder(rid, callback.from_user.id):
+        await callback.message.edit_text(MISSING_REMINDER, parse_mode="HTML")
+        return False
+    await callback.message.edit_text(
+        "⏸ <i>تم إيقاف التذكير.</i>\n\n"
+        "💡 لإنشاء تذكير جديد: ⏰ تذكير متكرر",
+        parse_mode="HTML",
+    )
+    return True
 
 
 @router.callback_query(F.data.startswith("rdel:"))
-async def cb_delete_reminder(callback: types.CallbackQuery) -> None:
-    """حذف تذكير"""
+async def cb_delete_reminder(callback: types.CallbackQuery, received_at: float | None = None) -> None:
+    """حذف تذكير (الرد الأول، والتنفيذ بعده)"""
     rid = int(callback.data.split(":")[1])
-    uid = callback.from_user.id
-    success = await delete_reminder(rid, uid)
-    if success:
-        await callback.message.edit_text(
-            "🗑 <i>تم حذف التذكير نهائيًا.</i>",
-            parse_mode="HTML",
-        )
-        await callback.answer("🗑 تم الحذف.")
-    else:
-        await callback.answer("❌ التذكير مش موجود أو اتحذف.", show_alert=True)
+    await acknowledge(callback, "🗑 تم الحذف.", received_at)
+    defer(callback, lambda: _apply_delete(callback, rid))
+
+
+async def _apply_delete(callback: types.CallbackQuery, rid: int) -> bool:
+    if not await delete_reminder(rid, callback.from_user.id):
+        await callback.message.edit_text(MISSING_REMINDER, parse_mode="HTML")
+        return False
+    await callback.message.edit_text(
+        "🗑 <i>تم حذف التذكير نهائيًا.</i>",
+        parse_mode="HTML",
+    )
+    return True
@@ -0,0 +1,108 @@
+"""
+handlers/search.py – بحث في المهام والتذكيرات (FTS5)
+- /search <كلمات>  → أحسن النتايج في رسالة واحدة
+- inline mode: @bot <كلمات> في أي شات → نتايج مرتبة (لازم inline mode يتفعّل من BotFather)
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import datetime
+from html import escape
+
+from aiogram import Router, types
+from aiogram.filters import Command, CommandObject
+from aiogram.types import InlineQueryResultArticle, InputTextMessageContent
+
+import database
+from database import get_tasks_page, search_items
+from handlers.reminder import format_interval
+
+router = Router(name="search")
+
+SEARCH_LIMIT = int(os.getenv("SEARCH_LIMIT", "15"))
+INLINE_LIMIT = 20  # Telegram: أقصى 50 نتيجة لكل answerInlineQuery
+
+
+def _due_text(due: str | None) -> str:
+    if not due:
+        return "⚡ بدون موعد"
+    return "🕐 " + datetime.fromisoformat(due).strftime("%Y-%m-%d %I:%M %p")
+
+
+def _describe(item: dict) -> tuple[str, str]:
+    """(أيقونة + النص، سطر التفاصيل)"""
+    if item["kind"] == "task":
+        icon = "✅" if item["inactive"] else "📌"
+        return f"{icon} {item['text']}", _due_text(item["due"])
+    icon = "⏸" if item["inactive"] else "🔔"
+    return f"{icon} {item['text']}", f"🔄 كل {format_interval(item['interval_mins'])}"
+
+
+@router.message(Command("search"))
+async def cmd_search(message: types.Message, command: CommandObject) -> None:
+    """بحث: /search اجتماع"""
+    query = (command.args or "").strip()
+    if not query:
+        await message.answer(
+            "🔍 <b>البحث</b>\n"
+            "━━━━━━━━━━━━━━━━━━━━\n\n"
+            "اكتب الكلمة بعد الأمر:\n"
+            "  <i>/search اجتماع</i>\n\n"
+            "💡 أو في أي شات: <i>@اسم_البوت اجتماع</i>",
+            parse_mode="HTML",
+        )
+        return
+    if not database.SEARCH_AVAILABLE:
+        await message.answer("⚠️ البحث مش متاح على السيرفر ده.")
+        return
+
+    items = await search_items(message.from_user.id, query, limit=SEARCH_LIMIT)
+    if not items:
+        await message.answer(
+            f"🔍 مفيش نتايج لـ <b>{escape(query)}</b>", parse_mode="HTML"
+        )
+        return
+
+    lines = [
+        "━━━━━━━━━━━━━━━━━━━━\n"
+        f"🔍 <b>{escape(query)}</b> • {len(items)} نتيجة\n"
+        "━━━━━━━━━━━━━━━━━━━━"
+    ]
+    for item in items:
+        title, detail = _describe(item)
+        lines.append(f"<b>{escape(title)}</b>\n   {detail}")
+    await message.answer("\n\n".join(lines), parse_mode="HTML")
+
+
+@router.inline_query()
+async def inline_search(inline_query: types.InlineQuery) -> None:
+    """inline mode: نتايج البحث (أو أقرب المهام لو مفيش كلمات)"""
+    uid = inline_query.from_user.id
+    query = inline_query.query.strip()
+    if query:
+        items = await search_items(uid, query, limit=INLINE_LIMIT)
+    else:
+        tasks, _, _ = await get_tasks_page(uid, limit=INLINE_LIMIT)
+        items = [
+            {"kind": "task", "id": t.id, "text": t.title, "due": t.due,
+             "interval_mins": None, "inactive": t.is_done}
+            for t in tasks
+        ]
+
+    results = []
+    for item in items:
+        title, detail = _describe(item)
+        results.append(
+            InlineQueryResultArticle(
+                id=f"{item['kind']}:{item['id']}",
+                title=title,
+                description=detail,
+                input_message_content=InputTextMessageContent(
+                    # الـ bot بـ parse_mode=HTML افتراضي → العنوان لازم يتعمله escape زي /search
+                    message_text=f"{escape(title)}\n{detail}",
+                ),
+            )
+        )
+    # is_personal: كل مستخدم بيشوف مهامه هو بس
+    await inline_query.answer(results, cache_time=5, is_personal=True)
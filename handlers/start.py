@@ -6,6 +6,7 @@ from aiogram import Router, types
 from aiogram.filters import CommandStart, Command
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton
 
+from handlers.buttons import button
 from database import ensure_user, is_premium, count_tasks, count_reminders
 
 router = Router(name="start")
@@ -62,7 +63,7 @@ async def cmd_start(message: types.Message) -> None:
 
 
 @router.message(Command("help"))
-@router.message(lambda m: m.text == "ℹ️ مساعدة")
+@button("ℹ️ مساعدة")
 async def cmd_help(message: types.Message) -> None:
     """رسالة المساعدة الشاملة"""
     uid = message.from_user.id
@@ -108,6 +109,7 @@ async def cmd_help(message: types.Message) -> None:
         "  /help ─ المساعدة (أنت هنا 📍)\n"
         "  /tasks ─ مهامي\n"
         "  /reminders ─ تذكيراتي\n"
+        "  /search ─ بحث في مهامك وتذكيراتك\n"
         "  /premium ─ ترقية\n"
         "  /my_subscription ─ حالة اشتراكي\n\n"
 
@@ -16,29 +16,46 @@
     4. أضف Environment Variable:
         - BOT_TOKEN = <your_bot_token>
     5. Plan: Free (يكفي للـ polling)
-    6. Render يدعم persistent disk لو تريد حفظ bot.db
+    6. Render يدعم persistent disk لو تريد حفظ bot.db (DB_PATH=/var/data/bot.db)
 
 ملاحظة: البوت يعمل بـ polling (مناسب محليًا وعلى Render).
 لو تريد webhook، غيّر dp.start_polling → webhook setup.
 """
 
+import time
+
+_STARTED = time.perf_counter()  # أول سطر: قياس الـ cold start لحد أول polling
+
 import asyncio
 import logging
 import os
 import sys
 
 from dotenv import load_dotenv
-from aiogram import Bot, Dispatcher
+from aiogram import Bot
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.telegram import PRODUCTION, TelegramAPIServer
 from aiogram.enums import ParseMode
 
 from database import init_db
+from executor import BoundedDispatcher, UpdateExecutor
 from scheduler import setup_scheduler
+from session import BotApiMetricsMiddleware, TunedAiohttpSession
 
 # ─── تحميل .env ───
 load_dotenv()
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 
+# ─── حدود تنفيذ الـ updates ───
+UPDATE_CONCURRENCY = int(os.getenv("UPDATE_CONCURRENCY", "16"))
+UPDATE_MAX_PENDING = int(os.getenv("UPDATE_MAX_PENDING", "256"))
+
+# ─── Bot API server (اختياري: Local Bot API server أو stand-in للـ benchmarks) ───
+BOT_API_URL = os.getenv("BOT_API_URL", "")
+
+# ─── Metrics endpoint (اختياري) ───
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
 if not BOT_TOKEN:
     print("❌ BOT_TOKEN غير موجود! أنشئ ملف .env وأضف التوكن.")
     sys.exit(1)
@@ -52,28 +69,53 @@ logging.basicConfig(
 log = logging.getLogger(__name__)
 
 
+async def _warm_date_parser(pool) -> None:
+    """import + تسخين dateparser على worker من parse_pool (برّه الـ event loop)"""
+    from handlers.add_task import warm_date_parser
+    loop = asyncio.get_running_loop()
+    secs = await loop.run_in_executor(pool.executor, warm_date_parser)
+    log.info("📅 dateparser warmed in %.2fs (background)", secs)
+
+
 async def main() -> None:
     """نقطة الدخول الرئيسية"""
 
-    # إنشاء البوت
+    # إنشاء البوت (session بـ connection pool متظبط)
+    api = TelegramAPIServer.from_base(BOT_API_URL) if BOT_API_URL else PRODUCTION
     bot = Bot(
         token=BOT_TOKEN,
+        session=TunedAiohttpSession(api=api),
         default=DefaultBotProperties(parse_mode=ParseMode.HTML),
     )
 
-    # إنشاء الـ Dispatcher
-    dp = Dispatcher()
+    # إنشاء الـ Dispatcher (توازي محدود + ترتيب لكل شات)
+    dp = BoundedDispatcher(
+        executor=UpdateExecutor(
+            max_concurrency=UPDATE_CONCURRENCY,
+            max_pending=UPDATE_MAX_PENDING,
+        ),
+    )
+
+    # ── الـ callbacks بترد فورًا وتنفّذ في نفس طابور الشات ──
+    import effects
+    effects.bind(dp.executor)
 
     # ── تسجيل الـ Handlers (الترتيب مهم) ──
     from handlers.premium import router as premium_router      # الدفع أولًا
+    from handlers.buttons import router as buttons_router      # أزرار الكيبورد (dict lookup)
     from handlers.start import router as start_router
     from handlers.add_task import router as add_task_router
     from handlers.list_tasks import router as list_tasks_router
     from handlers.callbacks import router as callbacks_router
     from handlers.reminder import router as reminder_router
+    from handlers.admin import router as admin_router
+    from handlers.search import router as search_router
 
     dp.include_routers(
         premium_router,     # pre_checkout + payment يجب أن يكون أولًا
+        buttons_router,     # زرار بالظبط → handler على طول (قبل الـ regex والـ FSM)
+        admin_router,       # /perf و /stats للأدمن فقط
+        search_router,      # /search + inline mode (قبل الـ FSM عشان /search ما يتاخدش كعنوان)
         reminder_router,    # "ذكرني" يجب قبل add_task (عشان الـ regex)
         start_router,
         add_task_router,
@@ -81,10 +123,49 @@ async def main() -> None:
         callbacks_router,
     )
 
+    # ── clock.now() واحد لكل update (handlers + DB helpers) ──
+    from middlewares.clock import ClockMiddleware
+    dp.update.outer_middleware(ClockMiddleware())
+
+    # ── Flood control قبل أي filter أو handler ──
+    from middlewares.throttling import ThrottlingMiddleware
+    throttling = ThrottlingMiddleware()
+    dp.message.outer_middleware(throttling)
+    dp.callback_query.outer_middleware(throttling)
+
+    # ── Tracing: زمن كل handler + DB + dateparser + Bot API ──
+    from middlewares.tracing import TracingMiddleware
+    from tracing import BotApiTraceMiddleware
+    tracer = TracingMiddleware()
+    dp.message.middleware(tracer)
+    dp.callback_query.middleware(tracer)
+    dp.pre_checkout_query.middleware(tracer)
+    bot.session.middleware(BotApiTraceMiddleware())
+    bot.session.middleware(BotApiMetricsMiddleware())
+
     # ── إنشاء قاعدة البيانات ──
     await init_db()
     log.info("✅ Database initialized.")
 
+    # ── Metrics endpoint ──
+    metrics_runner = None
+    if METRICS_PORT:
+        from metrics import start_http_server
+        metrics_runner = await start_http_server(METRICS_PORT)
+        log.info("📈 Metrics on :%d/metrics", METRICS_PORT)
+
+    # ── مراقبة تأخير الـ event loop (dateparser بقى في parse_pool) ──
+    import parse_pool
+    lag_monitor = asyncio.create_task(parse_pool.monitor_loop_lag())
+
+    # ── تسخين dateparser في الخلفية: أول رسالة بعد الـ deploy ما تستناش،
+    #    والـ polling ما يستناش الـ import (~0.7s) ──
+    warmup = asyncio.create_task(_warm_date_parser(parse_pool.pool))
+
+    # ── انتهاء الاشتراكات + التنبيه قبلها في ميعادهم بالظبط ──
+    import expiry
+    expiry_task = asyncio.create_task(expiry.queue.run(bot))
+
     # ── تشغيل الـ Scheduler ──
     scheduler = setup_scheduler(bot)
     scheduler.start()
@@ -92,12 +173,23 @@ async def main() -> None:
 
     # ── حذف webhook قديم + بدء polling ──
     await bot.delete_webhook(drop_pending_updates=True)
-    log.info("🚀 TelePot Bot started! Polling...")
+    log.info("🚀 TelePot Bot started in %.2fs! Polling...", time.perf_counter() - _STARTED)
+
+    # ── أنواع الـ updates اللي الـ routers فعلًا بتتعامل معاها ──
+    allowed_updates = dp.resolve_used_update_types()
+    log.info("📥 Allowed updates: %s", ", ".join(allowed_updates))
 
     try:
-        await dp.start_polling(bot)
+        await dp.start_polling(bot, allowed_updates=allowed_updates)
     finally:
         scheduler.shutdown()
+        lag_monitor.cancel()
+        warmup.cancel()
+        expiry_task.cancel()
+        parse_pool.pool.shutdown()
+        if metrics_runner:
+            await metrics_runner.cleanup()
+        log.info("🔌 HTTP connections: %s", TunedAiohttpSession.stats())
         await bot.session.close()
         log.info("🛑 Bot stopped.")
 
@@ -0,0 +1,181 @@
+"""
+metrics.py – عدّادات و histograms داخل البروسيس
+بتطلع بصيغة Prometheus text عشان أي scraper يقراها.
+"""
+
+from __future__ import annotations
+
+import bisect
+from typing import Iterable
+
+# ─── الـ buckets الافتراضية (بالثواني) ───
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+_REGISTRY: dict[str, "_Metric"] = {}
+
+
+def _label_str(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labels)
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """عدّاد بيزيد بس"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = ()) -> None:
+        super().__init__(name, help_text, labels)
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels: str) -> float:
+        return self.values.get(self._key(labels), 0)
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_label_str(self.labels, key)} {value:g}")
+        return lines
+
+
+class Gauge(Counter):
+    """قيمة بتطلع وتنزل"""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        self.values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    """توزيع قيم (latency غالبًا) على buckets ثابتة"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        # key → [counts لكل bucket + inf, sum]
+        self.values: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        series = self.values.get(key)
+        if series is None:
+            series = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def count(self, **labels: str) -> int:
+        series = self.values.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def quantile(self, q: float, **labels: str) -> float | None:
+        """تقدير quantile من الـ buckets (الحد الأعلى للـ bucket)"""
+        series = self.values.get(self._key(labels))
+        if not series:
+            return None
+        counts = series[0]
+        target = q * sum(counts)
+        running = 0
+        for i, c in enumerate(counts):
+            running += c
+            if running >= target and c:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return None
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        for key, (counts, total) in sorted(self.values.items()):
+            running = 0
+            for bound, c in zip(self.buckets, counts):
+                running += c
+                le = _label_str(self.labels, key, f'le="{bound:g}"')
+                lines.append(f"{self.name}_bucket{le} {running}")
+            running += counts[-1]
+            le = _label_str(self.labels, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {running}")
+            lines.append(f"{self.name}_sum{_label_str(self.labels, key)} {total:g}")
+            lines.append(f"{self.name}_count{_label_str(self.labels, key)} {running}")
+        return lines
+
+
+def _register(metric: _Metric) -> _Metric:
+    existing = _REGISTRY.get(metric.name)
+    if existing is not None:
+        return existing
+    _REGISTRY[metric.name] = metric
+    return metric
+
+
+def counter(name: str, help_text: str, labels: Iterable[str] = ()) -> Counter:
+    """إنشاء (أو جلب) counter مسجّل"""
+    return _register(Counter(name, help_text, labels))
+
+
+def gauge(name: str, help_text: str, labels: Iterable[str] = ()) -> Gauge:
+    """إنشاء (أو جلب) gauge مسجّل"""
+    return _register(Gauge(name, help_text, labels))
+
+
+def histogram(
+    name: str,
+    help_text: str,
+    labels: Iterable[str] = (),
+    buckets: Iterable[float] = DEFAULT_BUCKETS,
+) -> Histogram:
+    """إنشاء (أو جلب) histogram مسجّل"""
+    return _register(Histogram(name, help_text, labels, buckets))
+
+
+def render_text() -> str:
+    """كل الـ metrics بصيغة Prometheus text"""
+    lines: list[str] = []
+    for name in sorted(_REGISTRY):
+        lines.extend(_REGISTRY[name].render())
+    return "\n".join(lines) + "\n"
+
+
+async def start_http_server(port: int, host: str = "0.0.0.0"):
+    """سيرفر صغير بيرجّع /metrics (لو METRICS_PORT متظبط)"""
+    from aiohttp import web
+
+    async def handle(_: web.Request) -> web.Response:
+        return web.Response(text=render_text(), content_type="text/plain")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
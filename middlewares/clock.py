@@ -0,0 +1,25 @@
+"""
+middlewares/clock.py – outer middleware على الـ update: now() واحد لكل update
+"""
+
+from __future__ import annotations
+
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+import clock
+
+
+class ClockMiddleware(BaseMiddleware):
+    """كل الـ handlers / الـ DB helpers جوه الـ update بيشوفوا نفس الـ clock.now()"""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        with clock.tick():
+            return await handler(event, data)
@@ -0,0 +1,135 @@
+"""
+middlewares/throttling.py – Flood control لكل مستخدم (sliding window)
+- ميزانية للأزرار والأوامر (رخيصة)
+- ميزانية أقل للنص الحر (normalize_arabic + dateparser + DB)
+- الزيادة بتتشال مع رسالة تحذير واحدة لكل نافذة (والـ callback المتشال بيتقفل بـ answer()
+  عشان الزرار ما يفضلش بيلف عند المستخدم)
+- الدبل كليك على نفس الزرار بيتشال في effects.defer (مش هنا: الـ handler بيخلص قبل الضغطة التانية)
+"""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, Message, TelegramObject
+
+import metrics
+
+# ─── الميزانيات: (عدد الأحداث, النافذة بالثواني) ───
+CHEAP_BUDGET = (20, 10.0)   # أزرار + أوامر + callbacks
+PARSE_BUDGET = (6, 10.0)    # نص حر بيتحلل كتاريخ/تذكير
+
+# تنضيف المستخدمين الخاملين كل كام حدث
+_SWEEP_EVERY = 1000
+
+_allowed = metrics.counter(
+    "telepot_throttle_allowed_total", "Updates passed by the flood control", ["kind"]
+)
+_dropped = metrics.counter(
+    "telepot_throttle_dropped_total", "Updates dropped by the flood control", ["kind"]
+)
+_warnings = metrics.counter(
+    "telepot_throttle_warnings_total", "Flood warnings sent to users", ["kind"]
+)
+
+
+def _button_labels() -> frozenset[str]:
+    """نصوص أزرار الكيبورد (بتتعامل كأحداث رخيصة)"""
+    from handlers.start import main_keyboard
+    labels = {b.text for row in main_keyboard().keyboard for b in row}
+    labels.update({"❌ إلغاء", "يومي 📅", "أسبوعي 📆", "بدون تكرار ✅"})
+    return frozenset(labels)
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """Sliding window لكل (مستخدم, نوع) – outer middleware على message + callback_query"""
+
+    def __init__(
+        self,
+        cheap: tuple[int, float] = CHEAP_BUDGET,
+        parse: tuple[int, float] = PARSE_BUDGET,
+    ) -> None:
+        self.budgets = {"cheap": cheap, "parse": parse}
+        self.buttons = _button_labels()
+        # (user_id, kind) → أوقات الأحداث المقبولة
+        self._hits: dict[tuple[int, str], deque[float]] = {}
+        # (user_id, kind) اللي اتبعتله تحذير في النافذة الحالية
+        self._warned: set[tuple[int, str]] = set()
+        self._events = 0
+
+    def _kind(self, event: TelegramObject) -> str | None:
+        if isinstance(event, CallbackQuery):
+            return "cheap"
+        if isinstance(event, Message):
+            text = event.text
+            if not text:
+                # دفع / ميديا → مفيش تحليل ولا نلمسه
+                return None
+            if text in self.buttons or text.startswith("/"):
+                return "cheap"
+            return "parse"
+        return None
+
+    def _sweep(self, now: float) -> None:
+        longest = max(window for _, window in self.budgets.values())
+        stale = [k for k, q in self._hits.items() if not q or now - q[-1] > longest]
+        for k in stale:
+            del self._hits[k]
+            self._warned.discard(k)
+
+    def _allow(self, key: tuple[int, str], now: float) -> bool:
+        limit, window = self.budgets[key[1]]
+        hits = self._hits.get(key)
+        if hits is None:
+            hits = self._hits[key] = deque()
+        while hits and now - hits[0] > window:
+            hits.popleft()
+        if len(hits) >= limit:
+            return False
+        hits.append(now)
+        self._warned.discard(key)
+        return True
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        kind = self._kind(event)
+        user = getattr(event, "from_user", None)
+        if kind is None or user is None:
+            return await handler(event, data)
+
+        now = time.monotonic()
+        self._events += 1
+        if self._events % _SWEEP_EVERY == 0:
+            self._sweep(now)
+
+        key = (user.id, kind)
+        if self._allow(key, now):
+            _allowed.inc(kind=kind)
+            return await handler(event, data)
+        return await self._drop(event, key)
+
+    async def _drop(self, event: TelegramObject, key: tuple[int, str]) -> None:
+        _dropped.inc(kind=key[1])
+        if key not in self._warned:
+            self._warned.add(key)
+            _warnings.inc(kind=key[1])
+            await self._warn(event)
+        elif isinstance(event, CallbackQuery):
+            # من غير رد Telegram بيسيب الزرار بيلف لحد الـ timeout
+            await event.answer()
+        return None
+
+    @staticmethod
+    async def _warn(event: TelegramObject) -> None:
+        text = "⏳ براحة شوية! استنى ثواني وجرّب تاني."
+        if isinstance(event, CallbackQuery):
+            await event.answer(text, show_alert=False)
+        elif isinstance(event, Message):
+            await event.answer(text)
@@ -0,0 +1,40 @@
+"""
+middlewares/tracing.py – inner middleware بيقيس كل handler متـ sample
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+import tracing
+
+
+class TracingMiddleware(BaseMiddleware):
+    """يفتح trace للـ handler لو الـ update وقع في الـ sample"""
+
+    def __init__(self, sample_rate: float = tracing.TRACE_SAMPLE_RATE) -> None:
+        self.sample_rate = sample_rate
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        rate = self.sample_rate
+        if not rate or (rate < 1 and random.random() >= rate):
+            return await handler(event, data)
+
+        handler_obj = data.get("handler")
+        name = getattr(getattr(handler_obj, "callback", None), "__name__", "unknown")
+        trace, token = tracing.start(name)
+        t0 = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            tracing.finish(trace, token, time.perf_counter() - t0)
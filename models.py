@@ -0,0 +1,118 @@
+"""
+models.py – صفوف الجداول كـ objects صغيرة (dataclass بـ __slots__) بدل dict(row)
+- Task / Reminder / User: attribute لكل عمود، من غير __dict__ لكل صف
+- row_factory: بيبني الـ object من الـ tuple على طول (أي ترتيب / أي مجموعة أعمدة،
+  والعمود اللي مش في الـ SELECT قيمته None)
+- التواريخ ISO بتتحوّل datetime مرة واحدة أول ما تتطلب (due_at / next_fire_at / sub_end_at)
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+from operator import itemgetter
+from typing import Any, Callable, ClassVar
+
+_UNSET: Any = object()
+_PAD = (None,)  # آخر عنصر في الصف: قيمة أي عمود مش موجود في الـ SELECT
+
+
+def _parse(value: str | None) -> datetime | None:
+    return None if value is None else datetime.fromisoformat(value)
+
+
+class Record:
+    """أساس الموديلات: البناء من صف SQLite"""
+
+    __slots__ = ()
+    # (الكلاس، أسماء الأعمدة) → itemgetter بيرتّب الصف على ترتيب الـ fields
+    _getters: ClassVar[dict[tuple[type, tuple[str, ...]], Callable]] = {}
+
+    @classmethod
+    def _getter(cls, columns: tuple[str, ...]) -> Callable:
+        key = (cls, columns)
+        getter = Record._getters.get(key)
+        if getter is None:
+            names = [f.name for f in fields(cls) if f.init]
+            pad = len(columns)
+            getter = itemgetter(*(columns.index(n) if n in columns else pad for n in names))
+            Record._getters[key] = getter
+        return getter
+
+    @classmethod
+    def from_row(cls, columns: tuple[str, ...], row: tuple) -> Record:
+        return cls(*cls._getter(columns)(row + _PAD))
+
+    @classmethod
+    def row_factory(cls) -> Callable[[sqlite3.Cursor, tuple], Record]:
+        """
+        لـ db.row_factory: الأعمدة من cursor.description (نفس الـ object لكل صفوف الـ query)،
+        فالأسماء بتتحسب مرة لكل query مش لكل صف
+        """
+        # (description، getter) في tuple واحدة: بتتبدل مرة واحدة فآمنة بين threads الـ aiosqlite
+        last: list[tuple[Any, Callable]] = [(None, None)]
+
+        def factory(cursor: sqlite3.Cursor, row: tuple) -> Record:
+            desc, getter = last[0]
+            if cursor.description is not desc:
+                desc = cursor.description
+                getter = cls._getter(tuple(d[0] for d in desc))
+                last[0] = (desc, getter)
+            return cls(*getter(row + _PAD))
+
+        return factory
+
+
+@dataclass(slots=True)
+class Task(Record):
+    id: int
+    user_id: int | None
+    title: str | None
+    due: str | None           # ISO-format (Cairo)
+    recurrence: str | None    # 'daily' | 'weekly' | None
+    is_done: int | None
+    reminded: int | None
+    created_at: str | None
+    _due_at: datetime | None = field(default=_UNSET, init=False, repr=False, compare=False)
+
+    @property
+    def due_at(self) -> datetime | None:
+        if self._due_at is _UNSET:
+            self._due_at = _parse(self.due)
+        return self._due_at
+
+
+@dataclass(slots=True)
+class Reminder(Record):
+    id: int
+    user_id: int | None
+    text: str | None
+    interval_mins: int | None
+    next_fire: str | None     # ISO-format: الموعد القادم
+    is_active: int | None
+    created_at: str | None
+    _next_fire_at: datetime | None = field(default=_UNSET, init=False, repr=False, compare=False)
+
+    @property
+    def next_fire_at(self) -> datetime | None:
+        if self._next_fire_at is _UNSET:
+            self._next_fire_at = _parse(self.next_fire)
+        return self._next_fire_at
+
+
+@dataclass(slots=True)
+class User(Record):
+    user_id: int
+    username: str | None
+    is_premium: int | None
+    sub_end: str | None       # ISO-format (Cairo)
+    warned_end: str | None
+    created_at: str | None
+    _sub_end_at: datetime | None = field(default=_UNSET, init=False, repr=False, compare=False)
+
+    @property
+    def sub_end_at(self) -> datetime | None:
+        if self._sub_end_at is _UNSET:
+            self._sub_end_at = _parse(self.sub_end)
+        return self._sub_end_at
@@ -0,0 +1,99 @@
+"""
+parse_cache.py – LRU قدام smart_parse / parse_natural_date
+ناس كتير بتبعت نفس الجمل ("بكرة 9 الصبح"، "بعد ساعة") فمفيش داعي نحللها كل مرة.
+
+المفتاح = النص بالظبط اللي بيتحلل. نوعين نتايج (الـ parser بيقول relative ولا لأ
+حسب الطريق اللي حلّ بيه النص، مش من شكل التاريخ):
+- مطلقة ("9 الصبح"، "الخميس 3 العصر") → المفتاح = النص، وتتخزن كتاريخ.
+  صالحة طول ما إحنا في نفس اليوم (القاهرة) والوقت ما عدّاش من ساعة ما اتحسبت
+  ("9 الصبح" اتحسبت 8:59 → النهاردة؛ الساعة 9:01 لازم تتحسب تاني → بكرة).
+- نسبية للـ"الآن" ("بعد ساعة"، "بكرة") → المفتاح = النص + الدقيقة الحالية،
+  وتتخزن كـ offset من الآن فالـ hit بيتبني على "الآن" الجديد.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any
+
+import metrics
+
+PARSE_CACHE_SIZE = int(os.getenv("PARSE_CACHE_SIZE", "2048"))
+
+_lookups = metrics.counter(
+    "telepot_parse_cache_total", "Parse cache lookups", ["cache", "result"]
+)
+_size = metrics.gauge(
+    "telepot_parse_cache_entries", "Entries held by the parse cache", ["cache"]
+)
+
+
+def _minute(now: datetime) -> int:
+    return int(now.timestamp()) // 60
+
+
+class ParseCache:
+    """LRU محدود وآمن مع الـ threads (parse_pool)"""
+
+    def __init__(self, name: str, maxsize: int = PARSE_CACHE_SIZE) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        # key → (payload, due, offset?, computed_at)
+        self._data: OrderedDict[tuple[str, int | None], tuple] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, text: str, now: datetime) -> tuple[bool, Any, datetime | None, bool]:
+        """يرجع (hit, payload, due, relative)"""
+        with self._lock:
+            entry = self._data.get((text, None))
+            if entry is not None and self._fresh(entry, now):
+                self._data.move_to_end((text, None))
+                _lookups.inc(cache=self.name, result="hit")
+                payload, due, _, _ = entry
+                return True, payload, due, False
+
+            entry = self._data.get((text, _minute(now)))
+            if entry is not None:
+                self._data.move_to_end((text, _minute(now)))
+                _lookups.inc(cache=self.name, result="hit")
+                payload, _, offset, _ = entry
+                return True, payload, now.tzinfo.normalize(now + offset), True
+
+        _lookups.inc(cache=self.name, result="miss")
+        return False, None, None, False
+
+    def store(
+        self, text: str, now: datetime, payload: Any, due: datetime | None, relative: bool
+    ) -> None:
+        """now = "الآن" اللي اتعمل بيه الـ parse (قبل ما يبدأ)"""
+        if due is not None and relative:
+            key = (text, _minute(now))
+            entry = (payload, None, due - now, now)
+        else:
+            key = (text, None)
+            entry = (payload, due, None, now)
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            _size.set(len(self._data), cache=self.name)
+
+    @staticmethod
+    def _fresh(entry: tuple, now: datetime) -> bool:
+        _, due, _, computed_at = entry
+        if computed_at.date() != now.date():
+            # عدّينا نص الليل: "بكرة" بقت النهاردة
+            return False
+        if due is not None and computed_at < due <= now:
+            # كانت في المستقبل وعدّت → "9 الصبح" بقت بكرة
+            return False
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            _size.set(0, cache=self.name)
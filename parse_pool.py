@@ -0,0 +1,139 @@
+"""
+parse_pool.py – تحليل التواريخ برّه الـ event loop
+- dateparser متزامن وبياكل CPU → بيتنفذ في thread/process pool
+- طابور محدود: لو اتملى بنرجع "مش فاهم" على طول بدل ما نكدّس
+- timeout لكل نداء: لو عدّاه بنرجع "مش فاهم" (الـ worker بيكمل في الخلفية)
+- مقياس تأخير الـ event loop (loop lag) عشان نشوف لو حاجة بتبلّكه
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+import metrics
+from tracing import parse_span
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# ─── الإعدادات (قابلة للتغيير من env) ───
+PARSE_POOL_KIND = os.getenv("PARSE_POOL_KIND", "thread")     # thread | process
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "2"))
+PARSE_MAX_PENDING = int(os.getenv("PARSE_MAX_PENDING", "64"))
+PARSE_TIMEOUT = float(os.getenv("PARSE_TIMEOUT", "2.0"))
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.5"))
+
+_pool_calls = metrics.counter(
+    "telepot_parse_pool_calls_total", "Parse jobs by outcome", ["outcome"]
+)
+_pool_pending = metrics.gauge(
+    "telepot_parse_pool_pending", "Parse jobs queued or running in the pool"
+)
+_pool_seconds = metrics.histogram(
+    "telepot_parse_pool_seconds", "Parse job latency including queue wait"
+)
+_loop_lag = metrics.histogram(
+    "telepot_event_loop_lag_seconds",
+    "How late the event loop woke up a sleeping task",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+
+def _warm_worker() -> None:
+    """initializer للـ process pool: كل worker يسخّن dateparser بتاعه"""
+    from handlers.add_task import warm_date_parser
+    warm_date_parser()
+
+
+class ParsePool:
+    """pool لتحليل التواريخ بطابور محدود و timeout لكل نداء"""
+
+    def __init__(
+        self,
+        kind: str = PARSE_POOL_KIND,
+        workers: int = PARSE_WORKERS,
+        max_pending: int = PARSE_MAX_PENDING,
+        timeout: float = PARSE_TIMEOUT,
+    ) -> None:
+        self.kind = kind
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.pending = 0
+        self._executor: Executor | None = None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                # ملاحظة: metrics الـ fast path/dateparser بتتسجل جوه الـ worker مش هنا
+                self._executor = ProcessPoolExecutor(self.workers, initializer=_warm_worker)
+            else:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="parse")
+        return self._executor
+
+    async def run(self, fn: Callable[..., T], *args: Any, default: T) -> T:
+        """
+        تشغيل fn(*args) في الـ pool.
+        يرجع default لو الطابور مليان أو النداء عدّى الـ timeout.
+        """
+        if self.pending >= self.max_pending:
+            _pool_calls.inc(outcome="rejected")
+            log.warning("Parse pool full (%d pending) – rejecting", self.pending)
+            return default
+
+        self.pending += 1
+        _pool_pending.set(self.pending)
+        t0 = time.perf_counter()
+        future = asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        # الخانة بتفضى لما الـ worker يخلص فعلًا (حتى بعد الـ timeout)
+        future.add_done_callback(self._release)
+        try:
+            with parse_span():
+                result = await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            _pool_calls.inc(outcome="timeout")
+            log.warning("Parse timed out after %.1fs: %r", self.timeout, args)
+            return default
+        except Exception:
+            _pool_calls.inc(outcome="error")
+            log.exception("Parse failed: %r", args)
+            return default
+        _pool_calls.inc(outcome="ok")
+        _pool_seconds.observe(time.perf_counter() - t0)
+        return result
+
+    def _release(self, _future: asyncio.Future) -> None:
+        self.pending -= 1
+        _pool_pending.set(self.pending)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+pool = ParsePool()
+
+
+async def run_parse(fn: Callable[..., T], *args: Any, default: T) -> T:
+    """اختصار لـ pool.run"""
+    return await pool.run(fn, *args, default=default)
+
+
+async def monitor_loop_lag(interval: float = LOOP_LAG_INTERVAL) -> None:
+    """
+    بينام interval ويقيس اتأخر قد إيه عن ميعاده.
+    أي تأخير كبير معناه إن فيه كود متزامن بيبلّك الـ loop.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        _loop_lag.observe(max(loop.time() - expected, 0.0))
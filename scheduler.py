@@ -3,26 +3,27 @@ scheduler.py – APScheduler jobs
 1) check_reminders         → كل دقيقة: تذكيرات المهام المستحقة
 2) check_interval_reminders → كل دقيقة: التذكيرات المتكررة (كل X دقيقة)
 3) daily_summary           → كل يوم 7:00 صباحًا Cairo: ملخص اليوم للـ Premium
-4) expire_subs             → كل ساعة: إلغاء الاشتراكات المنتهية
+انتهاء الاشتراكات مش هنا: expiry.py (في ميعادها بالظبط بدل scan كل ساعة)
+كل job بتشوف clock.now() واحد (ticked)، و simulate() بتلف نفس الـ jobs على وقت افتراضي
 """
 
 from __future__ import annotations
 
 import logging
-from datetime import datetime
+from datetime import datetime, time, timedelta
 
 from aiogram import Bot
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 import pytz
 
+import clock
 from database import (
     get_due_tasks,
     mark_reminded,
     handle_recurring_task,
     get_premium_users,
     get_today_tasks,
-    check_expired_subscriptions,
     get_due_reminders,
     advance_reminder,
 )
@@ -30,46 +31,49 @@ from database import (
 CAIRO = pytz.timezone("Africa/Cairo")
 log = logging.getLogger(__name__)
 
+SUMMARY_AT = time(7, 0)  # ملخص الصباح بتوقيت القاهرة
+
 
 # ══════════════════════════════════════════════════
 #  Job 1: تذكيرات كل دقيقة
 # ══════════════════════════════════════════════════
 
+@clock.ticked
 async def check_reminders(bot: Bot) -> None:
     """تفحص المهام المستحقة وترسل تذكيرات"""
     tasks = await get_due_tasks()
     for t in tasks:
         try:
-            due_dt = datetime.fromisoformat(t["due"])
-            due_str = due_dt.strftime("%Y-%m-%d %I:%M %p")
+            due_str = t.due_at.strftime("%Y-%m-%d %I:%M %p")
             text = (
                 "━━━━━━━━━━━━━━━━━━━━\n"
                 "⏰ <b>حان الموعد!</b>\n"
                 "━━━━━━━━━━━━━━━━━━━━\n\n"
-                f"📝 <b>{t['title']}</b>\n"
+                f"📝 <b>{t.title}</b>\n"
                 f"🕐 {due_str}\n\n"
                 "💪 يلّا! لا تنسى تنجزها!"
             )
-            await bot.send_message(t["user_id"], text, parse_mode="HTML")
-            await mark_reminded(t["id"])
+            await bot.send_message(t.user_id, text, parse_mode="HTML")
+            await mark_reminded(t.id)
 
-            if t.get("recurrence"):
+            if t.recurrence:
                 await handle_recurring_task(t)
 
         except Exception as e:
-            log.error("Reminder error for task %s: %s", t["id"], e)
+            log.error("Reminder error for task %s: %s", t.id, e)
 
 
 # ══════════════════════════════════════════════════
 #  Job 2: تذكيرات متكررة كل X دقيقة
 # ══════════════════════════════════════════════════
 
+@clock.ticked
 async def check_interval_reminders(bot: Bot) -> None:
     """تفحص التذكيرات المتكررة المستحقة وترسلها"""
     reminders = await get_due_reminders()
     for r in reminders:
         try:
-            mins = r["interval_mins"]
+            mins = r.interval_mins
             if mins < 60:
                 interval_str = f"{mins} دقيقة"
             elif mins == 60:
@@ -87,24 +91,25 @@ async def check_interval_reminders(bot: Bot) -> None:
                 "━━━━━━━━━━━━━━━━━━━━\n"
                 "🔔 <b>تذكير!</b>\n"
                 "━━━━━━━━━━━━━━━━━━━━\n\n"
-                f"📿 <b>{r['text']}</b>\n\n"
+                f"📿 <b>{r.text}</b>\n\n"
                 f"<i>🔄 كل {interval_str}</i>"
             )
-            await bot.send_message(r["user_id"], text, parse_mode="HTML")
-            await advance_reminder(r["id"])
+            await bot.send_message(r.user_id, text, parse_mode="HTML")
+            await advance_reminder(r.id)
         except Exception as e:
-            log.error("Interval reminder error for #%s: %s", r["id"], e)
+            log.error("Interval reminder error for #%s: %s", r.id, e)
 
 
 # ══════════════════════════════════════════════════
 #  Job 3: ملخص الصباح اليومي (Premium فقط)
 # ══════════════════════════════════════════════════
 
+@clock.ticked
 async def daily_summary(bot: Bot) -> None:
     """يُرسل ملخص يومي كل صباح للمستخدمين Premium"""
     premium_users = await get_premium_users()
     for u in premium_users:
-        uid = u["user_id"]
+        uid = u.user_id
         try:
             tasks = await get_today_tasks(uid)
             if not tasks:
@@ -117,16 +122,15 @@ async def daily_summary(bot: Bot) -> None:
                     "📝 عايز تضيف حاجة؟ اضغط ➕"
                 )
             else:
-                now = datetime.now(CAIRO)
+                now = clock.now()
                 overdue = []
                 today_list = []
                 for t in tasks:
-                    due_dt = datetime.fromisoformat(t["due"])
-                    due_str = due_dt.strftime("%I:%M %p")
-                    if due_dt < now:
-                        overdue.append(f"  🔴 <b>{t['title']}</b> ─ <s>{due_str}</s>")
+                    due_str = t.due_at.strftime("%I:%M %p")
+                    if t.due_at < now:
+                        overdue.append(f"  🔴 <b>{t.title}</b> ─ <s>{due_str}</s>")
                     else:
-                        today_list.append(f"  🔵 <b>{t['title']}</b> ─ {due_str}")
+                        today_list.append(f"  🔵 <b>{t.title}</b> ─ {due_str}")
 
                 lines = [
                     "━━━━━━━━━━━━━━━━━━━━\n",
@@ -149,30 +153,6 @@ async def daily_summary(bot: Bot) -> None:
             log.error("Daily summary error for user %s: %s", uid, e)
 
 
-# ══════════════════════════════════════════════════
-#  Job 4: إلغاء الاشتراكات المنتهية
-# ══════════════════════════════════════════════════
-
-async def expire_subscriptions(bot: Bot) -> None:
-    """تحقق من الاشتراكات المنتهية وأبلغ المستخدمين"""
-    expired = await check_expired_subscriptions()
-    for uid in expired:
-        try:
-            text = (
-                "━━━━━━━━━━━━━━━━━━━━\n"
-                "⚠️ <b>انتهى اشتراكك Premium!</b>\n"
-                "━━━━━━━━━━━━━━━━━━━━\n\n"
-                "📦 رجعت للخطة المجانية:\n"
-                "  📝 15 مهمة كحد أقصى\n"
-                "  🔔 3 تذكيرات كحد أقصى\n\n"
-                "⭐ جدّد اشتراكك: /premium\n\n"
-                "💙 شكرًا لاستخدامك TelePot!"
-            )
-            await bot.send_message(uid, text, parse_mode="HTML")
-        except Exception as e:
-            log.error("Expire notify error for user %s: %s", uid, e)
-
-
 # ══════════════════════════════════════════════════
 #  تسجيل الـ Jobs في الـ Scheduler
 # ══════════════════════════════════════════════════
@@ -202,20 +182,44 @@ def setup_scheduler(bot: Bot) -> AsyncIOScheduler:
     scheduler.add_job(
         daily_summary,
         "cron",
-        hour=7,
-        minute=0,
+        hour=SUMMARY_AT.hour,
+        minute=SUMMARY_AT.minute,
         args=[bot],
         id="daily_summary",
         replace_existing=True,
     )
 
-    scheduler.add_job(
-        expire_subscriptions,
-        "interval",
-        hours=1,
-        args=[bot],
-        id="expire_subscriptions",
-        replace_existing=True,
-    )
-
     return scheduler
+
+
+# ══════════════════════════════════════════════════
+#  المحاكاة: نفس الـ jobs على وقت افتراضي (load tests / benchmarks)
+# ══════════════════════════════════════════════════
+
+def _next_summary(after: datetime) -> datetime:
+    at = CAIRO.localize(datetime.combine(after.date(), SUMMARY_AT))
+    if at <= after:
+        at = CAIRO.localize(datetime.combine(after.date() + timedelta(days=1), SUMMARY_AT))
+    return at
+
+
+async def simulate(bot: Bot, until: datetime, step: timedelta = timedelta(minutes=1)) -> int:
+    """
+    تقديم الـ VirtualClock (لازم clock.use قبلها) step ورا step لحد until،
+    ومع كل step نفس اللي setup_scheduler بيعمله → عدد الـ ticks
+    """
+    virtual = clock.current()
+    if not isinstance(virtual, clock.VirtualClock):
+        raise RuntimeError("simulate() needs clock.use(VirtualClock(...)) first")
+
+    summary_at = _next_summary(virtual.now())
+    ticks = 0
+    while virtual.now() < until:
+        now = virtual.advance(step)
+        await check_reminders(bot)
+        await check_interval_reminders(bot)
+        if now >= summary_at:
+            await daily_summary(bot)
+            summary_at = _next_summary(now)
+        ticks += 1
+    return ticks
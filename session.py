@@ -0,0 +1,162 @@
+"""
+session.py – AiohttpSession متظبطة للبوت
+- pool size صريح + حد لكل host (كل الطلبات رايحة api.telegram.org)
+- keep-alive أطول عشان الـ scheduler بيبعت كل دقيقة
+- DNS cache + timeout لكل طلب
+- إحصائيات إعادة استخدام الاتصالات (metrics.py)
+- BotApiMetricsMiddleware: latency + أخطاء + RetryAfter + حجم الطلب لكل method
+  (الحجم عينة: طلب من كل BOT_API_PAYLOAD_SAMPLE عشان الـ serialize مش رخيص)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from typing import Any
+
+from aiohttp import ClientSession, TraceConfig
+from aiogram.__meta__ import __version__ as aiogram_version
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.exceptions import TelegramRetryAfter
+
+import metrics
+
+# ─── الإعدادات (قابلة للتغيير من env) ───
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "100"))
+HTTP_POOL_PER_HOST = int(os.getenv("HTTP_POOL_PER_HOST", "32"))
+HTTP_KEEPALIVE = float(os.getenv("HTTP_KEEPALIVE", "75"))
+HTTP_DNS_TTL = int(os.getenv("HTTP_DNS_TTL", "3600"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+# قياس حجم الـ payload لطلب واحد من كل N (1 = كل الطلبات)
+BOT_API_PAYLOAD_SAMPLE = max(int(os.getenv("BOT_API_PAYLOAD_SAMPLE", "20")), 1)
+
+_created = metrics.counter(
+    "telepot_http_connections_created_total", "New TCP connections opened to the Bot API"
+)
+_requests = metrics.counter(
+    "telepot_http_requests_total", "HTTP requests sent to the Bot API"
+)
+
+_api_seconds = metrics.histogram(
+    "telepot_bot_api_seconds", "Bot API call latency", ["method"]
+)
+_api_calls = metrics.counter(
+    "telepot_bot_api_calls_total", "Bot API calls by result", ["method", "status"]
+)
+_api_errors = metrics.counter(
+    "telepot_bot_api_errors_total", "Bot API errors by exception class", ["method", "error"]
+)
+_api_retry_after = metrics.counter(
+    "telepot_bot_api_retry_after_total", "RetryAfter (flood wait) responses", ["method"]
+)
+_api_retry_after_seconds = metrics.counter(
+    "telepot_bot_api_retry_after_seconds_total", "Seconds Telegram asked us to wait", ["method"]
+)
+_api_payload_bytes = metrics.histogram(
+    "telepot_bot_api_payload_bytes",
+    "Serialized request payload size (sampled 1 in BOT_API_PAYLOAD_SAMPLE calls)",
+    ["method"],
+    buckets=(64, 256, 512, 1024, 2048, 4096, 16384, 65536),
+)
+
+
+async def _on_connection_created(session: Any, ctx: Any, params: Any) -> None:
+    _created.inc()
+
+
+_trace = TraceConfig()
+_trace.on_connection_create_end.append(_on_connection_created)
+_trace.freeze()
+
+USER_AGENT = f"TelePot aiogram/{aiogram_version}"
+
+
+class TunedAiohttpSession(AiohttpSession):
+    """AiohttpSession بـ connection pool و keep-alive و DNS cache متظبطين"""
+
+    def __init__(
+        self,
+        pool_size: int = HTTP_POOL_SIZE,
+        pool_per_host: int = HTTP_POOL_PER_HOST,
+        keepalive_timeout: float = HTTP_KEEPALIVE,
+        dns_ttl: int = HTTP_DNS_TTL,
+        timeout: float = HTTP_TIMEOUT,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(limit=pool_size, timeout=timeout, **kwargs)
+        self._connector_init.update(
+            limit_per_host=pool_per_host,
+            keepalive_timeout=keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=dns_ttl,
+        )
+
+    async def create_session(self) -> ClientSession:
+        """session بتاعة aiogram زي ما هي + عدّاد الاتصالات والـ User-Agent (مرة لكل session)"""
+        session = await super().create_session()
+        if _trace not in session.trace_configs:
+            session.trace_configs.append(_trace)
+            session.headers["User-Agent"] = USER_AGENT
+        return session
+
+    async def make_request(self, bot: Any, method: Any, timeout: int | None = None) -> Any:
+        _requests.inc()
+        return await super().make_request(bot, method, timeout=timeout)
+
+    @staticmethod
+    def stats() -> dict[str, float]:
+        """ملخص إعادة استخدام الاتصالات"""
+        created = _created.get()
+        total = _requests.get()
+        reused = max(total - created, 0)
+        return {
+            "requests": total,
+            "created": created,
+            "reused": reused,
+            "reuse_ratio": reused / total if total else 0.0,
+        }
+
+
+class BotApiMetricsMiddleware(BaseRequestMiddleware):
+    """Request middleware على session البوت: metrics لكل Bot API method"""
+
+    def __init__(self, sample_every: int = BOT_API_PAYLOAD_SAMPLE) -> None:
+        self.sample_every = sample_every
+        self._calls = 0
+
+    async def __call__(self, make_request, bot, method):
+        name = method.__api_method__
+        self._calls += 1
+        if self._calls % self.sample_every == 0:
+            _api_payload_bytes.observe(self._payload_size(method), method=name)
+
+        t0 = time.perf_counter()
+        try:
+            response = await make_request(bot, method)
+        except TelegramRetryAfter as e:
+            _api_retry_after.inc(method=name)
+            _api_retry_after_seconds.inc(e.retry_after, method=name)
+            self._record_error(name, e, t0)
+            raise
+        except Exception as e:
+            self._record_error(name, e, t0)
+            raise
+        _api_seconds.observe(time.perf_counter() - t0, method=name)
+        _api_calls.inc(method=name, status="ok")
+        return response
+
+    @staticmethod
+    def _payload_size(method: Any) -> int:
+        try:
+            payload = method.model_dump(exclude_none=True, warnings=False)
+            return len(json.dumps(payload, ensure_ascii=False, default=str).encode())
+        except Exception:
+            return 0
+
+    @staticmethod
+    def _record_error(name: str, error: Exception, t0: float) -> None:
+        _api_seconds.observe(time.perf_counter() - t0, method=name)
+        _api_calls.inc(method=name, status="error")
+        _api_errors.inc(method=name, error=type(error).__name__)
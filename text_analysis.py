@@ -0,0 +1,177 @@
+"""
+text_analysis.py – أدوات تحليل النص المشتركة بين handlers/add_task.py و handlers/reminder.py
+- تحويل الأرقام العربية + حروف عربية (مكان واحد بدل نسختين)
+- grammar متجمّعة للفترات ("كل 5 دقايق" / "every 2 hours")
+- grammar لرسائل "ذكرني ... كل ..." : الرسالة بتتقسم كلمات مرة واحدة
+  وبيطلع منها الفعل والنص والفترة
+- fold_arabic: تطبيع النص للبحث (نفس الجدول بيتستخدم في triggers الـ FTS)
+"""
+
+from __future__ import annotations
+
+import re
+
+# ─── الأرقام العربية ← إنجليزية (٧ → 7) ───
+ARABIC_DIGIT_MAP = str.maketrans("٠١٢٣٤٥٦٧٨٩", "0123456789")
+
+# ─── حرف عربي ───
+AR_CHAR = r"[\u0600-\u06FF]"
+ARABIC_RE = re.compile(AR_CHAR)
+
+# ─── تطبيع للبحث: تشكيل + تطويل + أشكال الألف/الياء/التاء المربوطة/الهمزة + الأرقام ───
+# (من → إلى) – database.py بيبني منه replace() متداخلة للـ triggers، فالنص المتخزن
+# في الـ index والـ query بيتطبعوا بنفس الجدول بالظبط
+FOLD_PAIRS: tuple[tuple[str, str], ...] = (
+    *((c, "") for c in "\u064B\u064C\u064D\u064E\u064F\u0650\u0651\u0652\u0670\u0640"),
+    ("أ", "ا"), ("إ", "ا"), ("آ", "ا"), ("ٱ", "ا"),
+    ("ى", "ي"), ("ئ", "ي"), ("ؤ", "و"), ("ة", "ه"),
+    *zip("٠١٢٣٤٥٦٧٨٩", "0123456789"),
+)
+_FOLD_TABLE = str.maketrans({src: dst or None for src, dst in FOLD_PAIRS})
+
+
+def fold_arabic(s: str) -> str:
+    """تطبيع للبحث: مُحَمَّد → محمد، الإجتماع → الاجتماع، مدرسة → مدرسه"""
+    return s.translate(_FOLD_TABLE)
+
+
+# ─── أفعال التذكير (ذكرني / فكرني / نبهني) ───
+REMIND_VERB = r"(?:ذكر|فكر|نبه)(?:ني|نى)"
+
+
+# ══════════════════════════════════════════════════
+#  الفترات → دقائق
+#  كل قاعدة alternative في regex واحد بنفس ترتيب الفحص القديم:
+#  match() بيرجع أول alternative بتنطبق من أول النص، زي سلسلة re.match بالظبط.
+# ══════════════════════════════════════════════════
+
+_AR_INTERVAL_RE = re.compile(
+    r"(?P<minutes>\d+)\s*(?:دقيق[ةه]|دقايق|دقائق|دقيق|دق)"   # "5 دقايق"
+    r"|(?P<minute>دقيق(?:ه|ة|تين))"                         # "دقيقة" / "دقيقتين"
+    r"|(?P<hours>\d+)\s*(?:ساع[ةه]|ساعات)"                  # "3 ساعات"
+    r"|(?P<hour>ساع[ةه]\Z)"                                 # "ساعة"
+    r"|(?P<two_hours>ساعتين\Z)"                             # "ساعتين"
+    r"|(?P<half>نص(?:ف)?\s*ساع[ةه])"                        # "نص ساعة"
+    r"|(?P<quarter>ربع\s*ساع[ةه])"                          # "ربع ساعة"
+    r"|(?P<third>(?:تلت|ثلث)\s*ساع[ةه])"                    # "تلت ساعة"
+    r"|(?P<hour_half>ساع[ةه]\s*و?\s*نص(?:ف)?)"              # "ساعة ونص"
+    r"|(?P<hour_quarter>ساع[ةه]\s*و?\s*ربع)"                # "ساعة وربع"
+)
+_EN_INTERVAL_RE = re.compile(
+    r"(?P<minutes>\d+)\s*min(?:ute)?s?"
+    r"|(?P<hours>\d+)\s*hours?"
+    r"|(?P<hour>(?:hour|an hour|1 hour)\Z)"
+    r"|(?P<half>(?:half hour|half an hour|30 min)\Z)"
+)
+_FIXED_MINUTES = {
+    "hour": 60, "two_hours": 120, "half": 30, "quarter": 15, "third": 20,
+    "hour_half": 90, "hour_quarter": 75,
+}
+
+
+def _interval_value(m: re.Match | None, s: str) -> int | None:
+    if m is None:
+        return None
+    kind = m.lastgroup
+    if kind == "minutes":
+        return int(m.group(kind))
+    if kind == "hours":
+        return int(m.group(kind)) * 60
+    if kind == "minute":
+        return 2 if "تين" in s else 1
+    return _FIXED_MINUTES[kind]
+
+
+def parse_arabic_interval(s: str) -> int | None:
+    """تحليل فترة عربية (مصري + فصحى) → دقائق"""
+    s = s.translate(ARABIC_DIGIT_MAP).strip()
+    return _interval_value(_AR_INTERVAL_RE.match(s), s)
+
+
+def parse_english_interval(s: str) -> int | None:
+    """تحليل فترة إنجليزية → دقائق"""
+    s = s.strip().lower()
+    return _interval_value(_EN_INTERVAL_RE.match(s), s)
+
+
+_EVERY_PREFIX_RE = re.compile(r"^كل\s*")
+_EVERY_EN_PREFIX_RE = re.compile(r"^every\s*", re.IGNORECASE)
+_PLAIN_MINUTES_RE = re.compile(r"^(\d+)$")
+
+
+def parse_interval_input(text: str) -> int | None:
+    """تحليل إدخال الفترة من المستخدم (في FSM)"""
+    s = text.translate(ARABIC_DIGIT_MAP).strip()
+
+    s = _EVERY_PREFIX_RE.sub("", s).strip()
+    if "كل" in s:
+        s = s.split("كل", 1)[1].strip()
+    s = _EVERY_EN_PREFIX_RE.sub("", s).strip()
+
+    result = parse_arabic_interval(s) or parse_english_interval(s)
+    if result:
+        return result
+
+    m = _PLAIN_MINUTES_RE.match(s)
+    if m and int(m.group(1)) > 0:
+        return int(m.group(1))
+    return None
+
+
+# ══════════════════════════════════════════════════
+#  رسائل "ذكرني ... كل ..." / "remind me to ... every ..."
+# ══════════════════════════════════════════════════
+
+_REMIND_AR_RE = re.compile(REMIND_VERB)
+_REMIND_EN_RE = re.compile(r"remind\s+me\s+(?:to\s+)?", re.IGNORECASE)
+# "ذكرني بالاستغفار" / "ذكرني بإني اتمشى" / "ذكرني إني ..."
+_PAYLOAD_PREFIX_RE = re.compile(r"^(?:ب(?:إن[يى]\s+)?|إن[يى]\s+)")
+_PAYLOAD_START_RE = re.compile(r"[\u0600-\u06FF\w]")
+
+
+def parse_reminder_message(text: str) -> tuple[str, int] | None:
+    """
+    تحليل رسالة ذكرني مباشرة:
+    "ذكرني بالاستغفار كل 5 دقايق" → ("الاستغفار", 5)
+    "ذكرني اشرب ماء كل ساعة" → ("اشرب ماء", 60)
+    "ذكرني كل ساعتين اشرب ماء" → ("اشرب ماء", 120)
+    "remind me to drink water every 30 minutes" → ("drink water", 30)
+    """
+    s = text.translate(ARABIC_DIGIT_MAP).strip()
+
+    m = _REMIND_AR_RE.search(s)
+    if m and s[m.end():m.end() + 1].isspace():
+        words = s[m.end():].split()
+        if words[0] == "كل":
+            # "ذكرني كل <فترة> <نص>": أطول فترة كاملة وبعدها نص
+            for k in range(len(words) - 1, 1, -1):
+                interval = _full_interval(" ".join(words[1:k]))
+                payload = " ".join(words[k:])
+                if interval and _PAYLOAD_START_RE.match(payload):
+                    return _PAYLOAD_PREFIX_RE.sub("", payload).strip() or payload, interval
+        elif "كل" in words:
+            # "ذكرني <نص> كل <فترة>"
+            i = words.index("كل")
+            payload = _PAYLOAD_PREFIX_RE.sub("", " ".join(words[:i])).strip()
+            interval = parse_arabic_interval(" ".join(words[i + 1:]))
+            if interval and payload:
+                return payload, interval
+
+    m = _REMIND_EN_RE.search(s)
+    if m:
+        words = s[m.end():].split()
+        lowered = [w.lower() for w in words]
+        if "every" in lowered[1:]:
+            i = lowered.index("every", 1)
+            interval = parse_english_interval(" ".join(words[i + 1:]))
+            payload = " ".join(words[:i])
+            if interval and payload:
+                return payload, interval
+
+    return None
+
+
+def _full_interval(s: str) -> int | None:
+    """فترة عربية لازم تغطي النص كله (مش أول حتة منه بس)"""
+    m = _AR_INTERVAL_RE.fullmatch(s)
+    return _interval_value(m, s) if m else None
@@ -0,0 +1,161 @@
+"""
+tracing.py – قياس زمن كل handler وتفصيله (DB / dateparser / Bot API)
+- الـ trace الحالي محفوظ في contextvar، فأي await جوه الـ handler بيشوفه
+- لما الـ sampling مقفول مفيش trace أصلًا: كل hook بيعمل contextvar.get() وبس
+- آخر TRACE_BUFFER_SIZE trace في ring buffer + histograms في metrics.py
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterator, TypeVar
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+
+import metrics
+
+# ─── الإعدادات ───
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0"))   # 0 = مقفول، 1 = كل update
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", "500"))
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+
+class Trace:
+    """قياسات update واحد"""
+
+    __slots__ = (
+        "handler", "started", "wall",
+        "db_time", "db_calls",
+        "parse_time", "parse_calls",
+        "api_time", "api_calls",
+    )
+
+    def __init__(self, handler: str) -> None:
+        self.handler = handler
+        self.started = time.time()
+        self.wall = 0.0
+        self.db_time = 0.0
+        self.db_calls = 0
+        self.parse_time = 0.0
+        self.parse_calls = 0
+        self.api_time = 0.0
+        self.api_calls = 0
+
+
+_current: ContextVar[Trace | None] = ContextVar("telepot_trace", default=None)
+recent: deque[Trace] = deque(maxlen=TRACE_BUFFER_SIZE)
+
+handler_seconds = metrics.histogram(
+    "telepot_handler_seconds", "Handler wall time", ["handler"]
+)
+handler_db_seconds = metrics.histogram(
+    "telepot_handler_db_seconds", "Time spent in database.py per handler", ["handler"]
+)
+handler_db_calls = metrics.counter(
+    "telepot_handler_db_calls_total", "database.py calls per handler", ["handler"]
+)
+handler_parse_seconds = metrics.histogram(
+    "telepot_handler_parse_seconds", "Time spent in dateparser per handler", ["handler"]
+)
+handler_api_seconds = metrics.histogram(
+    "telepot_handler_api_seconds", "Time spent in Bot API calls per handler", ["handler"]
+)
+handler_api_calls = metrics.counter(
+    "telepot_handler_api_calls_total", "Bot API calls per handler", ["handler"]
+)
+
+
+def current() -> Trace | None:
+    """الـ trace الشغال دلوقتي (لو الـ update ده متـ sample)"""
+    return _current.get()
+
+
+def start(handler: str) -> tuple[Trace, Any]:
+    """بدء trace جديد وإرجاعه مع الـ token لإغلاقه"""
+    trace = Trace(handler)
+    return trace, _current.set(trace)
+
+
+def finish(trace: Trace, token: Any, wall: float) -> None:
+    """قفل الـ trace وتسجيله في الـ buffer والـ histograms"""
+    _current.reset(token)
+    trace.wall = wall
+    recent.append(trace)
+    name = trace.handler
+    handler_seconds.observe(wall, handler=name)
+    handler_db_seconds.observe(trace.db_time, handler=name)
+    handler_db_calls.inc(trace.db_calls, handler=name)
+    if trace.parse_calls:
+        handler_parse_seconds.observe(trace.parse_time, handler=name)
+    handler_api_seconds.observe(trace.api_time, handler=name)
+    handler_api_calls.inc(trace.api_calls, handler=name)
+
+
+def traced_db(func: F) -> F:
+    """Decorator لدوال database.py: يجمع الزمن وعدد النداءات في الـ trace الحالي"""
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        trace = _current.get()
+        if trace is None:
+            return await func(*args, **kwargs)
+        t0 = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            trace.db_time += time.perf_counter() - t0
+            trace.db_calls += 1
+
+    return wrapper  # type: ignore[return-value]
+
+
+@contextmanager
+def _parse_span(trace: Trace) -> Iterator[None]:
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.parse_time += time.perf_counter() - t0
+        trace.parse_calls += 1
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def parse_span() -> Any:
+    """Context manager حوالين نداءات dateparser"""
+    trace = _current.get()
+    if trace is None:
+        return _NULL_SPAN
+    return _parse_span(trace)
+
+
+class BotApiTraceMiddleware(BaseRequestMiddleware):
+    """Request middleware على session البوت: يحسب نداءات الـ API جوه الـ trace"""
+
+    async def __call__(self, make_request, bot, method):
+        trace = _current.get()
+        if trace is None:
+            return await make_request(bot, method)
+        t0 = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        finally:
+            trace.api_time += time.perf_counter() - t0
+            trace.api_calls += 1